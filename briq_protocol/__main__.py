@@ -3,20 +3,83 @@ import argparse
 from .generate_auction import generate_auction
 from .generate_box import generate_box
 from .generate_interface import generate
+from .build_cache import DEFAULT_CACHE_DIR, BuildCache, build_data, build_verifier
+from .build_collection import generate_verifier_parallel
+from .shape_commitment import load_shape, shapes_from_directory
+from .box_catalog import DEFAULT_SOURCE as BOX_CATALOG_SOURCE, write_catalog
+from .auction_data import AUCTION, ONCHAIN, write_auction_file
 
 parser = argparse.ArgumentParser(description='Generate contracts.')
 parser.add_argument('--box', help='Generate the box contract', action="store_true")
 parser.add_argument('--auction', help='Generate the auction contract', action="store_true")
 parser.add_argument('--source', help='The name of the source contract.')
+parser.add_argument(
+    '--box-catalog',
+    help='Generate src/box_nft/catalog.cairo from a JSON or CSV box catalog.',
+    nargs='?',
+    const=BOX_CATALOG_SOURCE,
+)
+parser.add_argument('--auction-data', help='Generate an auction data contract from a JSON or CSV list of lots.')
+parser.add_argument(
+    '--auction-layout', help='Data contract layout for --auction-data.', choices=[AUCTION, ONCHAIN], default=ONCHAIN
+)
+parser.add_argument(
+    '--auction-network',
+    help='Allow list and target (contracts/auction_onchain/data_<network>.cairo) of the onchain layout.',
+    default='mainnet',
+)
+parser.add_argument(
+    '--auction-only-allowed', help='Restrict the onchain auction to its allow list.', action="store_true"
+)
+parser.add_argument(
+    '--verifier',
+    help='Generate a shape verifier contract from a directory of briq set JSONs named after their attribute id.',
+)
+parser.add_argument(
+    '--verifier-output', help='Where to write the --verifier contract.', default='shapes_verifier.cairo'
+)
+parser.add_argument('--cache-dir', help='Where to keep the build cache.', default=DEFAULT_CACHE_DIR)
+parser.add_argument('--no-cache', help='Always regenerate.', action="store_true")
 args = parser.parse_args()
 
-if args.box:
-    with open('contracts/box_nft/data.cairo', 'w') as f:
-        f.write(generate_box())
+shapes = None
+if args.verifier:
+    shapes = {attribute_id: load_shape(path) for attribute_id, path in shapes_from_directory(args.verifier).items()}
 
-if args.auction:
-    with open('contracts/auction/data.cairo', 'w') as f:
-        f.write(generate_auction())
+if args.no_cache:
+    if args.box:
+        with open('contracts/box_nft/data.cairo', 'w') as f:
+            f.write(generate_box())
+
+    if args.auction:
+        with open('contracts/auction/data.cairo', 'w') as f:
+            f.write(generate_auction())
+
+    if shapes is not None:
+        with open(args.verifier_output, 'w') as f:
+            f.write(generate_verifier_parallel(shapes))
+elif args.box or args.auction or shapes is not None:
+    cache = BuildCache(args.cache_dir)
+    if args.box:
+        build_data(cache, 'contracts/box_nft/data.cairo', generate_box)
+    if args.auction:
+        build_data(cache, 'contracts/auction/data.cairo', generate_auction)
+    if shapes is not None:
+        build_verifier(cache, args.verifier_output, shapes)
+    print(cache.summary())
+
+if args.box_catalog:
+    write_catalog(args.box_catalog)
+
+if args.auction_data:
+    if args.auction_layout == AUCTION:
+        write_auction_file(args.auction_data, 'contracts/auction/data.cairo', AUCTION)
+    else:
+        target = f"contracts/auction_onchain/data_{args.auction_network}.cairo"
+        data_hash = write_auction_file(
+            args.auction_data, target, ONCHAIN, args.auction_network, args.auction_only_allowed
+        )
+        print(f"{target} data hash (setDataHash_): {hex(data_hash)}")
 
 if args.source:
     generate(args.source, f"contracts/{args.source}_interface.cairo")
@@ -0,0 +1,214 @@
+import mmap
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+from starkware.cairo.common.poseidon_utils import PoseidonParams
+
+from .parallel import chunks, map_chunks, pool
+
+# Poseidon Merkle allow lists, verified on chain by src/allowlist.cairo which only stores the root.
+# Leaves are poseidon_hash_single(address), over the addresses sorted increasingly.
+# Pairs are hashed sorted (smaller first), so a proof is just the siblings, without left/right flags.
+# An odd node out at the end of a level moves up unchanged.
+
+ADDR_BOUND = 2**251 - 256
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# File layout: header, then the sorted addresses, then every level from the leaves up to the root.
+# All felts are 32 bytes big endian, so any node is one seek away.
+MAGIC = b'BRIQMRK1'
+_HEADER = struct.Struct('<8sQ')
+_FELT = 32
+
+
+_PARAMS = PoseidonParams.get_default_poseidon_params()
+_P = _PARAMS.field_prime
+_ARK = [tuple(int(c) for c in row) for row in _PARAMS.ark]
+_HALF_FULL = _PARAMS.r_f // 2
+_FULL_START, _PARTIAL, _FULL_END = _ARK[:_HALF_FULL], _ARK[_HALF_FULL:-_HALF_FULL], _ARK[-_HALF_FULL:]
+
+
+def _hades(s0: int, s1: int, s2: int) -> int:
+    # Same permutation as starkware's hades_permutation, on plain ints: about 2.5x faster.
+    # Only the cubed lane is reduced in partial rounds, the others grow by a few bits per round.
+    for c0, c1, c2 in _FULL_START:
+        s0, s1, s2 = pow(s0 + c0, 3, _P), pow(s1 + c1, 3, _P), pow(s2 + c2, 3, _P)
+        s0, s1, s2 = 3 * s0 + s1 + s2, s0 - s1 + s2, s0 + s1 - 2 * s2
+    for c0, c1, c2 in _PARTIAL:
+        s2 += c2
+        s2 = s2 * s2 % _P * s2 % _P
+        s0 += c0
+        s1 += c1
+        s0, s1, s2 = 3 * s0 + s1 + s2, s0 - s1 + s2, s0 + s1 - 2 * s2
+    for c0, c1, c2 in _FULL_END:
+        s0, s1, s2 = pow(s0 + c0, 3, _P), pow(s1 + c1, 3, _P), pow(s2 + c2, 3, _P)
+        s0, s1, s2 = 3 * s0 + s1 + s2, s0 - s1 + s2, s0 + s1 - 2 * s2
+    return s0 % _P
+
+
+def leaf_hash(address: int) -> int:
+    """poseidon_hash_single(address)."""
+    return _hades(address, 0, 1)
+
+
+def node_hash(a: int, b: int) -> int:
+    """poseidon_hash of the pair, smaller first."""
+    return _hades(a, b, 2) if a < b else _hades(b, a, 2)
+
+
+def level_sizes(nb_leaves: int) -> List[int]:
+    sizes = [nb_leaves]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def normalize_addresses(addresses: Iterable) -> List[int]:
+    """Sorted, deduplicated addresses. Accepts ints or hex strings."""
+    values = set()
+    for address in addresses:
+        value = int(address, 16) if isinstance(address, str) else int(address)
+        if not 0 < value < ADDR_BOUND:
+            raise Exception(f"Invalid address {hex(value)}")
+        values.add(value)
+    if not values:
+        raise Exception("Empty allow list")
+    return sorted(values)
+
+
+def _leaves_chunk(addresses: List[int]) -> List[int]:
+    return [leaf_hash(address) for address in addresses]
+
+
+def _pairs_chunk(nodes: List[int]) -> List[int]:
+    return [node_hash(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+
+
+def build_levels(
+    addresses: List[int], workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> List[List[int]]:
+    """
+    All levels of the tree, leaves first, root last, for addresses as returned by normalize_addresses.
+    Hashing runs across processes, level by level.
+    :param workers: Number of processes, 0 to run serially in this process.
+    """
+    # Chunks of an even size, so pairs never straddle two chunks.
+    chunk_size += chunk_size % 2
+    with pool(workers) as executor:
+        levels = [[h for chunk in map_chunks(executor, _leaves_chunk, chunks(addresses, chunk_size)) for h in chunk]]
+        while len(levels[-1]) > 1:
+            level = levels[-1]
+            parents = [h for chunk in map_chunks(executor, _pairs_chunk, chunks(level, chunk_size)) for h in chunk]
+            if len(level) % 2:
+                parents.append(level[-1])
+            levels.append(parents)
+    return levels
+
+
+def get_proof(levels: List[List[int]], index: int) -> List[int]:
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(root: int, address: int, proof: List[int]) -> bool:
+    """Same computation as verify_allowlist_proof in src/allowlist.cairo."""
+    node = leaf_hash(address)
+    for sibling in proof:
+        node = node_hash(node, sibling)
+    return node == root
+
+
+def write_allowlist(
+    path: str, addresses: Iterable, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Build the tree and write the proof file.
+    :return: The root, to set on chain with allowlist.set_root.
+    """
+    addresses = normalize_addresses(addresses)
+    levels = build_levels(addresses, workers, chunk_size)
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(addresses)))
+        for section in [addresses] + levels:
+            f.write(b''.join(value.to_bytes(_FELT, 'big') for value in section))
+    return levels[-1][0]
+
+
+class AllowlistFile:
+    """
+    Serves proofs from a file written by write_allowlist, without loading it:
+    an address is found by binary search over the sorted addresses, then each sibling is a direct read.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._size = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise Exception(f"{path} is not an allow list file")
+        self._sizes = level_sizes(self._size)
+        self._offsets = [_HEADER.size + self._size * _FELT]
+        for size in self._sizes:
+            self._offsets.append(self._offsets[-1] + size * _FELT)
+        if len(self._data) != self._offsets[-1]:
+            raise Exception(f"{path} is truncated")
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self._size
+
+    def _felt(self, offset: int) -> int:
+        return int.from_bytes(self._data[offset:offset + _FELT], 'big')
+
+    def address(self, index: int) -> int:
+        return self._felt(_HEADER.size + index * _FELT)
+
+    def node(self, level: int, index: int) -> int:
+        return self._felt(self._offsets[level] + index * _FELT)
+
+    @property
+    def root(self) -> int:
+        return self.node(len(self._sizes) - 1, 0)
+
+    def index_of(self, address: int) -> Optional[int]:
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if self.address(mid) < address:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._size and self.address(low) == address:
+            return low
+        return None
+
+    def proof(self, address: int) -> List[int]:
+        index = self.index_of(address)
+        if index is None:
+            raise Exception(f"{hex(address)} is not in the allow list")
+        proof = []
+        for level, size in enumerate(self._sizes[:-1]):
+            sibling = index ^ 1
+            if sibling < size:
+                proof.append(self.node(level, sibling))
+            index //= 2
+        return proof
+
+    def proofs(self, addresses: Iterable[int]) -> List[Tuple[int, List[int]]]:
+        return [(address, self.proof(address)) for address in addresses]
@@ -0,0 +1,303 @@
+import csv
+import io
+import json
+from typing import Dict, List, Optional, TextIO
+
+import numpy as np
+from starkware.starknet.compiler.compile import compile_starknet_files
+from starkware.starknet.core.os.contract_class.deprecated_class_hash import compute_deprecated_class_hash
+
+# Bulk auction data: lots from CSV or JSON, validated, then streamed to a data contract.
+# AUCTION is the box auction layout (contracts/auction/data.cairo, compiled into the auction contract).
+# ONCHAIN is the set auction layout (contracts/auction_onchain/data_*.cairo): that contract is declared on its own
+# and found through its class hash, see data_link.getDataHash_ and data_hash below.
+
+AUCTION = 'auction'
+ONCHAIN = 'onchain'
+
+FIELDS = {
+    AUCTION: ['box_token_id', 'quantity', 'auction_start', 'auction_duration', 'initial_price'],
+    ONCHAIN: ['token_id', 'minimum_bid', 'bid_growth_factor', 'auction_start_date', 'auction_duration'],
+}
+
+FELT_BOUND = 2**251 + 17 * 2**192 + 1
+U64_BOUND = 2**64
+U128_BOUND = 2**128
+
+# field -> [min, max)
+BOUNDS = {
+    'box_token_id': (1, FELT_BOUND),
+    'token_id': (1, FELT_BOUND),
+    'quantity': (1, U64_BOUND),
+    'auction_start': (0, U64_BOUND),
+    'auction_start_date': (0, U64_BOUND),
+    'auction_duration': (1, U64_BOUND),
+    'initial_price': (0, U128_BOUND),
+    'minimum_bid': (0, U128_BOUND),
+    'bid_growth_factor': (0, U64_BOUND),
+}
+
+_BOUND_NAMES = {U64_BOUND: '2^64', U128_BOUND: '2^128', FELT_BOUND: 'P'}
+
+# Only list that many bad lots per problem, the count is always given.
+MAX_REPORTED = 10
+
+ONCHAIN_COMMENTS = {
+    'token_id': 'token ID',
+    'minimum_bid': 'minimum bid (wei)',
+    'bid_growth_factor': 'growth factor (in per mil)',
+    'auction_start_date': 'start date',
+    'auction_duration': 'duration',
+}
+
+ONCHAIN_HEADER = """%lang starknet
+
+from starkware.cairo.common.cairo_builtins import HashBuiltin
+
+from starkware.cairo.common.math import (
+    assert_le_felt,
+    assert_not_zero,
+)
+
+from starkware.cairo.common.registers import get_label_location
+
+from contracts.auction_onchain.data_link import AuctionData
+
+from contracts.auction_onchain.allowlist_{network} import _onlyAllowed
+
+@view
+func get_auction_data{{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}}(
+    auction_id: felt,
+) -> (
+    data: AuctionData,
+){{
+    // For convenience, the whitelist check is done here.
+    // This makes it easier to change on a per-network basis, and it's called as part of making bids anyways.
+{only_allowed}
+
+    let (start) = get_label_location(auction_data_start);
+    let (end) = get_label_location(auction_data_end);
+    
+    with_attr error_message("Invalid auction_id") {{
+        assert_not_zero(auction_id);
+        assert_le_felt(auction_id, (end - start) / AuctionData.SIZE);
+    }}
+
+    let data = cast(start + AuctionData.SIZE * (auction_id - 1), AuctionData*)[0];
+    return (data,);
+}}
+
+
+"""
+
+ONLY_ALLOWED = "    _onlyAllowed();"
+GENERAL_SALE = "    // Commented out for general sale.\n    //_onlyAllowed();"
+
+
+class Lots:
+    """
+    Auction lots as columns, one entry per lot.
+    :param auction_ids: 1-based ids, or None when lots are given in order.
+    :param names: optional label per lot, written as a comment by the onchain layout.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        auction_ids: Optional[np.ndarray] = None,
+        names: Optional[List[str]] = None,
+    ):
+        self.columns = columns
+        self.auction_ids = auction_ids
+        self.names = names
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+
+def _int(value) -> int:
+    return value if isinstance(value, int) else int(str(value).strip(), 0)
+
+
+def _column(values: list, name: str, errors: List[str]) -> np.ndarray:
+    column = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        try:
+            column[i] = _int(value)
+        except (TypeError, ValueError):
+            errors.append(f"lot {i + 1}: {name} {value!r} is not an integer")
+            column[i] = None
+    return column
+
+
+def _lots(rows: List[dict], layout: str) -> Lots:
+    errors = []
+    missing = [field for field in FIELDS[layout] if rows and field not in rows[0]]
+    if missing:
+        raise Exception(f"Auction data is missing columns: {', '.join(missing)}")
+    columns = {}
+    for field in FIELDS[layout]:
+        values = []
+        for i, row in enumerate(rows):
+            if field not in row:
+                errors.append(f"lot {i + 1}: no {field}")
+            values.append(row.get(field))
+        columns[field] = _column(values, field, errors)
+    auction_ids = None
+    if rows and 'auction_id' in rows[0]:
+        auction_ids = _column([row.get('auction_id') for row in rows], 'auction_id', errors)
+    names = [row.get('name') or None for row in rows] if rows and 'name' in rows[0] else None
+    if errors:
+        raise Exception(f"Malformed auction data ({len(errors)} errors):\n" + '\n'.join(errors))
+    return Lots(columns, auction_ids, names)
+
+
+def parse_json(text: str, layout: str) -> Lots:
+    """
+    A list of lots, or an object mapping auction ids to lots like generate_auction.auction_data.
+    [{"auction_id": 1, "name": "80sGymDuck.json", "token_id": "0x7792...", "minimum_bid": 50000000000000000, ...}, ...]
+    """
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = [{'auction_id': auction_id, **lot} for auction_id, lot in data.items()]
+    return _lots(data, layout)
+
+
+def parse_csv(text: str, layout: str) -> Lots:
+    """One lot per row, a column per field, optional auction_id and name columns."""
+    return _lots(list(csv.DictReader(io.StringIO(text))), layout)
+
+
+def load_lots(path: str, layout: str) -> Lots:
+    with open(path) as f:
+        text = f.read()
+    try:
+        return parse_csv(text, layout) if path.endswith('.csv') else parse_json(text, layout)
+    except (KeyError, ValueError) as e:
+        raise Exception(f"Malformed auction data {path}: {e!r}")
+
+
+def _report(errors: List[str], problem: str, labels: np.ndarray, bad: np.ndarray):
+    if len(bad) == 0:
+        return
+    shown = ', '.join(str(label) for label in labels[bad[:MAX_REPORTED]])
+    more = f" and {len(bad) - MAX_REPORTED} more" if len(bad) > MAX_REPORTED else ""
+    errors.append(f"{problem} ({len(bad)} lots): {shown}{more}")
+
+
+def validate_lots(lots: Lots, layout: str) -> Lots:
+    """
+    Check ids, quantities, dates and prices column by column, raising once with every problem.
+    :return: The lots ordered by auction id.
+    """
+    errors = []
+    nb_lots = len(lots)
+    if nb_lots == 0:
+        raise Exception("No auction lots")
+    labels = np.array([f"#{i + 1}" for i in range(nb_lots)], dtype=object)
+
+    order = np.arange(nb_lots)
+    if lots.auction_ids is not None:
+        ids = lots.auction_ids
+        in_range = (ids >= 1) & (ids <= nb_lots)
+        _report(errors, f"auction_id not in [1, {nb_lots}]", labels, np.flatnonzero(~in_range))
+        if in_range.all():
+            ids = ids.astype(np.int64)
+            counts = np.bincount(ids, minlength=nb_lots + 1)
+            duplicates = np.flatnonzero(counts[1:] > 1) + 1
+            if len(duplicates):
+                listed = ', '.join(str(i) for i in duplicates[:MAX_REPORTED])
+                errors.append(f"duplicate auction ids ({len(duplicates)}): {listed}")
+            missing = np.flatnonzero(counts[1:] == 0) + 1
+            if len(missing):
+                listed = ', '.join(str(i) for i in missing[:MAX_REPORTED])
+                errors.append(f"missing auction ids, they must be contiguous from 1 ({len(missing)}): {listed}")
+            order = np.argsort(ids, kind='stable')
+            labels = np.array([f"auction {i}" for i in ids], dtype=object)
+
+    for field in FIELDS[layout]:
+        low, high = BOUNDS[field]
+        column = lots.columns[field]
+        out_of_bounds = np.flatnonzero((column < low) | (column >= high))
+        _report(errors, f"{field} not in [{low}, {_BOUND_NAMES[high]})", labels, out_of_bounds)
+
+    start = 'auction_start' if layout == AUCTION else 'auction_start_date'
+    ends = lots.columns[start] + lots.columns['auction_duration']
+    _report(errors, "auction ends after 2^64", labels, np.flatnonzero(ends >= U64_BOUND))
+
+    if errors:
+        raise Exception(f"Invalid auction data ({len(errors)} errors):\n" + '\n'.join(errors))
+    return Lots(
+        {field: column[order] for field, column in lots.columns.items()},
+        None,
+        [lots.names[i] for i in order] if lots.names is not None else None,
+    )
+
+
+def write_auction_data(out: TextIO, lots: Lots, box_address: int, erc20_address: int):
+    """The AUCTION layout, as generate_auction, written lot by lot."""
+    out.write('%lang starknet\n')
+    out.write(f"const box_address = {box_address};\n")
+    out.write(f"const erc20_address = {erc20_address};\n")
+    out.write("auction_data_start:\n")
+    columns = [lots.columns[field] for field in FIELDS[AUCTION]]
+    for values in zip(*columns):
+        out.writelines(f"dw {value};\n" for value in values)
+    out.write("auction_data_end:\n")
+
+
+def write_onchain_data(out: TextIO, lots: Lots, network: str = 'mainnet', only_allowed: bool = False):
+    """The ONCHAIN layout, as contracts/auction_onchain/data_mainnet.cairo, written lot by lot."""
+    out.write(ONCHAIN_HEADER.format(network=network, only_allowed=ONLY_ALLOWED if only_allowed else GENERAL_SALE))
+    out.write("auction_data_start:\n")
+    columns = [lots.columns[field] for field in FIELDS[ONCHAIN]]
+    names = lots.names or [None] * len(lots)
+    for name, (token_id, *values) in zip(names, zip(*columns)):
+        if name:
+            out.write(f"// {name}\n")
+        out.write(f"dw {hex(token_id)}; // {ONCHAIN_COMMENTS['token_id']}\n")
+        for field, value in zip(FIELDS[ONCHAIN][1:], values):
+            out.write(f"dw {value}; // {ONCHAIN_COMMENTS[field]}\n")
+        out.write("\n")
+    out.write("auction_data_end:\n")
+
+
+def data_hash(path: str, cairo_path: Optional[List[str]] = None) -> int:
+    """
+    Class hash of the data contract at path: the value to declare it under and pass to auction_onchain.setDataHash_.
+    Only matches the declared class if it was compiled with the same cairo-lang version.
+    """
+    compiled = compile_starknet_files(
+        files=[path],
+        cairo_path=cairo_path or ['.', 'contracts/vendor'],
+        disable_hint_validation=True,
+        debug_info=False,
+    )
+    return compute_deprecated_class_hash(compiled)
+
+
+def write_auction_file(
+    source: str,
+    target: str,
+    layout: str = ONCHAIN,
+    network: str = 'mainnet',
+    only_allowed: bool = False,
+    box_address: int = 0,
+    erc20_address: int = 0,
+    cairo_path: Optional[List[str]] = None,
+) -> Optional[int]:
+    """
+    Load, validate and write a data contract.
+    :return: For the ONCHAIN layout, the data hash of the written contract.
+    """
+    if layout not in FIELDS:
+        raise Exception(f"Unknown auction layout '{layout}'")
+    lots = validate_lots(load_lots(source, layout), layout)
+    with open(target, 'w') as f:
+        if layout == AUCTION:
+            write_auction_data(f, lots, box_address, erc20_address)
+        else:
+            write_onchain_data(f, lots, network, only_allowed)
+    if layout == ONCHAIN:
+        return data_hash(target, cairo_path)
+    return None
@@ -1,3 +1,6 @@
+import io
+import math
+
 from briq_protocol.gen_shape_check import ShapeItem, generate_shape_check
 
 HEADER = """
@@ -6,6 +9,9 @@ HEADER = """
 mod shapes_verifier {
     use array::{SpanTrait, ArrayTrait};
     use option::OptionTrait;
+    use traits::{Into, Default};
+    use dict::Felt252DictTrait;
+    use poseidon::poseidon_hash_span;
 
     // Copied from briq_protocol to keep this simple.
     #[derive(Copy, Drop, Serde,)]
@@ -26,40 +32,176 @@ mod shapes_verifier {
     """
 
 
-def generate_binary_search_function(nft_ids, check_generator):
+BINARY = 'binary'
+JUMP_TABLE = 'jump_table'
+SPARSE = 'sparse'
+AUTO = 'auto'
+
+# Below this density (ids / id range), jump tables waste too many arms.
+JUMP_TABLE_MIN_DENSITY = 0.5
+# Above this many ids, bucketing keeps the top-level tree small.
+SPARSE_MIN_IDS = 64
+
+
+def generate_binary_search_function(nft_ids, check_generator, strategy=BINARY):
     """
     :param nft_ids: List of NFT IDs, sorted.
-    :param data_checks: List of code snippets for each NFT. Must be the same length as nft_ids.
+    :param check_generator: Returns the code snippet checking the shape of an NFT ID.
     :return: Contract function string.
     """
-    def recursive_search(low, high):
-        if low > high:
-            return ""  # or some other default action
+    out = io.StringIO()
+    write_verify_shape_function(out, nft_ids, check_generator, strategy)
+    return out.getvalue()
 
-        mid = (low + high) // 2
 
-        if low == high:
-            return f"if attribute_id == {nft_ids[mid]} {{\n    {check_generator(nft_ids[mid])}\n    return;\n}}"
-
-        return f"""
-        if attribute_id == {nft_ids[mid]} {{
-            {check_generator(nft_ids[mid])}
-        }} else if attribute_id < {nft_ids[mid]} {{
-            {recursive_search(low, mid - 1)}
-        }} else {{
-            {recursive_search(mid + 1, high)}
-        }}
-        """
-
-    return f"""
+def write_verify_shape_function(out, nft_ids, check_generator, strategy=AUTO):
+    """
+    Write the verify_shape function to `out`, dispatching on attribute_id with the given strategy.
+    :return: Number of comparisons needed to reach each NFT ID.
+    """
+    nft_ids = sorted(set(nft_ids))
+    if strategy == AUTO:
+        strategy = choose_strategy(nft_ids)
+    out.write("""
     #[external(v0)]
     fn verify_shape(
         self: @ContractState, attribute_id: u64, mut shape: Span<PackedShapeItem>, mut fts: Span<FTSpec>
-    ) {{
-        {recursive_search(0, len(nft_ids) - 1)}
-        assert(false, 'bad attribute ID');
-    }}
+    ) {
+""")
+
+    def write_leaf(id, indent):
+        return _write_check(out, id, check_generator, indent)
+
+    if not nft_ids:
+        depths = {}
+    elif strategy == BINARY:
+        depths = write_binary_tree(out, nft_ids, 'attribute_id', write_leaf, 2)
+    elif strategy == JUMP_TABLE:
+        depths = write_jump_table(out, nft_ids, 'attribute_id', write_leaf, 2)
+    elif strategy == SPARSE:
+        depths = _write_buckets(out, nft_ids, check_generator, 2)
+    else:
+        raise Exception(f"Unknown dispatch strategy '{strategy}'")
+    out.write("""        assert(false, 'bad attribute ID');
+    }
+""")
+    return depths
+
+
+def choose_strategy(nft_ids):
+    if not nft_ids:
+        return BINARY
+    if len(nft_ids) / (nft_ids[-1] - nft_ids[0] + 1) >= JUMP_TABLE_MIN_DENSITY:
+        return JUMP_TABLE
+    if len(nft_ids) >= SPARSE_MIN_IDS:
+        return SPARSE
+    return BINARY
+
+
+def depth_report(depths):
     """
+    :return: (worst case, average) number of comparisons.
+    """
+    if not depths:
+        return 0, 0
+    return max(depths.values()), sum(depths.values()) / len(depths)
+
+
+def _write_check(out, id, check_generator, indent):
+    pad = '    ' * indent
+    out.write(f"{pad}{check_generator(id)}\n{pad}return;\n")
+    return 0
+
+
+def write_binary_tree(out, keys, variable, write_leaf, indent):
+    """
+    Balanced if/else tree over sorted keys, emitted with an explicit stack.
+    Dispatch writer shared by the verifier and other generated lookups (see box_catalog).
+    :param variable: Name of the Cairo variable compared against the keys.
+    :param write_leaf: write_leaf(key, indent) writes the code for a key and returns the comparisons it adds.
+    :return: Number of comparisons to reach each key.
+    """
+    depths = {}
+    # Items are either text to write or (low, high, indent, comparisons so far) ranges to expand.
+    stack = [(0, len(keys) - 1, indent, 0)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            out.write(item)
+            continue
+        low, high, indent, comparisons = item
+        mid = (low + high) // 2
+        pad = '    ' * indent
+        out.write(f"{pad}if {variable} == {keys[mid]} {{\n")
+        depths[keys[mid]] = comparisons + 1 + write_leaf(keys[mid], indent + 1)
+        # Pushed in reverse order of emission.
+        # When one side is empty, unknown keys on that side still fail every equality check of the other.
+        stack.append(f"{pad}}}\n")
+        if low < mid and mid < high:
+            stack.append((mid + 1, high, indent + 1, comparisons + 2))
+            stack.append(f"{pad}}} else {{\n")
+            stack.append((low, mid - 1, indent + 1, comparisons + 2))
+            stack.append(f"{pad}}} else if {variable} < {keys[mid]} {{\n")
+        elif low < mid or mid < high:
+            if low < mid:
+                stack.append((low, mid - 1, indent + 1, comparisons + 1))
+            else:
+                stack.append((mid + 1, high, indent + 1, comparisons + 1))
+            stack.append(f"{pad}}} else {{\n")
+    return depths
+
+
+def write_jump_table(out, keys, variable, write_leaf, indent):
+    """
+    Range check then a match over sorted keys. Cairo match arms must be consecutive from 0,
+    so holes get an empty arm and fall through to whatever follows.
+    Same parameters as write_binary_tree.
+    :return: Number of comparisons to reach each key.
+    """
+    pad = '    ' * indent
+    first, last = keys[0], keys[-1]
+    out.write(f"{pad}if {variable} >= {first} && {variable} <= {last} {{\n")
+    out.write(f"{pad}    let {variable}_index: felt252 = ({variable} - {first}).into();\n")
+    out.write(f"{pad}    match {variable}_index {{\n")
+    depths = {}
+    present = set(keys)
+    for key in range(first, last + 1):
+        out.write(f"{pad}        {key - first} => {{\n")
+        if key in present:
+            # Two bound checks and the jump itself.
+            depths[key] = 3 + write_leaf(key, indent + 3)
+        out.write(f"{pad}        }},\n")
+    out.write(f"{pad}        _ => {{}},\n")
+    out.write(f"{pad}    }};\n")
+    out.write(f"{pad}}}\n")
+    return depths
+
+
+def _write_buckets(out, nft_ids, check_generator, indent):
+    """
+    Two levels: a jump table on attribute_id / 2^k, then a binary tree within each bucket.
+    """
+    # Aim for about sqrt(n) ids per bucket.
+    span = nft_ids[-1] - nft_ids[0] + 1
+    bucket_bits = max(0, (span // math.isqrt(len(nft_ids))).bit_length() - 1)
+    buckets = {}
+    for id in nft_ids:
+        buckets.setdefault(id >> bucket_bits, []).append(id)
+
+    out.write(f"{'    ' * indent}let bucket = attribute_id / {2 ** bucket_bits};\n")
+    depths = {}
+
+    def write_bucket(key, indent):
+        depths.update(write_binary_tree(
+            out, buckets[key], 'attribute_id', lambda id, indent: _write_check(out, id, check_generator, indent), indent
+        ))
+        return 0
+
+    bucket_depths = write_jump_table(out, sorted(buckets), 'bucket', write_bucket, indent)
+    for key, ids in buckets.items():
+        for id in ids:
+            depths[id] += bucket_depths[key]
+    return depths
 
 
 def shape_check(index):
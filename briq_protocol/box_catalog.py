@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .binomial_ifs import BINARY, JUMP_TABLE, JUMP_TABLE_MIN_DENSITY, write_binary_tree, write_jump_table
+
+# Box catalog for src/box_nft/catalog.cairo: what unboxing each box mints.
+# Sources are JSON (a list of boxes) or CSV (box_id, attribute_group_id, attribute_id,
+# then one briq_<material> column per material).
+
+DEFAULT_SOURCE = 'briq_protocol/data/box_catalog.json'
+DEFAULT_TARGET = 'src/box_nft/catalog.cairo'
+
+U64_BOUND = 2**64
+U128_BOUND = 2**128
+
+
+@dataclass
+class BoxEntry:
+    box_id: int
+    attribute_group_id: int
+    attribute_id: int
+    # material -> number of briqs
+    briqs: Dict[int, int] = field(default_factory=dict)
+
+
+def _int(value) -> int:
+    return value if isinstance(value, int) else int(str(value).strip(), 0)
+
+
+def parse_json(text: str) -> List[BoxEntry]:
+    """[{"box_id": 1, "attribute_group_id": 1, "attribute_id": 1, "briqs": {"0x1": 434}}, ...]"""
+    return [
+        BoxEntry(
+            box_id=_int(box['box_id']),
+            attribute_group_id=_int(box['attribute_group_id']),
+            attribute_id=_int(box['attribute_id']),
+            briqs={_int(material): _int(qty) for material, qty in box['briqs'].items()},
+        )
+        for box in json.loads(text)
+    ]
+
+
+def parse_csv(text: str) -> List[BoxEntry]:
+    entries = []
+    for row in csv.DictReader(io.StringIO(text)):
+        entries.append(BoxEntry(
+            box_id=_int(row['box_id']),
+            attribute_group_id=_int(row['attribute_group_id']),
+            attribute_id=_int(row['attribute_id']),
+            briqs={
+                _int(column[len('briq_'):]): _int(value)
+                for column, value in row.items()
+                if column.startswith('briq_') and value is not None and value.strip() not in ('', '0')
+            },
+        ))
+    return entries
+
+
+def load_catalog(path: str) -> List[BoxEntry]:
+    with open(path) as f:
+        text = f.read()
+    try:
+        return parse_csv(text) if path.endswith('.csv') else parse_json(text)
+    except (KeyError, ValueError) as e:
+        raise Exception(f"Malformed box catalog {path}: {e!r}")
+
+
+def validate_catalog(entries: List[BoxEntry]):
+    """Check every box and raise once, listing all the problems."""
+    errors = []
+    box_ids = {}
+    booklets = {}
+    for entry in entries:
+        where = f"box {entry.box_id}"
+        if not 0 < entry.box_id < U64_BOUND:
+            errors.append(f"{where}: box_id must be in [1, 2^64)")
+        if entry.box_id in box_ids:
+            errors.append(f"{where}: duplicate box_id")
+        box_ids[entry.box_id] = entry
+        for name in ('attribute_group_id', 'attribute_id'):
+            if not 0 < getattr(entry, name) < U64_BOUND:
+                errors.append(f"{where}: {name} must be in [1, 2^64)")
+        booklet = (entry.attribute_group_id, entry.attribute_id)
+        if booklet in booklets:
+            errors.append(f"{where}: same booklet as box {booklets[booklet]}")
+        booklets[booklet] = entry.box_id
+        if not any(entry.briqs.values()):
+            errors.append(f"{where}: no briqs")
+        for material, qty in entry.briqs.items():
+            if not 0 < material < U64_BOUND:
+                errors.append(f"{where}: bad material {hex(material)}")
+            if not 0 <= qty < U128_BOUND:
+                errors.append(f"{where}: bad quantity {qty} of material {hex(material)}")
+    if errors:
+        raise Exception(f"Invalid box catalog ({len(errors)} errors):\n" + '\n'.join(errors))
+
+
+def choose_strategy(box_ids: List[int]) -> str:
+    if len(box_ids) / (box_ids[-1] - box_ids[0] + 1) >= JUMP_TABLE_MIN_DENSITY:
+        return JUMP_TABLE
+    return BINARY
+
+
+def _box_info(entry: BoxEntry) -> str:
+    fts = ', '.join(
+        f"FTSpec {{ token_id: {hex(material)}, qty: {qty} }}" for material, qty in sorted(entry.briqs.items()) if qty
+    )
+    return (
+        f"BoxInfo {{ briqs: array![{fts}].span(), "
+        f"attribute_group_id: {entry.attribute_group_id}, attribute_id: {entry.attribute_id} }}"
+    )
+
+
+def generate_catalog(entries: List[BoxEntry], strategy: str = None, source: str = DEFAULT_SOURCE) -> str:
+    """
+    get_box_infos, dispatching on box_id with a jump table when ids are dense, a balanced tree otherwise,
+    so lookups don't get slower as boxes are added.
+    """
+    validate_catalog(entries)
+    by_id = {entry.box_id: entry for entry in entries}
+    box_ids = sorted(by_id)
+    strategy = strategy or choose_strategy(box_ids)
+
+    out = io.StringIO()
+    out.write(f"""// Generated by briq_protocol.box_catalog from {source}, do not edit.
+use array::ArrayTrait;
+use traits::{{Into, TryInto}};
+use option::OptionTrait;
+
+use briq_protocol::types::FTSpec;
+use briq_protocol::box_nft::unboxing::BoxInfo;
+
+fn get_box_infos(box_id: felt252) -> BoxInfo {{
+    let box_id: u64 = match box_id.try_into() {{
+        Option::Some(box_id) => box_id,
+        Option::None => panic_with_felt252('invalid box id'),
+    }};
+""")
+
+    def write_leaf(box_id, indent):
+        out.write(f"{'    ' * indent}return {_box_info(by_id[box_id])};\n")
+        return 0
+
+    if strategy == JUMP_TABLE:
+        write_jump_table(out, box_ids, 'box_id', write_leaf, 1)
+    elif strategy == BINARY:
+        write_binary_tree(out, box_ids, 'box_id', write_leaf, 1)
+    else:
+        raise Exception(f"Unknown dispatch strategy '{strategy}'")
+    out.write("""    assert(false, 'invalid box id');
+    BoxInfo { briqs: array![].span(), attribute_group_id: 0, attribute_id: 0 }
+}
+""")
+    return out.getvalue()
+
+
+def write_catalog(source: str = DEFAULT_SOURCE, target: str = DEFAULT_TARGET):
+    code = generate_catalog(load_catalog(source), source=source)
+    with open(target, 'w') as f:
+        f.write(code)
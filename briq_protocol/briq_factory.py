@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from math import isqrt
+
+import numpy as np
+
+# Python port of the briq_factory pricing (src/briq_factory/models.cairo), bit-exact with the contract.
+# The contract works on felts: +, -, * wrap mod P, while / and comparisons go through u256
+# on the canonical representative (see felt_math.cairo). RAW_FLOOR is therefore P - 10**13.
+#
+# Every function accepts python ints or numpy arrays (broadcast together), so quotes
+# for many (t, surge_t, amount) can be computed in one call.
+
+P = 2 ** 251 + 17 * 2 ** 192 + 1
+
+
+@dataclass(frozen=True)
+class BriqFactoryParams:
+    """Mirrors src/briq_factory/constants.cairo."""
+    decimals: int = 10 ** 18
+    inflection_point: int = 400000 * 10 ** 18
+    slope: int = 10 ** 8
+    raw_floor: int = -10 ** 13
+    lower_floor: int = 10 ** 13
+    lower_slope: int = 5 * 10 ** 7
+    decay_per_second: int = 6337791082068820
+    surge_slope: int = 10 ** 8
+    minimal_surge: int = 250000 * 10 ** 18
+    surge_decay_per_second: int = 4134 * 10 ** 14
+    min_purchase: int = 9
+    # buy() takes a u32 amount.
+    max_purchase: int = 2 ** 32 - 1
+
+
+DEFAULT_PARAMS = BriqFactoryParams()
+
+
+def felt(value):
+    """Canonical representative, for ints or arrays."""
+    if isinstance(value, np.ndarray):
+        return np.asarray(value, dtype=object) % P
+    return int(value) % P
+
+
+def _check(condition, error):
+    if not np.all(condition):
+        raise Exception(error)
+
+
+def _as_felts(*values):
+    """Broadcast values together as object arrays of felts. Also returns whether the inputs were all scalars."""
+    scalar = all(np.ndim(v) == 0 and not isinstance(v, np.ndarray) for v in values)
+    # At least 1-d: operations on 0-d object arrays would decay to python ints.
+    arrays = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(v, dtype=object) if isinstance(v, np.ndarray) else np.array(int(v), dtype=object))
+        for v in values
+    ])
+    return [a.astype(object) % P for a in arrays], scalar
+
+
+def _result(value, scalar):
+    return int(value[0]) if scalar else value
+
+
+def get_lin_integral(slope, floor, t2, t1, params: BriqFactoryParams = DEFAULT_PARAMS):
+    (slope, floor, t2, t1), scalar = _as_felts(slope, floor, t2, t1)
+    D = params.decimals
+    _check(t2 < t1, 't1 >= t2')
+    # briq machine broke above 10^12 bricks of demand.
+    _check(t2 < D * 10 ** 12, 't2 >= 10**12')
+    _check((t1 - t2) % P < D * 10 ** 10, 't1-t2 >= 10**10')
+
+    q = (slope * (t1 + t2) % P) // D
+    q = (q * (t1 - t2) % P) // D // 2
+    floor_q = (floor * (t1 - t2) % P) // D
+    return _result((q + floor_q) % P, scalar)
+
+
+def get_lin_integral_negative_floor(slope, floor, t2, t1, params: BriqFactoryParams = DEFAULT_PARAMS):
+    (slope, floor, t2, t1), scalar = _as_felts(slope, floor, t2, t1)
+    D = params.decimals
+    _check(t2 < t1, 't1 >= t2')
+    _check(t2 < D * 10 ** 12, 't2 >= 10**12')
+    _check((t1 - t2) % P < D * 10 ** 10, 't1-t2 >= 10**10')
+
+    q = (slope * (t1 + t2) % P) // D
+    q = (q * (t1 - t2) % P) // D // 2
+    # Floor is negative. t2 < t1 so invert these, then subtract instead of adding.
+    floor_q = (floor * (t2 - t1) % P) // D
+    return _result((q - floor_q) % P, scalar)
+
+
+def integrate(t, amount, params: BriqFactoryParams = DEFAULT_PARAMS):
+    """:param amount: in DECIMALS units, like the contract."""
+    if isinstance(t, int) and isinstance(amount, int):
+        return _integrate_int(t % P, amount % P, params)
+    (t, amount), scalar = _as_felts(t, amount)
+    ip = params.inflection_point
+    end = (t + amount) % P
+    out = np.zeros(t.shape, dtype=object)
+
+    # Same three cases as the contract, each evaluated on its own rows only so asserts match.
+    below = end <= ip
+    above = ~below & (ip <= t)
+    across = ~below & ~above
+    if below.any():
+        out[below] = get_lin_integral(params.lower_slope, params.lower_floor, t[below], end[below], params)
+    if above.any():
+        out[above] = get_lin_integral_negative_floor(params.slope, params.raw_floor, t[above], end[above], params)
+    if across.any():
+        inflection = np.full(across.sum(), ip, dtype=object)
+        out[across] = (
+            get_lin_integral(params.lower_slope, params.lower_floor, t[across], inflection, params)
+            + get_lin_integral_negative_floor(params.slope, params.raw_floor, inflection, end[across], params)
+        ) % P
+    return _result(out, scalar)
+
+
+def get_surge_price(surge_t, amount, params: BriqFactoryParams = DEFAULT_PARAMS):
+    """:param amount: in DECIMALS units, like the contract."""
+    if isinstance(surge_t, int) and isinstance(amount, int):
+        return _surge_price_int(surge_t % P, amount % P, params)
+    (surge_t, amount), scalar = _as_felts(surge_t, amount)
+    ms = params.minimal_surge
+    end = (surge_t + amount) % P
+    out = np.zeros(surge_t.shape, dtype=object)
+
+    surging = ~(end <= ms)
+    started = surging & (surge_t > ms)
+    starting = surging & ~started
+    if started.any():
+        out[started] = get_lin_integral(
+            params.surge_slope, 0, (surge_t[started] - ms) % P, (end[started] - ms) % P, params
+        )
+    if starting.any():
+        out[starting] = get_lin_integral(params.surge_slope, 0, 0, (end[starting] - ms) % P, params)
+    return _result(out, scalar)
+
+
+def get_price(t, surge_t, amount, params: BriqFactoryParams = DEFAULT_PARAMS):
+    """
+    Price of `amount` briqs (a plain count) given the factory's current t and surge_t, as BriqFactoryTrait::get_price.
+    All arguments broadcast: pass arrays to quote many purchases at once.
+    """
+    if all(isinstance(v, int) for v in (t, surge_t, amount)):
+        return _get_price_int(t % P, surge_t % P, amount * params.decimals % P, params)
+    (t, surge_t, amount), scalar = _as_felts(t, surge_t, amount)
+    amount = amount * params.decimals % P
+    price = (integrate(t, amount, params) + get_surge_price(surge_t, amount, params)) % P
+    return _result(price, scalar)
+
+
+# Same computations on python ints: a single quote is several times faster than through object arrays.
+
+def _lin_integral_int(slope, floor, t2, t1, negative_floor, D):
+    if not t2 < t1:
+        raise Exception('t1 >= t2')
+    if not t2 < D * 10 ** 12:
+        raise Exception('t2 >= 10**12')
+    if not (t1 - t2) % P < D * 10 ** 10:
+        raise Exception('t1-t2 >= 10**10')
+    q = (slope * (t1 + t2) % P) // D
+    q = (q * (t1 - t2) % P) // D // 2
+    if negative_floor:
+        return (q - (floor * (t2 - t1) % P) // D) % P
+    return (q + (floor * (t1 - t2) % P) // D) % P
+
+
+def _integrate_int(t, amount, params):
+    D, ip = params.decimals, params.inflection_point
+    lower = (params.lower_slope % P, params.lower_floor % P)
+    upper = (params.slope % P, params.raw_floor % P)
+    end = (t + amount) % P
+    if end <= ip:
+        return _lin_integral_int(*lower, t, end, False, D)
+    if ip <= t:
+        return _lin_integral_int(*upper, t, end, True, D)
+    return (_lin_integral_int(*lower, t, ip, False, D) + _lin_integral_int(*upper, ip, end, True, D)) % P
+
+
+def _surge_price_int(surge_t, amount, params):
+    ms = params.minimal_surge
+    end = (surge_t + amount) % P
+    if end <= ms:
+        return 0
+    start = (surge_t - ms) % P if surge_t > ms else 0
+    return _lin_integral_int(params.surge_slope % P, 0, start, (end - ms) % P, False, params.decimals)
+
+
+def _get_price_int(t, surge_t, amount, params):
+    return (_integrate_int(t, amount, params) + _surge_price_int(surge_t, amount, params)) % P
+
+
+def get_max_amount(t: int, surge_t: int, budget: int, params: BriqFactoryParams = DEFAULT_PARAMS) -> int:
+    """
+    Largest amount of briqs whose get_price fits in budget (0 if not even one), as BriqFactoryTrait::get_max_amount.
+    Within a segment between the inflection point and the surge threshold, the price is quadratic in the amount:
+    solve it from the marginal price at the segment start, then step by one with the forward function.
+    """
+    D = params.decimals
+
+    def cost(amount):
+        return 0 if amount == 0 else get_price(t, surge_t, amount, params)
+
+    if cost(1) > budget:
+        return 0
+    if cost(params.max_purchase) <= budget:
+        return params.max_purchase
+
+    # Segment starts, in briqs rounded up so the slopes past the start are the ones of the segment:
+    # the last one already affordable is where the budget runs out.
+    start = 0
+    for breakpoint, position in [(params.inflection_point, t), (params.minimal_surge, surge_t)]:
+        if position < breakpoint:
+            amount = -((position - breakpoint) // D)
+            if start < amount < params.max_purchase and cost(amount) <= budget:
+                start = amount
+
+    x0 = t + start * D
+    if x0 < params.inflection_point:
+        marginal, slope = params.lower_slope * x0 + params.lower_floor * D, params.lower_slope
+    else:
+        marginal, slope = params.slope * x0 + params.raw_floor * D, params.slope
+    surge_x0 = surge_t + start * D
+    if surge_x0 >= params.minimal_surge:
+        marginal += params.surge_slope * (surge_x0 - params.minimal_surge)
+        slope += params.surge_slope
+
+    # cost(start + d) ~= cost(start) + marginal * d / D + slope * d^2 / 2
+    remaining = budget - cost(start)
+    d = (isqrt(marginal * marginal + 2 * slope * D * D * remaining) - marginal) // (slope * D)
+    amount = min(start + d, params.max_purchase)
+    while amount < params.max_purchase and cost(amount + 1) <= budget:
+        amount += 1
+    while amount > 0 and cost(amount) > budget:
+        amount -= 1
+    return amount
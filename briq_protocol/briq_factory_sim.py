@@ -0,0 +1,202 @@
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from briq_protocol.briq_factory import DEFAULT_PARAMS, P, BriqFactoryParams, get_price, get_surge_price
+
+# Replays purchases against the briq_factory curve with the store updates and the t / surge_t decay
+# that are currently commented out in src/briq_factory (buy, get_current_t, get_surge_t).
+
+
+@dataclass(frozen=True)
+class FactoryState:
+    """Mirrors BriqFactoryStore, minus the keys."""
+    last_stored_t: int = 0
+    surge_t: int = 0
+    last_purchase_time: int = 0
+
+
+@dataclass(frozen=True)
+class Purchases:
+    """A stream of BriqsBought, sorted by timestamp."""
+    timestamp: np.ndarray
+    amount: np.ndarray
+
+    def __post_init__(self):
+        if len(self.timestamp) != len(self.amount):
+            raise Exception("Timestamps and amounts have different lengths")
+        if len(self.timestamp) and np.any(np.diff(self.timestamp) < 0):
+            raise Exception("Purchases must be sorted by timestamp")
+
+    def __len__(self):
+        return len(self.timestamp)
+
+
+def _decayed(value: int, elapsed: int, per_second: int) -> int:
+    # Same comparison as the contract: felt252 ordering on the canonical values.
+    decay = elapsed * per_second % P
+    return 0 if value <= decay else value - decay
+
+
+def _elapsed(state: FactoryState, now: int) -> int:
+    # u64 in the contract.
+    if now < state.last_purchase_time:
+        raise Exception('u64_sub Overflow')
+    return now - state.last_purchase_time
+
+
+def get_current_t(state: FactoryState, now: int, params: BriqFactoryParams = DEFAULT_PARAMS) -> int:
+    return _decayed(state.last_stored_t, _elapsed(state, now), params.decay_per_second)
+
+
+def get_surge_t(state: FactoryState, now: int, params: BriqFactoryParams = DEFAULT_PARAMS) -> int:
+    return _decayed(state.surge_t, _elapsed(state, now), params.surge_decay_per_second)
+
+
+def buy(state: FactoryState, now: int, amount: int, params: BriqFactoryParams = DEFAULT_PARAMS):
+    """
+    One purchase, as briq_factory.buy with the store update enabled.
+    :return: (price, new state). Raises like the contract on amounts it would reject.
+    """
+    if amount < params.min_purchase:
+        raise Exception('amount too low !')
+    t = get_current_t(state, now, params)
+    surge_t = get_surge_t(state, now, params)
+    price = get_price(t, surge_t, amount, params)
+    return price, FactoryState(
+        last_stored_t=(t + amount * params.decimals) % P,
+        surge_t=(surge_t + amount * params.decimals) % P,
+        last_purchase_time=now,
+    )
+
+
+def simulate(
+    purchases: Purchases,
+    params: BriqFactoryParams = DEFAULT_PARAMS,
+    initial: FactoryState = FactoryState(),
+    decay: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Replay purchases in order. Purchases the contract would revert are recorded with reverted=True
+    and leave the state untouched.
+    :param decay: False to keep the currently deployed behaviour of t and surge_t never decaying.
+    :return: Columns, one row per purchase. t and surge_t are in briqs (float), prices in wei (float);
+        exact integer totals are in summarize().
+    """
+    if not decay:
+        params = replace(params, decay_per_second=0, surge_decay_per_second=0)
+    n = len(purchases)
+    columns = {
+        'timestamp': np.asarray(purchases.timestamp, dtype=np.int64),
+        'amount': np.asarray(purchases.amount, dtype=np.int64),
+        't': np.zeros(n),
+        'surge_t': np.zeros(n),
+        'price': np.zeros(n),
+        'surge_price': np.zeros(n),
+        'reverted': np.zeros(n, dtype=bool),
+    }
+    revenue = 0
+    state = initial
+    for i, (now, amount) in enumerate(zip(columns['timestamp'].tolist(), columns['amount'].tolist())):
+        try:
+            t = get_current_t(state, now, params)
+            surge_t = get_surge_t(state, now, params)
+            price, state = buy(state, now, amount, params)
+        except Exception:
+            columns['reverted'][i] = True
+            continue
+        columns['t'][i] = t / params.decimals
+        columns['surge_t'][i] = surge_t / params.decimals
+        revenue += price
+        columns['price'][i] = price
+        columns['surge_price'][i] = get_surge_price(surge_t, amount * params.decimals, params)
+    columns['revenue'] = np.array(str(revenue))
+    columns['final_state'] = np.array([str(state.last_stored_t), str(state.surge_t), str(state.last_purchase_time)])
+    return columns
+
+
+def summarize(columns: Dict[str, np.ndarray]) -> dict:
+    ok = ~columns['reverted']
+    return {
+        'purchases': int(ok.sum()),
+        'reverted': int((~ok).sum()),
+        'briqs': int(columns['amount'][ok].sum()),
+        'revenue': int(str(columns['revenue'])),
+        'surge_revenue': float(columns['surge_price'][ok].sum()),
+        'surging_purchases': int((columns['surge_price'][ok] > 0).sum()),
+        'max_price_per_briq': float((columns['price'][ok] / columns['amount'][ok]).max()) if ok.any() else 0.0,
+    }
+
+
+def poisson_purchases(
+    rate_per_day: float, days: float, mean_amount: float, start: int = 0, seed: Optional[int] = None,
+) -> Purchases:
+    """Synthetic arrivals: exponential inter-arrival times, geometric amounts (at least MIN_PURCHASE)."""
+    rng = np.random.default_rng(seed)
+    n = rng.poisson(rate_per_day * days)
+    timestamp = start + np.sort(rng.uniform(0, days * 86400, n)).astype(np.int64)
+    amount = np.maximum(rng.geometric(1 / mean_amount, n), DEFAULT_PARAMS.min_purchase).astype(np.int64)
+    return Purchases(timestamp, amount)
+
+
+def load_purchases(path: str) -> Purchases:
+    """
+    BriqsBought events, as JSON (a list, or one object per line) or CSV, with 'amount' and
+    'timestamp' (or 'block_timestamp') fields. Other fields (buyer, price) are ignored.
+    """
+    with open(path) as f:
+        if path.endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            text = f.read().strip()
+            if text.startswith('['):
+                rows = json.loads(text)
+            else:
+                rows = [json.loads(line) for line in text.splitlines() if line]
+    try:
+        timestamp = [int(str(row['timestamp'] if 'timestamp' in row else row['block_timestamp']), 0) for row in rows]
+        amount = [int(str(row['amount']), 0) for row in rows]
+    except KeyError as e:
+        raise Exception(f"Missing field {e} in purchases from {path}")
+    order = np.argsort(timestamp, kind='stable')
+    return Purchases(np.array(timestamp, dtype=np.int64)[order], np.array(amount, dtype=np.int64)[order])
+
+
+def _simulate_one(args):
+    return simulate(*args)
+
+
+def simulate_many(
+    purchases: Purchases,
+    param_sets: List[BriqFactoryParams],
+    initial: FactoryState = FactoryState(),
+    decay: bool = True,
+    workers: Optional[int] = None,
+) -> List[Dict[str, np.ndarray]]:
+    """
+    simulate() for each parameter set, across processes.
+    :param workers: Number of processes, 0 to run serially in this process.
+    """
+    jobs = [(purchases, params, initial, decay) for params in param_sets]
+    if workers == 0:
+        return [_simulate_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_simulate_one, jobs))
+
+
+def save_results(path: str, param_sets: List[BriqFactoryParams], results: List[Dict[str, np.ndarray]]):
+    """
+    One .npz with a (nb parameter sets, nb purchases) array per column,
+    plus each parameter as a (nb parameter sets,) array under 'param_<name>'.
+    """
+    arrays = {}
+    for name in results[0]:
+        arrays[name] = np.stack([result[name] for result in results])
+    for name in BriqFactoryParams.__dataclass_fields__:
+        # Some parameters don't fit in int64.
+        arrays[f'param_{name}'] = np.array([str(getattr(params, name)) for params in param_sets])
+    np.savez_compressed(path, **arrays)
@@ -0,0 +1,163 @@
+import hashlib
+import inspect
+import io
+import json
+import os
+import sys
+from collections import Counter
+from functools import lru_cache
+
+from briq_protocol import binomial_ifs, gen_shape_check
+from briq_protocol.binomial_ifs import HEADER, write_verify_shape_function
+from briq_protocol.gen_shape_check import ANY_MATERIAL_ANY_COLOR, generate_optimized_shape_check
+
+DEFAULT_CACHE_DIR = '.briq_cache'
+
+# Modules whose code produces the verifier, see generator_modules.
+VERIFIER_MODULES = (binomial_ifs, gen_shape_check, sys.modules[__name__])
+
+
+def generator_modules(*modules) -> list:
+    """
+    The given modules and the briq_protocol modules they import from, by name.
+    Their source is part of every cache key, so editing a template or a cost constant invalidates the cache.
+    """
+    names = set()
+    for module in modules:
+        names.add(module.__name__)
+        for value in vars(module).values():
+            name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if isinstance(name, str) and name.split('.')[0] == 'briq_protocol':
+                names.add(name)
+    return sorted(names)
+
+
+@lru_cache(maxsize=None)
+def _source_hash(module_names: tuple) -> bytes:
+    hasher = hashlib.sha256()
+    for name in generator_modules(*(sys.modules[name] for name in module_names)):
+        hasher.update(inspect.getsource(sys.modules[name]).encode())
+    return hasher.digest()
+
+
+def content_hash(*parts, modules=VERIFIER_MODULES) -> str:
+    hasher = hashlib.sha256(_source_hash(tuple(module.__name__ for module in modules)))
+    for part in parts:
+        hasher.update(b'\0')
+        hasher.update(part if isinstance(part, bytes) else repr(part).encode())
+    return hasher.hexdigest()
+
+
+def canonical_shape(shape):
+    """Packed form of a shape as seen by its verifier: color/material is irrelevant for any items."""
+    return tuple(
+        (0 if item.material == ANY_MATERIAL_ANY_COLOR else item.color_material, item.x_y_z) for item in shape
+    )
+
+
+class BuildCache:
+    """
+    On-disk store of generated fragments keyed by the hash of their inputs,
+    plus the input hash of every output file so unchanged outputs aren't regenerated.
+    stats counts 'reused' and 'generated' fragments, and 'written' and 'up_to_date' outputs.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.stats = Counter()
+        os.makedirs(os.path.join(cache_dir, 'fragments'), exist_ok=True)
+        self._outputs_path = os.path.join(cache_dir, 'outputs.json')
+        try:
+            with open(self._outputs_path) as f:
+                self._outputs = json.load(f)
+        except FileNotFoundError:
+            self._outputs = {}
+
+    @property
+    def work_done(self):
+        return self.stats['generated'] + self.stats['written']
+
+    def fragment(self, key, generate) -> str:
+        path = os.path.join(self.cache_dir, 'fragments', key)
+        try:
+            with open(path) as f:
+                text = f.read()
+            self.stats['reused'] += 1
+            return text
+        except FileNotFoundError:
+            pass
+        text = generate()
+        with open(path + '.tmp', 'w') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+        self.stats['generated'] += 1
+        return text
+
+    def output(self, path, key, generate) -> bool:
+        """
+        Write generate() to path unless the inputs (key) and the file on disk are unchanged since the last build.
+        :return: Whether the file was written.
+        """
+        known = self._outputs.get(os.path.abspath(path))
+        if known and known['key'] == key and _file_hash(path) == known['output']:
+            self.stats['up_to_date'] += 1
+            return False
+        content = generate()
+        output = hashlib.sha256(content.encode()).hexdigest()
+        if _file_hash(path) != output:
+            with open(path, 'w') as f:
+                f.write(content)
+            self.stats['written'] += 1
+        else:
+            self.stats['up_to_date'] += 1
+        self._outputs[os.path.abspath(path)] = {'key': key, 'output': output}
+        with open(self._outputs_path, 'w') as f:
+            json.dump(self._outputs, f, indent=2, sort_keys=True)
+        return True
+
+    def summary(self) -> str:
+        if self.work_done == 0:
+            return "Nothing to do, all outputs up to date."
+        return (
+            f"{self.stats['generated']} fragments generated, {self.stats['reused']} reused, "
+            f"{self.stats['written']} files written, {self.stats['up_to_date']} up to date."
+        )
+
+
+def build_verifier(cache: BuildCache, path: str, shapes, report=print) -> bool:
+    """
+    Cached equivalent of writing HEADER + a verify_shape dispatch over shapes (attribute_id -> shape) + '}'.
+    Only shapes whose canonical packed form changed get their check re-generated.
+    """
+    keys = {id: content_hash('shape_check', canonical_shape(shape)) for id, shape in shapes.items()}
+
+    def generate():
+        out = io.StringIO()
+        out.write(HEADER)
+        write_verify_shape_function(out, sorted(shapes), lambda id: cache.fragment(
+            keys[id], lambda: generate_optimized_shape_check(shapes[id], name=hex(id), report=report)
+        ))
+        out.write("}\n")
+        return out.getvalue()
+
+    return cache.output(path, content_hash('verifier', sorted(keys.items())), generate)
+
+
+def build_data(cache: BuildCache, path: str, generator, **kwargs) -> bool:
+    """Cached call to a data contract generator such as generate_box or generate_auction."""
+    # Bind the defaults too: the generators take their data from module level defaults.
+    arguments = inspect.signature(generator).bind(**kwargs)
+    arguments.apply_defaults()
+    key = content_hash(
+        generator.__module__, generator.__name__, sorted(arguments.arguments.items()),
+        modules=[sys.modules[generator.__module__]],
+    )
+    return cache.output(path, key, lambda: generator(**kwargs))
+
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
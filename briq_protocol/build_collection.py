@@ -0,0 +1,95 @@
+import io
+from typing import Dict, List, Optional, Tuple
+
+from briq_protocol.binomial_ifs import AUTO, HEADER, write_verify_shape_function
+from briq_protocol.gen_shape_check import generate_optimized_shape_check
+from briq_protocol.generate_shape import (
+    ft_counts,
+    ft_data_lines,
+    nft_data_lines,
+    nft_position_lines,
+    offset_lines,
+    section_code,
+    shape_data_lines,
+)
+from briq_protocol.parallel import chunks, map_chunks, pool
+
+# Per-shape work is small, so hand it to workers in chunks to amortize pickling and IPC.
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _shape_data_chunk(shapes: List[Tuple[list, list]]) -> Tuple[str, str, str, List[int], str]:
+    counts = [ft_counts(shape) for shape in shapes]
+    return (
+        '\n'.join(shape_data_lines(shapes)),
+        '\n'.join(nft_data_lines(shapes)),
+        '\n'.join(nft_position_lines(shapes)),
+        [len(c) for c in counts],
+        '\n'.join(ft_data_lines(counts)),
+    )
+
+
+def _shape_check_chunk(shapes: List[Tuple[int, list]]) -> List[Tuple[str, List[str]]]:
+    results = []
+    for attribute_id, shape in shapes:
+        lines = []
+        results.append((generate_optimized_shape_check(shape, name=hex(attribute_id), report=lines.append), lines))
+    return results
+
+
+def _chunk_lines(chunks, index):
+    # Empty chunks hold no lines.
+    return (chunk[index] for chunk in chunks if chunk[index])
+
+
+def generate_shape_code_parallel(
+    shapes: List[Tuple[list, list]],
+    index_start: int = 1,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> str:
+    """
+    Same output as generate_shape.generate_shape_code, with the shape data emitted across processes.
+    :param workers: Number of processes, 0 to run serially in this process.
+    """
+    with pool(workers) as executor:
+        data = list(map_chunks(executor, _shape_data_chunk, chunks(shapes, chunk_size)))
+
+    return ''.join(section_code(index_start, [
+        offset_lines(len(shape[0]) for shape in shapes),
+        _chunk_lines(data, 0),
+        offset_lines(len(shape[1]) for shape in shapes),
+        _chunk_lines(data, 1),
+        _chunk_lines(data, 2),
+        offset_lines(length for chunk in data for length in chunk[3]),
+        _chunk_lines(data, 4),
+    ]))
+
+
+def generate_verifier_parallel(
+    shapes: Dict[int, list],
+    strategy: str = AUTO,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report=print,
+) -> str:
+    """
+    Verifier contract for a whole collection (attribute_id -> shape), shape checks generated across processes.
+    Reports are printed from this process, in attribute id order.
+    """
+    ids = sorted(shapes)
+    checks = {}
+    with pool(workers) as executor:
+        results_chunks = map_chunks(executor, _shape_check_chunk, chunks(((id, shapes[id]) for id in ids), chunk_size))
+        for chunk_ids, results in zip(chunks(ids, chunk_size), results_chunks):
+            for attribute_id, (check, lines) in zip(chunk_ids, results):
+                checks[attribute_id] = check
+                if report is not None:
+                    for line in lines:
+                        report(line)
+
+    out = io.StringIO()
+    out.write(HEADER)
+    write_verify_shape_function(out, ids, checks.__getitem__, strategy)
+    out.write("}\n")
+    return out.getvalue()
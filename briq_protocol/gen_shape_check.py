@@ -1,6 +1,6 @@
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Tuple
 
 ANY_MATERIAL_ANY_COLOR = 0
 
@@ -12,8 +12,12 @@ def generate_shape_check(shape):
         if shapeItem.material not in materials:
             materials[shapeItem.material] = 0
         materials[shapeItem.material] += 1
+    return shape_check_header(len(shape)) + '\n'.join([item_check(item) for item in shape])
+
+
+def shape_check_header(nb_items):
     return f"""
-    assert(shape.len() == {len(shape)}, 'bad shape length');
+    assert(shape.len() == {nb_items}, 'bad shape length');
     let mut ftsum = 0;
     loop {{
         if fts.len() == 0 {{
@@ -22,7 +26,7 @@ def generate_shape_check(shape):
         ftsum = ftsum + *(fts.pop_front().unwrap().qty);
     }};
     assert(ftsum == shape.len().into(), 'bad fts spec');
-""" + '\n'.join([item_check(item) for item in shape])
+"""
 
 
 def item_check(item):
@@ -35,6 +39,244 @@ def item_check(item):
     return "\n    ".join(out)
 
 
+ITEMS = 'items'
+RUNS = 'runs'
+DIGEST = 'digest'
+HISTOGRAM = 'histogram'
+
+# Cost model of the generated code, as (steps, bytecode) per construct.
+# Steps are Cairo VM steps, bytecode is felts in the compiled class. Measured on verify_shape contracts
+# (binomial_ifs.HEADER) built with starknet-compile 2.1.0 and run on cairo-lang 0.12.2, net of the same contract
+# with an empty check, for 10 to 40 items: the model is within 1% of every measurement.
+# One felt of bytecode is weighted as BYTECODE_WEIGHT steps, since class size is paid for at declare time and on
+# every library call. That weight is a policy choice, not a measurement.
+BYTECODE_WEIGHT = 2
+# Length and fts sum checks.
+COST_HEADER = (100, 264)
+# pop_front + 1 or 2 assert_eq on felt constants, constants inlined in the bytecode.
+COST_ITEM_CHECK = (30, 78)
+COST_ITEM_POSITION_CHECK = (19, 56)
+# A loop over a run: fixed setup, then per item.
+COST_RUN_SETUP = (25, 175)
+COST_RUN_ITEM = (54, 0)
+# Copy into an array then one Poseidon permutation per 2 felts.
+COST_DIGEST_SETUP = (112, 392)
+COST_DIGEST_FELT = (50, 0)
+# Felt252Dict update + u256 split to extract the material, then one dict read per FT.
+COST_HISTOGRAM_SETUP = (43, 1084)
+COST_HISTOGRAM_ITEM = (133, 0)
+COST_HISTOGRAM_FT = (271, 0)
+# Runs shorter than this are cheaper as individual asserts.
+MIN_RUN_LENGTH = 3
+
+
+def _cost(*parts):
+    steps = sum(p[0] * count for p, count in parts)
+    bytecode = sum(p[1] * count for p, count in parts)
+    return steps, bytecode
+
+
+def run_length_encode(shape):
+    """
+    Group consecutive items whose x_y_z increase by one and whose color/material is the same.
+    :return: List of (first item, run length).
+    """
+    runs = []
+    for item in shape:
+        if runs:
+            first, length = runs[-1]
+            is_any = item.material == ANY_MATERIAL_ANY_COLOR
+            if item.x_y_z == first.x_y_z + length and is_any == (first.material == ANY_MATERIAL_ANY_COLOR) and (
+                is_any or item.color_material == first.color_material
+            ):
+                runs[-1] = (first, length + 1)
+                continue
+        runs.append((item, 1))
+    return runs
+
+
+def estimate_shape_check_costs(shape) -> Dict[str, int]:
+    """
+    :return: Estimated cost for each applicable strategy.
+    """
+    return {
+        strategy: steps + BYTECODE_WEIGHT * bytecode
+        for strategy, (steps, bytecode) in estimate_shape_check(shape).items()
+    }
+
+
+def estimate_shape_check(shape) -> Dict[str, Tuple[int, int]]:
+    """
+    :return: Estimated (steps, bytecode) for each applicable strategy.
+    """
+    nb_items = len(shape)
+    nb_any = sum(1 for item in shape if item.material == ANY_MATERIAL_ANY_COLOR)
+    runs = run_length_encode(shape)
+    long_runs = [length for _, length in runs if length >= MIN_RUN_LENGTH]
+    short_runs = [(first, length) for first, length in runs if length < MIN_RUN_LENGTH]
+    short_any = sum(length for first, length in short_runs if first.material == ANY_MATERIAL_ANY_COLOR)
+
+    costs = {
+        ITEMS: _cost((COST_HEADER, 1), (COST_ITEM_CHECK, nb_items - nb_any), (COST_ITEM_POSITION_CHECK, nb_any)),
+        RUNS: _cost(
+            (COST_HEADER, 1),
+            (COST_RUN_SETUP, len(long_runs)),
+            (COST_RUN_ITEM, sum(long_runs)),
+            # Leftover short runs are checked item by item, any items only on their position.
+            (COST_ITEM_CHECK, sum(length for _, length in short_runs) - short_any),
+            (COST_ITEM_POSITION_CHECK, short_any),
+        ),
+    }
+    if nb_any == 0:
+        costs[DIGEST] = _cost((COST_HEADER, 1), (COST_DIGEST_SETUP, 1), (COST_DIGEST_FELT, 2 * nb_items))
+    elif nb_any == nb_items:
+        costs[HISTOGRAM] = _cost(
+            (COST_DIGEST_SETUP, 1), (COST_DIGEST_FELT, nb_items),
+            # The materials of the set aren't known when generating, count one FT.
+            (COST_HISTOGRAM_SETUP, 1), (COST_HISTOGRAM_ITEM, nb_items), (COST_HISTOGRAM_FT, 1),
+        )
+    return costs
+
+
+def choose_shape_check(shape):
+    """
+    :return: (cheapest strategy, estimated costs of all applicable strategies)
+    """
+    costs = estimate_shape_check_costs(shape)
+    return min(costs, key=lambda strategy: (costs[strategy], strategy != ITEMS)), costs
+
+
+def generate_optimized_shape_check(shape, name='', strategy=None, report=print):
+    """
+    Like generate_shape_check, but picks the cheapest strategy according to the cost model.
+    :param strategy: Force a strategy instead.
+    :param report: Called with a one line summary of the estimates and the choice. None to disable.
+    """
+    chosen, costs = choose_shape_check(shape)
+    strategy = strategy or chosen
+    if strategy not in costs:
+        raise Exception(f"Strategy '{strategy}' cannot verify this shape")
+    summary = ', '.join(f"{s}: {c}" for s, c in costs.items())
+    if report is not None:
+        report(f"shape {name} ({len(shape)} items) -> {strategy} ({summary})")
+    comment = f"\n    // {strategy} ({summary})"
+    if strategy == ITEMS:
+        return comment + generate_shape_check(shape)
+    if strategy == RUNS:
+        return comment + shape_check_header(len(shape)) + '\n'.join(_runs_check(shape))
+    if strategy == DIGEST:
+        return comment + shape_check_header(len(shape)) + _digest_check(shape)
+    return comment + _histogram_check(shape)
+
+
+def _runs_check(shape):
+    for first, length in run_length_encode(shape):
+        if length < MIN_RUN_LENGTH:
+            for i in range(length):
+                yield item_check(_RunItem(first, i))
+            continue
+        out = [
+            f"    let mut x_y_z = {first.x_y_z};",
+            "    loop {",
+            f"        if x_y_z == {first.x_y_z + length} {{",
+            "            break;",
+            "        }",
+            "        let shapeItem = shape.pop_front().unwrap();",
+        ]
+        if first.material != ANY_MATERIAL_ANY_COLOR:
+            out.append(f"        assert(shapeItem.color_material == @{first.color_material}, 'bad shape item');")
+        out += [
+            "        assert(shapeItem.x_y_z == @x_y_z, 'bad shape item');",
+            "        x_y_z += 1;",
+            "    };",
+        ]
+        yield '\n'.join(out)
+
+
+class _RunItem:
+    """Item at `offset` in a run, for item_check."""
+    def __init__(self, first, offset):
+        self.material = first.material
+        self.color_material = first.color_material
+        self.x_y_z = first.x_y_z + offset
+
+
+def shape_digest(shape, positions_only=False):
+    from starkware.cairo.common.poseidon_hash import poseidon_hash_many
+    data = []
+    for item in shape:
+        if not positions_only:
+            data.append(item.color_material)
+        data.append(item.x_y_z)
+    return poseidon_hash_many(data)
+
+
+_DIGEST_LOOP = """
+    let mut data = array![];
+    let mut items = shape;
+    loop {{
+        match items.pop_front() {{
+            Option::Some(item) => {{{append}
+                data.append(*item.x_y_z);
+            }},
+            Option::None => {{ break; }}
+        }};
+    }};
+    assert(poseidon_hash_span(data.span()) == {digest}, 'bad shape');
+"""
+
+
+def _digest_check(shape):
+    return _DIGEST_LOOP.format(
+        append="\n                data.append(*item.color_material);",
+        digest=hex(shape_digest(shape)),
+    )
+
+
+def _histogram_check(shape):
+    # Every item is ANY_MATERIAL_ANY_COLOR: check positions, then that the fts match the materials actually used.
+    return f"""
+    assert(shape.len() == {len(shape)}, 'bad shape length');""" + _DIGEST_LOOP.format(
+        append="",
+        digest=hex(shape_digest(shape, positions_only=True)),
+    ) + """
+    let mut counts: Felt252Dict<u128> = Default::default();
+    let mut nb_materials = 0;
+    loop {
+        match shape.pop_front() {
+            Option::Some(item) => {
+                let color_material: u256 = (*item.color_material).into();
+                let material: felt252 = (color_material.low & 0xffffffffffffffff).into();
+                let count = counts.get(material);
+                if count == 0 {
+                    nb_materials += 1;
+                }
+                counts.insert(material, count + 1);
+            },
+            Option::None => { break; }
+        };
+    };
+    assert(fts.len() == nb_materials, 'bad fts spec');
+    // Strictly increasing token ids, so a material can't be listed twice, and the quantities must add up.
+    let mut ftsum = 0;
+    let mut previous_token_id: u256 = 0;
+    let mut first = true;
+    loop {
+        match fts.pop_front() {
+            Option::Some(ft) => {
+                let token_id: u256 = (*ft.token_id).into();
+                assert(first || token_id > previous_token_id, 'bad fts spec');
+                first = false;
+                previous_token_id = token_id;
+                assert(*ft.qty == counts.get(*ft.token_id), 'bad fts spec');
+                ftsum += *ft.qty;
+            },
+            Option::None => { break; }
+        };
+    };""" + f"""
+    assert(ftsum == {len(shape)}, 'bad fts spec');"""
+
+
 @dataclass
 class ShapeItem:
     x: int
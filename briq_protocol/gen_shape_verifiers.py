@@ -0,0 +1,116 @@
+import json
+import os
+from typing import Dict, List
+
+from briq_protocol.binomial_ifs import HEADER, write_verify_shape_function
+from briq_protocol.gen_shape_check import choose_shape_check, estimate_shape_check, generate_optimized_shape_check
+
+# Starknet caps compiled classes at 81920 felts of bytecode, keep some margin for the cost model being rough.
+DEFAULT_BYTECODE_BUDGET = 60000
+# Dispatch overhead per attribute id (comparisons, branch, return) in a binary tree, and the rest of the contract.
+# Measured like the gen_shape_check costs: 927 felts for one empty check, 7548 for 256.
+DISPATCH_BYTECODE = 26
+CONTRACT_OVERHEAD_BYTECODE = 900
+
+
+def estimate_verifier_bytecode(shape) -> int:
+    strategy, _ = choose_shape_check(shape)
+    return estimate_shape_check(shape)[strategy][1] + DISPATCH_BYTECODE
+
+
+def partition_attribute_ids(shapes: Dict[int, list], budget: int = DEFAULT_BYTECODE_BUDGET) -> List[List[int]]:
+    """
+    Split attribute ids into contiguous, sorted shards whose estimated bytecode stays under budget.
+    Keeping shards contiguous keeps each shard's dispatch tree balanced over a dense range.
+    """
+    shards = [[]]
+    size = CONTRACT_OVERHEAD_BYTECODE
+    for attribute_id in sorted(shapes):
+        item_size = estimate_verifier_bytecode(shapes[attribute_id])
+        if item_size + CONTRACT_OVERHEAD_BYTECODE > budget:
+            raise Exception(
+                f"Shape for attribute id {attribute_id} alone is over the bytecode budget ({item_size} > {budget})"
+            )
+        if shards[-1] and size + item_size > budget:
+            shards.append([])
+            size = CONTRACT_OVERHEAD_BYTECODE
+        shards[-1].append(attribute_id)
+        size += item_size
+    return [shard for shard in shards if shard]
+
+
+def shard_name(name: str, index: int) -> str:
+    return f"{name}_{index}"
+
+
+def class_hash_variable(name: str, index: int) -> str:
+    return f"${shard_name(name, index).upper()}_HASH"
+
+
+def generate_sharded_verifiers(
+    attribute_group_id: int,
+    shapes: Dict[int, list],
+    out_dir: str,
+    name: str = 'shapes_verifier',
+    budget: int = DEFAULT_BYTECODE_BUDGET,
+    report=print,
+):
+    """
+    Write one verifier contract per shard to out_dir, along with:
+    - {name}_manifest.json: the shards and which shard validates each (attribute_group_id, attribute_id),
+    - {name}_register.sh: register_shape_validator.execute invocations for every attribute id.
+    Class hashes are only known once declared, so the script reads them from ${NAME}_<n>_HASH variables.
+    :param shapes: attribute_id -> list of ShapeItem (or a Shape).
+    :return: The manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        'attribute_group_id': attribute_group_id,
+        'shards': [],
+        'validators': [],
+    }
+    for index, attribute_ids in enumerate(partition_attribute_ids(shapes, budget)):
+        module = shard_name(name, index)
+        filename = f"{module}.cairo"
+        with open(os.path.join(out_dir, filename), 'w') as f:
+            f.write(HEADER.replace('mod shapes_verifier {', f'mod {module} {{'))
+            depths = write_verify_shape_function(
+                f, attribute_ids, lambda id: generate_optimized_shape_check(shapes[id], name=hex(id), report=report)
+            )
+            f.write("}\n")
+        manifest['shards'].append({
+            'module': module,
+            'file': filename,
+            'class_hash_variable': class_hash_variable(name, index),
+            'attribute_ids': attribute_ids,
+            'estimated_bytecode': (
+                CONTRACT_OVERHEAD_BYTECODE + sum(estimate_verifier_bytecode(shapes[id]) for id in attribute_ids)
+            ),
+            'max_dispatch_depth': max(depths.values()),
+        })
+        for attribute_id in attribute_ids:
+            manifest['validators'].append({
+                'attribute_group_id': attribute_group_id,
+                'attribute_id': attribute_id,
+                'shard': index,
+            })
+
+    with open(os.path.join(out_dir, f"{name}_manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=4)
+    with open(os.path.join(out_dir, f"{name}_register.sh"), 'w') as f:
+        f.write(registration_script(manifest))
+    return manifest
+
+
+def registration_script(manifest) -> str:
+    """Same invocations as the 'Register ... shape' section of scripts/deploy.sh, one per attribute id."""
+    lines = ["# Generated by briq_protocol.gen_shape_verifiers - declare the shards first, then set the hashes below."]
+    for shard in manifest['shards']:
+        lines.append(f"# {shard['class_hash_variable'][1:]}=  # {shard['file']}")
+    for validator in manifest['validators']:
+        shard = manifest['shards'][validator['shard']]
+        lines.append(
+            f"starkli invoke $REGISTER_SHAPE_ADDR execute $WORLD_ADDRESS {hex(validator['attribute_group_id'])} "
+            f"{hex(validator['attribute_id'])} {shard['class_hash_variable']} --keystore-password $KEYSTORE_PWD"
+        )
+    return '\n'.join(lines) + '\n'
@@ -1,3 +1,7 @@
+import io
+
+from .auction_data import AUCTION, _lots, validate_lots, write_auction_data
+
 auction_data = {
     1: {
         "box_token_id": 0xcafe,
@@ -19,23 +23,10 @@ box_address = 0xcafe
 erc20_address = 0xfade
 
 def generate_auction(box_address=box_address, erc20_address=box_address, auction_data=auction_data):
-    lines = []
-
-    lines.append(f"const box_address = {box_address};")
-    lines.append(f"const erc20_address = {erc20_address};")
-
-    lines.append("auction_data_start:")
-    i = 1
-    for key in auction_data:
-        if key != i:
-            print("Bad auction_data")
-            raise
-        lines.append(f'dw {auction_data[key]["box_token_id"]};')
-        lines.append(f'dw {auction_data[key]["quantity"]};')
-        lines.append(f'dw {auction_data[key]["auction_start"]};')
-        lines.append(f'dw {auction_data[key]["auction_duration"]};')
-        lines.append(f'dw {auction_data[key]["initial_price"]};')
-        i += 1
-    lines.append("auction_data_end:")
-
-    return '%lang starknet\n' + '\n'.join(lines) + '\n'
+    """
+    :param auction_data: auction id -> lot, ids contiguous from 1. For many lots, see auction_data.write_auction_file.
+    """
+    lots = _lots([{'auction_id': key, **lot} for key, lot in auction_data.items()], AUCTION)
+    out = io.StringIO()
+    write_auction_data(out, validate_lots(lots, AUCTION), box_address, erc20_address)
+    return out.getvalue()
@@ -1,44 +1,137 @@
-from typing import Tuple
-from .shape_utils import to_shape_data
+from typing import Callable, Iterable, Iterator, Sequence, Tuple, Union
+from .shape_utils import compress_shape_item, to_shape_data
+
+Shapes = Union[Sequence[Tuple[list, list]], Callable[[], Iterable[Tuple[list, list]]]]
+
 
 # Index_start is usually 1 because the token 0 generally doesn't exist and this makes things neater.
 # Warning: shapes isn't sorted (because tests pass broken inputs on purpose)
 def generate_shape_code(shapes: list[Tuple[list, list]], index_start: int = 1):
-    newline = '\n'
-    shape_offsets = ["dw 0;"]
-    nft_offsets = ["dw 0;"]
-    data_shapes = []
-    data_nfts = []
-    cum_shape = 0
-    cum_nft = 0
-    for shape in shapes:
-        cum_shape += len(shape[0])
-        cum_nft += len(shape[1])
-        shape_offsets.append(f"dw {cum_shape};")
-        nft_offsets.append(f"dw {cum_nft};")
-        for shape_data in shape[0]:
-            data_shapes.append(to_shape_data(*shape_data))
-        for nft_data in shape[1]:
-            data_nfts.append(f"dw {hex(nft_data)};")
-
-    return f"""
+    return ''.join(iter_shape_code(shapes, index_start))
+
+
+def write_shape_code(shapes: Shapes, out, index_start: int = 1):
+    """
+    Write the shape data contract to a file-like object, without holding the whole collection in memory.
+    :param shapes: a list of (shape items, nfts), or a callable returning a fresh iterable over them.
+    Generators and other one-shot iterables are rejected, wrap them in a callable instead.
+    """
+    out.writelines(iter_shape_code(shapes, index_start))
+
+
+def iter_shape_code(shapes: Shapes, index_start: int = 1) -> Iterator[str]:
+    """
+    Same output as generate_shape_code, yielded line by line.
+    The offset tables come before the data they index, so shapes are iterated once per section.
+    """
+    if callable(shapes):
+        get_shapes = shapes
+    elif isinstance(shapes, Sequence):
+        def get_shapes():
+            return shapes
+    else:
+        raise Exception(
+            "Shapes are read once per section, expected a sequence or a callable returning a fresh iterable, "
+            f"got {type(shapes).__name__}"
+        )
+
+    yield from section_code(index_start, [
+        offset_lines(len(shape[0]) for shape in get_shapes()),
+        shape_data_lines(get_shapes()),
+        offset_lines(len(shape[1]) for shape in get_shapes()),
+        nft_data_lines(get_shapes()),
+        nft_position_lines(get_shapes()),
+        offset_lines(len(ft_counts(shape)) for shape in get_shapes()),
+        ft_data_lines(ft_counts(shape) for shape in get_shapes()),
+    ])
+
+
+# In order, each section is followed by a matching _end label.
+SECTIONS = [
+    'shape_offset_cumulative',
+    'shape_data',
+    'nft_offset_cumulative',
+    'nft_data',
+    'nft_position_data',
+    'ft_offset_cumulative',
+    'ft_data',
+]
+
+
+def section_code(index_start: int, sections: list[Iterable[str]]) -> Iterator[str]:
+    """
+    The data contract, given the lines of each of SECTIONS, consumed one section after the other.
+    """
+    yield f"""
 %lang starknet
 
 const INDEX_START = {index_start};
+"""
+    for name, lines in zip(SECTIONS, sections):
+        yield f"\n{name}:\n"
+        yield from _lines(lines)
+        yield f"\n{name}_end:\n"
 
-shape_offset_cumulative:
-{newline.join(shape_offsets)}
-shape_offset_cumulative_end:
 
-shape_data:
-{newline.join(data_shapes)}
-shape_data_end:
+def offset_lines(lengths: Iterable[int]) -> Iterator[str]:
+    cumulative = 0
+    yield "dw 0;"
+    for length in lengths:
+        cumulative += length
+        yield f"dw {cumulative};"
 
-nft_offset_cumulative:
-{newline.join(nft_offsets)}
-nft_offset_cumulative_end:
 
-nft_data:
-{newline.join(data_nfts)}
-nft_data_end:
-"""
+def shape_data_lines(shapes: Iterable[Tuple[list, list]]) -> Iterator[str]:
+    return (to_shape_data(*shape_data) for shape in shapes for shape_data in shape[0])
+
+
+def nft_data_lines(shapes: Iterable[Tuple[list, list]]) -> Iterator[str]:
+    return (f"dw {hex(nft_data)};" for shape in shapes for nft_data in shape[1])
+
+
+def nft_position_lines(shapes: Iterable[Tuple[list, list]]) -> Iterator[str]:
+    return (f"dw {hex(position)};" for shape in shapes for position in nft_positions(shape))
+
+
+def ft_data_lines(shapes_counts: Iterable[list[Tuple[int, int]]]) -> Iterator[str]:
+    """
+    :param shapes_counts: ft_counts of each shape.
+    """
+    for counts in shapes_counts:
+        for material, qty in counts:
+            yield f"dw {hex(material)};\ndw {qty};"
+
+
+def nft_positions(shape: Tuple[list, list]) -> list[int]:
+    """
+    x_y_z of each NFT item, parallel to the token ids, so shape_store._find_nft can binary search them.
+    Shares nft_offset_cumulative with nft_data.
+    """
+    positions = [compress_shape_item(*item)[1] for item in shape[0] if len(item) > 5 and item[5]]
+    if any(a >= b for a, b in zip(positions, positions[1:])):
+        raise Exception("NFT items are not properly sorted (increasing X/Y/Z)")
+    # Shapes with the wrong number of NFTs are rejected by the constructor, but keep the sections aligned regardless.
+    return (positions + [0] * len(shape[1]))[:len(shape[1])]
+
+
+def ft_counts(shape: Tuple[list, list]) -> list[Tuple[int, int]]:
+    """
+    (material, qty) of the fungible items, by increasing material, so check_shape_numbers_ can merge them with
+    the sorted fts instead of counting item by item. 'Any material' items can't be counted ahead and are left out.
+    """
+    counts = {}
+    for item in shape[0]:
+        if (len(item) > 5 and item[5]) or item[0] == 'any_color_any_material':
+            continue
+        counts[item[1]] = counts.get(item[1], 0) + 1
+    return sorted(counts.items())
+
+
+# Equivalent to '\n'.join(lines), lazily.
+def _lines(lines):
+    first = True
+    for line in lines:
+        if not first:
+            yield '\n'
+        first = False
+        yield line
@@ -0,0 +1,39 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Optional
+
+
+def chunks(items, size):
+    """Lists of `size` items (the last one shorter), `items` is only iterated once."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks(executor: Optional[Executor], fn, chunks):
+    """fn over each chunk, on the executor from `pool`, or in this process if it is None."""
+    # Executor.map yields results in submission order, which keeps the merge deterministic.
+    if executor is None:
+        return map(fn, chunks)
+    return executor.map(fn, chunks)
+
+
+class _Serial:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *args):
+        return False
+
+
+def pool(workers: Optional[int]):
+    """
+    Context manager for map_chunks.
+    :param workers: Number of processes, None for one per CPU, 0 to run serially in this process.
+    """
+    if workers == 0:
+        return _Serial()
+    return ProcessPoolExecutor(max_workers=workers)
@@ -0,0 +1,255 @@
+import json
+from functools import cached_property
+
+import numpy as np
+
+from .gen_shape_check import ANY_MATERIAL_ANY_COLOR
+from .shape_codec import (
+    DOJO,
+    LEGACY,
+    NB_LIMBS,
+    ANY_COLOR_ANY_MATERIAL,
+    array_to_colors,
+    compress_shape_items,
+    felts_to_limbs,
+    limbs_to_felts,
+    transcode_legacy_to_dojo,
+    uncompress_shape_items,
+)
+
+# One record per voxel, laid out like the little-endian dojo PackedShapeItem:
+# color_material is (material, color), x_y_z is (z, y, x) as 32-bit lanes offset by 2^31.
+# 28 bytes per voxel, against ~240 for a list of gen_shape_check.ShapeItem loaded from JSON.
+SHAPE_DTYPE = np.dtype([
+    ('material', '<u8'),
+    ('color', '<u8'),
+    ('z', '<u4'),
+    ('y', '<u4'),
+    ('x', '<u4'),
+])
+
+_OFFSET = 2 ** 31
+
+
+def _felt(limbs: np.ndarray) -> int:
+    return sum(int(limb) << (64 * i) for i, limb in enumerate(limbs))
+
+
+def _material(material) -> int:
+    # briq set JSONs store materials as hex strings.
+    return int(material, 16) if isinstance(material, str) else material
+
+
+class ShapeItemView:
+    """
+    Read-only view on one voxel of a Shape, duck-typing gen_shape_check.ShapeItem.
+    """
+    __slots__ = ('_shape', '_index')
+
+    def __init__(self, shape, index):
+        self._shape = shape
+        self._index = index
+
+    @property
+    def x(self):
+        return int(self._shape._data['x'][self._index]) - _OFFSET
+
+    @property
+    def y(self):
+        return int(self._shape._data['y'][self._index]) - _OFFSET
+
+    @property
+    def z(self):
+        return int(self._shape._data['z'][self._index]) - _OFFSET
+
+    @property
+    def material(self):
+        return int(self._shape._data['material'][self._index])
+
+    @property
+    def color(self):
+        color = int(self._shape._data['color'][self._index])
+        return color.to_bytes(7, 'big').decode() if color else ANY_COLOR_ANY_MATERIAL
+
+    @property
+    def color_material(self):
+        return _felt(self._shape.color_material[self._index])
+
+    @property
+    def x_y_z(self):
+        return _felt(self._shape.x_y_z[self._index])
+
+    def __repr__(self):
+        return f"ShapeItemView(x={self.x}, y={self.y}, z={self.z}, color='{self.color}', material={self.material})"
+
+
+class Shape:
+    """
+    Compact, array-backed list of shape items (dojo packing).
+    Slicing returns a Shape sharing the same memory. Packed felts are computed once, on first access,
+    and kept as (N, NB_LIMBS) uint64 limbs (see shape_codec.limbs_to_felts).
+    """
+
+    def __init__(self, data: np.ndarray):
+        if data.dtype != SHAPE_DTYPE:
+            raise Exception("Shape data must use SHAPE_DTYPE")
+        self._data = data
+
+    @staticmethod
+    def from_columns(x, y, z, color, material):
+        has_token_id = np.zeros(len(material), dtype=bool)
+        color_material, x_y_z = compress_shape_items(x, y, z, material, has_token_id, color, scheme=DOJO)
+        return Shape.from_limbs(color_material, x_y_z)
+
+    @staticmethod
+    def from_limbs(color_material: np.ndarray, x_y_z: np.ndarray, scheme=DOJO):
+        if scheme == LEGACY:
+            color_material, x_y_z = transcode_legacy_to_dojo(color_material, x_y_z)
+        color_material = np.asarray(color_material, dtype=np.uint64).reshape(-1, NB_LIMBS)
+        x_y_z = np.asarray(x_y_z, dtype=np.uint64).reshape(-1, NB_LIMBS)
+        if np.any(color_material[:, 2:]) or np.any(x_y_z[:, 2:]) or np.any(x_y_z[:, 1] >> np.uint64(32)):
+            raise Exception("Packed shape items do not fit the dojo packing")
+        data = np.empty(len(color_material), dtype=SHAPE_DTYPE)
+        data['material'] = color_material[:, 0]
+        data['color'] = color_material[:, 1]
+        data['z'] = x_y_z[:, 0] & np.uint64(0xFFFFFFFF)
+        data['y'] = x_y_z[:, 0] >> np.uint64(32)
+        data['x'] = x_y_z[:, 1]
+        return Shape(data)
+
+    @staticmethod
+    def from_packed(items, scheme=DOJO):
+        """
+        :param items: list of (color_material, x_y_z) felts.
+        """
+        items = list(items)
+        return Shape.from_limbs(
+            felts_to_limbs([i[0] for i in items]),
+            felts_to_limbs([i[1] for i in items]),
+            scheme=scheme,
+        )
+
+    @staticmethod
+    def from_legacy_tuples(items):
+        """
+        :param items: list of (color, material, x, y, z[, has_token_id]) tuples,
+            as passed to shape_utils.compress_shape_item.
+        """
+        items = list(items)
+        if any(len(i) > 5 and i[5] for i in items):
+            raise Exception("Dojo shapes cannot contain NFTs")
+        return Shape.from_columns(
+            [i[2] for i in items],
+            [i[3] for i in items],
+            [i[4] for i in items],
+            [i[0] for i in items],
+            [i[1] for i in items],
+        )
+
+    @staticmethod
+    def from_json(data):
+        """
+        :param data: a briq set JSON (a dict with a 'briqs' list, or the list itself, or a string to parse).
+            Each briq is {"pos": [x, y, z], "data": {"color": "#ffaaff", "material": "0x1"}}.
+        """
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        if isinstance(data, dict):
+            data = data['briqs']
+        return Shape.from_columns(
+            [b['pos'][0] for b in data],
+            [b['pos'][1] for b in data],
+            [b['pos'][2] for b in data],
+            [b['data']['color'] for b in data],
+            [_material(b['data']['material']) for b in data],
+        )
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Slicing the records and the limbs returns views.
+            return self._select(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Shape index out of range")
+        return ShapeItemView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ShapeItemView(self, i)
+
+    def _select(self, index):
+        shape = Shape(self._data[index])
+        # Carry over whatever was already packed.
+        for prop in ('color_material', 'x_y_z'):
+            if prop in self.__dict__:
+                limbs = self.__dict__[prop][index]
+                limbs.setflags(write=False)
+                shape.__dict__[prop] = limbs
+        return shape
+
+    def take(self, indices) -> 'Shape':
+        """New Shape with the items at `indices` (an integer array, e.g. a permutation), in that order."""
+        return self._select(np.asarray(indices, dtype=np.intp))
+
+    def sorted(self) -> 'Shape':
+        """New Shape by increasing x_y_z, i.e. by x, then y, then z."""
+        return self.take(np.lexsort((self._data['z'], self._data['y'], self._data['x'])))
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data['x'].astype(np.int64) - _OFFSET
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data['y'].astype(np.int64) - _OFFSET
+
+    @property
+    def z(self) -> np.ndarray:
+        return self._data['z'].astype(np.int64) - _OFFSET
+
+    @property
+    def material(self) -> np.ndarray:
+        return self._data['material']
+
+    @property
+    def colors(self) -> list:
+        return [c if c != '\0' * 7 else ANY_COLOR_ANY_MATERIAL for c in array_to_colors(self._data['color'])]
+
+    @cached_property
+    def color_material(self) -> np.ndarray:
+        color_material = np.zeros((len(self), NB_LIMBS), dtype=np.uint64)
+        color_material[:, 0] = self._data['material']
+        color_material[:, 1] = self._data['color']
+        color_material.setflags(write=False)
+        return color_material
+
+    @cached_property
+    def x_y_z(self) -> np.ndarray:
+        x_y_z = np.zeros((len(self), NB_LIMBS), dtype=np.uint64)
+        x_y_z[:, 0] = (self._data['y'].astype(np.uint64) << np.uint64(32)) | self._data['z']
+        x_y_z[:, 1] = self._data['x']
+        x_y_z.setflags(write=False)
+        return x_y_z
+
+    def material_counts(self) -> dict:
+        """Number of items per material, excluding ANY_MATERIAL_ANY_COLOR."""
+        materials, counts = np.unique(self._data['material'], return_counts=True)
+        return {int(m): int(c) for m, c in zip(materials, counts) if m != ANY_MATERIAL_ANY_COLOR}
+
+    def to_columns(self):
+        return uncompress_shape_items(*self.to_limbs(), scheme=DOJO)
+
+    def to_limbs(self):
+        return self.color_material, self.x_y_z
+
+    def to_felts(self):
+        """color_material and x_y_z as lists of Python ints."""
+        return limbs_to_felts(self.color_material), limbs_to_felts(self.x_y_z)
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
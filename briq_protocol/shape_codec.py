@@ -0,0 +1,208 @@
+import numpy as np
+
+# Batch version of shape_utils.compress_shape_item / uncompress_shape_item, and of the dojo ShapePacking.
+# Felts are stored as fixed-width uint64 limbs, little-endian: an array of N felts has shape (N, 4),
+# and limb 0 holds bits 0-63. This lets a whole collection go through the codec without
+# creating a Python int per item. Results are bit-exact with the scalar functions in shape_utils.
+
+NB_LIMBS = 4
+
+ANY_COLOR_ANY_MATERIAL = 'any_color_any_material'
+
+# Packing schemes.
+# legacy: Cairo 0 shape contracts (see shape_utils). color * 2^136 + nft * 2^128 + material,
+#         positions offset by 2^63 in 64-bit lanes.
+# dojo: Cairo 1 PackedShapeItem (see src/types.cairo). color * 2^64 + material,
+#       positions offset by 2^31 in 32-bit lanes.
+LEGACY = 'legacy'
+DOJO = 'dojo'
+SCHEMES = (LEGACY, DOJO)
+
+_U64 = np.uint64
+_SIGN_BIT = _U64(0x8000000000000000)
+_U64_MASK = 2 ** 64 - 1
+_U32_MASK = _U64(0xFFFFFFFF)
+
+
+def felts_to_limbs(felts) -> np.ndarray:
+    felts = [int(f) for f in felts]
+    out = np.zeros((len(felts), NB_LIMBS), dtype=_U64)
+    for i in range(NB_LIMBS):
+        out[:, i] = [(f >> (64 * i)) & _U64_MASK for f in felts]
+    return out
+
+
+def limbs_to_felts(limbs: np.ndarray) -> list:
+    limbs = np.asarray(limbs, dtype=_U64).reshape(-1, NB_LIMBS)
+    cols = [limbs[:, i].tolist() for i in range(NB_LIMBS)]
+    return [a | (b << 64) | (c << 128) | (d << 192) for a, b, c, d in zip(*cols)]
+
+
+# Colors are 7-char short strings, i.e. 56 bits. 0 stands for 'any_color_any_material'.
+def colors_to_array(colors) -> np.ndarray:
+    if isinstance(colors, np.ndarray) and colors.dtype.kind in 'ui':
+        return _check_color_values(colors.astype(_U64))
+    colors = list(colors)
+    is_any = np.array([c == ANY_COLOR_ANY_MATERIAL for c in colors], dtype=bool)
+    if any(len(c) != 7 for c, a in zip(colors, is_any) if not a):
+        raise Exception("Color must be formatted like '#001122'")
+    raw = np.array([b'\0' * 7 if a else c.encode() for c, a in zip(colors, is_any)], dtype='S7')
+    chars = raw.view(np.uint8).reshape(-1, 7).astype(_U64)
+    out = np.zeros(len(colors), dtype=_U64)
+    for i in range(7):
+        out = (out << _U64(8)) | chars[:, i]
+    out[is_any] = 0
+    return out
+
+
+def array_to_colors(colors: np.ndarray) -> list:
+    colors = np.asarray(colors, dtype=_U64)
+    chars = np.zeros((len(colors), 7), dtype=np.uint8)
+    for i in range(7):
+        chars[:, 6 - i] = (colors >> _U64(8 * i)) & _U64(0xff)
+    return [c.decode('ascii') for c in chars.view('S7').reshape(-1).tolist()]
+
+
+def _check_color_values(colors):
+    if np.any(colors >> _U64(56)):
+        raise Exception("Color must be formatted like '#001122'")
+    return colors
+
+
+def _as_u64(values, low, high, error) -> np.ndarray:
+    """Convert to uint64, raising `error` unless low <= v < high for all values (bounds are python ints)."""
+    arr = np.asarray(values)
+    if arr.dtype.kind not in 'iu':
+        # Lists mixing large and negative ints would otherwise silently become floats.
+        arr = np.array(values, dtype=object)
+    if arr.dtype.kind == 'u':
+        if high <= _U64_MASK and np.any(arr >= high):
+            raise Exception(error)
+        return arr.astype(_U64)
+    if arr.dtype.kind == 'i':
+        if np.any(arr < low) or (high <= 2 ** 63 - 1 and np.any(arr >= high)):
+            raise Exception(error)
+        return arr.astype(np.int64).view(_U64)
+    # Arbitrary python ints: range-check before narrowing.
+    if arr.size and (np.any(arr < low) or np.any(arr >= high)):
+        raise Exception(error)
+    return np.array([v & _U64_MASK for v in arr.tolist()], dtype=_U64)
+
+
+def _to_storage_form(values, error) -> np.ndarray:
+    # v + 2**63 as a uint64 is just flipping the sign bit of the two's complement representation.
+    return _as_u64(values, -2 ** 63 + 1, 2 ** 63, error) ^ _SIGN_BIT
+
+
+def _from_storage_form(values: np.ndarray) -> np.ndarray:
+    return (values ^ _SIGN_BIT).view(np.int64)
+
+
+def _to_dojo_lane(values, error) -> np.ndarray:
+    return (_as_u64(values, -2 ** 31, 2 ** 31, error) + _U64(2 ** 31)) & _U32_MASK
+
+
+def _from_dojo_lane(values: np.ndarray) -> np.ndarray:
+    return (values & _U32_MASK).astype(np.int64) - 2 ** 31
+
+
+def _check_scheme(scheme):
+    if scheme not in SCHEMES:
+        raise Exception(f"Unknown shape packing scheme '{scheme}', expected one of {SCHEMES}")
+
+
+def compress_shape_items(x, y, z, material, has_token_id, color, scheme=LEGACY):
+    """
+    Vectorized compress_shape_item (legacy scheme) / ShapePacking::pack (dojo scheme).
+    :param color: list of '#rrggbb' strings (or 'any_color_any_material'), or an array as returned by colors_to_array.
+    :param has_token_id: NFT flag, only supported by the legacy scheme.
+    :return: (color_nft_material, x_y_z) as (N, 4) uint64 limb arrays.
+    """
+    _check_scheme(scheme)
+    material = _as_u64(material, 0, 2 ** 64, "Material must be between 0 and 2^64")
+    color = colors_to_array(color)
+    has_token_id = np.asarray(has_token_id, dtype=bool)
+
+    if scheme == LEGACY:
+        error = "The shape contract currently cannot support positions beyond 2^63 in any direction"
+        x = _to_storage_form(x, error)
+        y = _to_storage_form(y, error)
+        z = _to_storage_form(z, error)
+    else:
+        if np.any(has_token_id):
+            raise Exception("Dojo shapes cannot contain NFTs")
+        error = "Dojo shapes cannot support positions beyond 2^31 in any direction"
+        x = _to_dojo_lane(x, error)
+        y = _to_dojo_lane(y, error)
+        z = _to_dojo_lane(z, error)
+
+    n = len(material)
+    if not (len(color) == len(has_token_id) == len(x) == len(y) == len(z) == n):
+        raise Exception("All columns must have the same length")
+
+    is_any = color == 0
+    color_nft_material = np.zeros((n, NB_LIMBS), dtype=_U64)
+    x_y_z = np.zeros((n, NB_LIMBS), dtype=_U64)
+    color_nft_material[:, 0] = np.where(is_any, _U64(0), material)
+    if scheme == LEGACY:
+        # Color lives at bit 136 (limb 2, bit 8), the NFT flag at bit 128 (limb 2, bit 0).
+        color_nft_material[:, 2] = np.where(is_any, _U64(0), (color << _U64(8)) | has_token_id.astype(_U64))
+        x_y_z[:, 0] = z
+        x_y_z[:, 1] = y
+        x_y_z[:, 2] = x
+    else:
+        # Color lives at bit 64 (limb 1), positions are 32-bit lanes: z, y then x.
+        color_nft_material[:, 1] = color
+        x_y_z[:, 0] = (y << _U64(32)) | z
+        x_y_z[:, 1] = x
+    return color_nft_material, x_y_z
+
+
+def uncompress_shape_items(color_nft_material, x_y_z, scheme=LEGACY):
+    """
+    Vectorized uncompress_shape_item (legacy scheme) / ShapePacking::unpack (dojo scheme).
+    :return: (color, material, x, y, z, has_token_id) columns. Colors are returned as uint64, see array_to_colors.
+    """
+    _check_scheme(scheme)
+    color_nft_material = np.asarray(color_nft_material, dtype=_U64).reshape(-1, NB_LIMBS)
+    x_y_z = np.asarray(x_y_z, dtype=_U64).reshape(-1, NB_LIMBS)
+    material = color_nft_material[:, 0].copy()
+    if scheme == LEGACY:
+        color = (color_nft_material[:, 2] >> _U64(8)) | (color_nft_material[:, 3] << _U64(56))
+        has_token_id = (color_nft_material[:, 2] & _U64(1)).astype(bool)
+        x = _from_storage_form(x_y_z[:, 2])
+        y = _from_storage_form(x_y_z[:, 1])
+        z = _from_storage_form(x_y_z[:, 0])
+    else:
+        color = color_nft_material[:, 1].copy()
+        has_token_id = np.zeros(len(material), dtype=bool)
+        x = _from_dojo_lane(x_y_z[:, 1])
+        y = _from_dojo_lane(x_y_z[:, 0] >> _U64(32))
+        z = _from_dojo_lane(x_y_z[:, 0])
+    return color, material, x, y, z, has_token_id
+
+
+def transcode_legacy_to_dojo(color_nft_material, x_y_z, drop_nft=False):
+    """
+    Re-pack legacy (Cairo 0) shape items into the dojo packing, working directly on the limbs.
+    :param drop_nft: legacy items flagged as NFTs are rejected unless this is set, in which case the flag is dropped.
+    :return: (color_material, x_y_z) as (N, 4) uint64 limb arrays.
+    """
+    color_nft_material = np.asarray(color_nft_material, dtype=_U64).reshape(-1, NB_LIMBS)
+    x_y_z = np.asarray(x_y_z, dtype=_U64).reshape(-1, NB_LIMBS)
+    if not drop_nft and np.any(color_nft_material[:, 2] & _U64(1)):
+        raise Exception("Dojo shapes cannot contain NFTs")
+
+    out_cm = np.zeros_like(color_nft_material)
+    out_cm[:, 0] = color_nft_material[:, 0]
+    out_cm[:, 1] = (color_nft_material[:, 2] >> _U64(8)) | (color_nft_material[:, 3] << _U64(56))
+
+    # Legacy lanes are v + 2^63, dojo lanes are v + 2^31: shift by 2^63 - 2^31, mod 2^64.
+    # Anything outside of [-2^31, 2^31) ends up above 2^32.
+    lanes = x_y_z[:, :3] - _U64(2 ** 63 - 2 ** 31)
+    if np.any(lanes >> _U64(32)):
+        raise Exception("Dojo shapes cannot support positions beyond 2^31 in any direction")
+    out_xyz = np.zeros_like(x_y_z)
+    out_xyz[:, 0] = (lanes[:, 1] << _U64(32)) | lanes[:, 0]
+    out_xyz[:, 1] = lanes[:, 2]
+    return out_cm, out_xyz
@@ -0,0 +1,112 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from starkware.cairo.common.poseidon_hash import poseidon_hash_many
+
+from .build_collection import DEFAULT_CHUNK_SIZE
+from .parallel import chunks, map_chunks, pool
+from .shape import Shape
+
+# Commitments checked by check_shape_via_validator (src/booklet/attribute.cairo) against the ShapeCommitment model,
+# registered with the register_shape_commitment system instead of declaring a verifier class per collection.
+
+
+def sort_shape(shape: Shape) -> Shape:
+    """Canonical order: strictly increasing x_y_z, as required by check_fts_and_shape_match."""
+    return shape.sorted()
+
+
+def shape_fts(shape: Shape) -> List[Tuple[int, int]]:
+    """(token_id, qty) per material, by increasing token id."""
+    return sorted(shape.material_counts().items())
+
+
+def shape_commitment(shape: Shape, fts: Optional[Sequence[Tuple[int, int]]] = None) -> int:
+    """
+    Poseidon hash of the serialized Span<PackedShapeItem> followed by the serialized Span<FTSpec>,
+    as compute_shape_commitment in src/booklet/attribute.cairo.
+    :param fts: (token_id, qty) in the order the set will be assembled with, defaults to shape_fts(shape).
+    """
+    color_materials, positions = shape.to_felts()
+    if any(a >= b for a, b in zip(positions, positions[1:])):
+        raise Exception("Bad ordering: sort the shape first (sort_shape)")
+    if fts is None:
+        fts = shape_fts(shape)
+    data = [len(shape)]
+    for color_material, position in zip(color_materials, positions):
+        data.append(color_material)
+        data.append(position)
+    data.append(len(fts))
+    for token_id, qty in fts:
+        data.append(token_id)
+        data.append(qty)
+    return poseidon_hash_many(data)
+
+
+def load_shape(path: str, sort: bool = True) -> Shape:
+    with open(path) as f:
+        shape = Shape.from_json(f.read())
+    return sort_shape(shape) if sort else shape
+
+
+def _commitments_chunk(items: List[Tuple[int, Union[str, Shape]]]) -> List[Tuple[int, int]]:
+    return [
+        (attribute_id, shape_commitment(load_shape(shape) if isinstance(shape, str) else shape))
+        for attribute_id, shape in items
+    ]
+
+
+def compute_commitments(
+    shapes: Dict[int, Union[str, Shape]], workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[int, int]:
+    """
+    Commitments for a whole collection, hashed across processes.
+    :param shapes: attribute_id -> Shape, or path to a briq set JSON (sorted on load).
+    :param workers: Number of processes, 0 to run serially in this process.
+    """
+    commitments = {}
+    with pool(workers) as executor:
+        for chunk in map_chunks(executor, _commitments_chunk, chunks(sorted(shapes.items()), chunk_size)):
+            commitments.update(chunk)
+    return commitments
+
+
+def shapes_from_directory(directory: str) -> Dict[int, str]:
+    """Shape files named after their attribute id, e.g. 0x1.json or 12.json."""
+    shapes = {}
+    for filename in os.listdir(directory):
+        name, ext = os.path.splitext(filename)
+        if ext != '.json':
+            continue
+        try:
+            attribute_id = int(name, 0)
+        except ValueError:
+            raise Exception(f"Shape file {filename} isn't named after an attribute id")
+        shapes[attribute_id] = os.path.join(directory, filename)
+    return shapes
+
+
+def registration_script(attribute_group_id: int, commitments: Dict[int, int]) -> str:
+    """register_shape_commitment.execute invocations, in the style of scripts/deploy.sh."""
+    lines = ["# Generated by briq_protocol.shape_commitment"]
+    for attribute_id, commitment in sorted(commitments.items()):
+        lines.append(
+            f"starkli invoke $REGISTER_SHAPE_COMMITMENT_ADDR execute $WORLD_ADDRESS {hex(attribute_group_id)} "
+            f"{hex(attribute_id)} {hex(commitment)} --keystore-password $KEYSTORE_PWD"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def write_commitments(
+    attribute_group_id: int, commitments: Dict[int, int], out_dir: str, name: str = 'shape_commitments'
+):
+    """Write {name}.json (attribute id -> commitment, as hex) and {name}_register.sh to out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, f"{name}.json"), 'w') as f:
+        json.dump({
+            'attribute_group_id': attribute_group_id,
+            'commitments': {hex(attribute_id): hex(c) for attribute_id, c in sorted(commitments.items())},
+        }, f, indent=4)
+    with open(os.path.join(out_dir, f"{name}_register.sh"), 'w') as f:
+        f.write(registration_script(attribute_group_id, commitments))
@@ -0,0 +1,172 @@
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .shape_codec import NB_LIMBS, felts_to_limbs, limbs_to_felts
+
+# Reader for the shape data contracts written by generate_shape.generate_shape_code (contracts/shape/data*.cairo).
+# The cairo file is parsed once into a binary sidecar (<data file>.idx), which is then memory-mapped:
+# looking up a shape is a couple of slices, no parsing involved.
+
+SECTIONS = ['shape_offset_cumulative', 'shape_data', 'nft_offset_cumulative', 'nft_data']
+
+_MAGIC = b'BRIQSHP1'
+# magic, index_start (-1 if not set), source size, source mtime (ns), nb shapes, nb items, nb nfts
+_HEADER = struct.Struct('<8sqQQQQQ')
+
+
+@dataclass
+class ShapeData:
+    index_start: Optional[int]
+    shape_offsets: np.ndarray
+    # (nb_items, 2, NB_LIMBS): color_nft_material then x_y_z, legacy packing.
+    shape_data: np.ndarray
+    nft_offsets: np.ndarray
+    nft_data: np.ndarray
+
+    def __len__(self):
+        return len(self.shape_offsets) - 1
+
+    def get_shape(self, index: int):
+        """
+        :return: (list of (color_nft_material, x_y_z), list of nfts) for the shape at position `index` in the file.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("Shape index out of range")
+        items = self.shape_data[self.shape_offsets[index]:self.shape_offsets[index + 1]]
+        nfts = self.nft_data[self.nft_offsets[index]:self.nft_offsets[index + 1]]
+        return list(zip(limbs_to_felts(items[:, 0]), limbs_to_felts(items[:, 1]))), limbs_to_felts(nfts)
+
+    def get_shape_limbs(self, index: int):
+        """Same as get_shape, but returns views on the (nb_items, 2, 4) and (nb_nfts, 4) limb arrays."""
+        if not 0 <= index < len(self):
+            raise IndexError("Shape index out of range")
+        return (
+            self.shape_data[self.shape_offsets[index]:self.shape_offsets[index + 1]],
+            self.nft_data[self.nft_offsets[index]:self.nft_offsets[index + 1]],
+        )
+
+    def shape_of_item(self, item_index: int) -> int:
+        """Bisect the cumulative offsets to find which shape the item at `item_index` in shape_data belongs to."""
+        if not 0 <= item_index < len(self.shape_data):
+            raise IndexError("Item index out of range")
+        return int(np.searchsorted(self.shape_offsets, item_index, side='right')) - 1
+
+
+def parse_shape_data(path: str) -> ShapeData:
+    sections = {name: [] for name in SECTIONS}
+    index_start = None
+    current = None
+    with open(path, 'r') as f:
+        for line in f:
+            # Older data files indent their dw lines.
+            line = line.lstrip()
+            if current is not None:
+                if line.startswith('dw '):
+                    current.append(line[3:line.index(';')])
+                    continue
+                if line.startswith(f'{name}_end:'):
+                    current = None
+                continue
+            if line.startswith('const INDEX_START'):
+                index_start = int(line.split('=')[1].strip().rstrip(';'))
+                continue
+            name = line.strip()[:-1]
+            if line.rstrip().endswith(':') and name in sections:
+                current = sections[name]
+    # Offset tables always start with 'dw 0;', data sections may be empty.
+    for name in ['shape_offset_cumulative', 'nft_offset_cumulative']:
+        if not sections[name]:
+            raise Exception(f"Missing or empty section '{name}' in {path}")
+
+    shape_offsets = np.array([int(v, 0) for v in sections['shape_offset_cumulative']], dtype=np.uint64)
+    nft_offsets = np.array([int(v, 0) for v in sections['nft_offset_cumulative']], dtype=np.uint64)
+    if len(shape_offsets) != len(nft_offsets):
+        raise Exception(f"Shape and NFT offset tables have different lengths in {path}")
+    if len(sections['shape_data']) % 2:
+        raise Exception(f"Odd number of felts in shape_data in {path}")
+    if int(shape_offsets[-1]) * 2 != len(sections['shape_data']) or int(nft_offsets[-1]) != len(sections['nft_data']):
+        raise Exception(f"Offset tables do not match data sections in {path}")
+    return ShapeData(
+        index_start=index_start,
+        shape_offsets=shape_offsets,
+        shape_data=felts_to_limbs([int(v, 0) for v in sections['shape_data']]).reshape(-1, 2, NB_LIMBS),
+        nft_offsets=nft_offsets,
+        nft_data=felts_to_limbs([int(v, 0) for v in sections['nft_data']]),
+    )
+
+
+def index_path_for(data_path: str) -> str:
+    return data_path + '.idx'
+
+
+def build_index(data_path: str, index_path: Optional[str] = None) -> str:
+    index_path = index_path or index_path_for(data_path)
+    data = parse_shape_data(data_path)
+    stat = os.stat(data_path)
+    with open(index_path, 'wb') as f:
+        f.write(_HEADER.pack(
+            _MAGIC,
+            -1 if data.index_start is None else data.index_start,
+            stat.st_size,
+            stat.st_mtime_ns,
+            len(data),
+            len(data.shape_data),
+            len(data.nft_data),
+        ))
+        for arr in [data.shape_offsets, data.nft_offsets, data.shape_data, data.nft_data]:
+            f.write(np.ascontiguousarray(arr, dtype='<u8').tobytes())
+    return index_path
+
+
+def open_index(index_path: str, data_path: Optional[str] = None) -> ShapeData:
+    """
+    Memory-map a sidecar built by build_index.
+    If data_path is given, raise if the data file changed since the index was built.
+    """
+    with open(index_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, index_start, size, mtime, nb_shapes, nb_items, nb_nfts = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise Exception(f"{index_path} is not a shape data index")
+    if data_path is not None and _is_stale(data_path, size, mtime):
+        raise Exception(f"{index_path} is out of date with {data_path}")
+    offset = _HEADER.size
+
+    def take(count, shape):
+        nonlocal offset
+        arr = np.frombuffer(buffer, dtype='<u8', count=count, offset=offset).reshape(shape)
+        offset += count * 8
+        return arr
+
+    shape_offsets = take(nb_shapes + 1, (-1,))
+    nft_offsets = take(nb_shapes + 1, (-1,))
+    return ShapeData(
+        index_start=None if index_start == -1 else index_start,
+        shape_offsets=shape_offsets,
+        shape_data=take(nb_items * 2 * NB_LIMBS, (-1, 2, NB_LIMBS)),
+        nft_offsets=nft_offsets,
+        nft_data=take(nb_nfts * NB_LIMBS, (-1, NB_LIMBS)),
+    )
+
+
+def load_shape_data(data_path: str) -> ShapeData:
+    """Open the index for a data file, (re)building it first if it is missing or stale."""
+    index_path = index_path_for(data_path)
+    if os.path.exists(index_path):
+        with open(index_path, 'rb') as f:
+            header = f.read(_HEADER.size)
+        if len(header) == _HEADER.size:
+            magic, _, size, mtime, *_ = _HEADER.unpack(header)
+            if magic == _MAGIC and not _is_stale(data_path, size, mtime):
+                return open_index(index_path)
+    return open_index(build_index(data_path, index_path))
+
+
+def _is_stale(data_path, size, mtime):
+    stat = os.stat(data_path)
+    return stat.st_size != size or stat.st_mtime_ns != mtime
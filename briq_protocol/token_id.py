@@ -0,0 +1,126 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from starkware.cairo.common.hash_state import compute_hash_on_elements
+from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash
+
+# Set token ids as computed on chain, so they can be predicted without calling the contracts.
+# get_token_id and get_1155_token_id mirror src/set_nft/assembly.cairo,
+# hash_token_id is the legacy Cairo 0 scheme (contracts/set_nft).
+
+# 2**251 - 256, the bound for contract addresses.
+ADDR_BOUND = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00
+TOKEN_ID_MASK = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+@lru_cache(maxsize=4096)
+def owner_prefix(owner: int) -> int:
+    """pedersen(0, owner), the part of the hash chain shared by all sets of an owner."""
+    return pedersen_hash(0, owner)
+
+
+def get_token_id(owner: int, token_id_hint: int, nb_briqs: int, attribute_group_id: int = 0) -> int:
+    hash = pedersen_hash(owner_prefix(owner), token_id_hint)
+    hash = pedersen_hash(hash, nb_briqs)
+    return ((hash & TOKEN_ID_MASK) + attribute_group_id) % ADDR_BOUND
+
+
+def get_token_ids(
+    owner: Union[int, Sequence[int]],
+    token_id_hint: Union[int, Sequence[int]],
+    nb_briqs: Union[int, Sequence[int]],
+    attribute_group_id: Union[int, Sequence[int]] = 0,
+) -> List[int]:
+    """
+    get_token_id over many sets. Arguments are sequences of the same length, or a single value used for every set
+    (typically the owner, when predicting the ids of a whole wallet).
+    """
+    columns = [owner, token_id_hint, nb_briqs, attribute_group_id]
+    lengths = {len(c) for c in columns if not isinstance(c, int)}
+    if len(lengths) > 1:
+        raise Exception("All sequences must have the same length")
+    n = lengths.pop() if lengths else 1
+    owner, token_id_hint, nb_briqs, attribute_group_id = [[c] * n if isinstance(c, int) else c for c in columns]
+    return [get_token_id(*args) for args in zip(owner, token_id_hint, nb_briqs, attribute_group_id)]
+
+
+def get_1155_token_id(attribute_id: int, attribute_group_id: int) -> int:
+    if attribute_group_id >= 2**32:
+        raise Exception('Attribute group too large')
+    return (attribute_id * 2**32 + attribute_group_id) % ADDR_BOUND
+
+
+def hash_token_id(owner: int, token_id_hint: int, uri: Sequence[int]) -> int:
+    """Legacy Cairo 0 set token ids: the low 59 bits hold the second felt of a short uri."""
+    raw_tid = compute_hash_on_elements([owner, token_id_hint]) & ((2**251 - 1) - (2**59 - 1))
+    if len(uri) == 2 and uri[1] < 2**59:
+        raw_tid += uri[1]
+    return raw_tid
+
+
+def _token_ids_chunk(args) -> List[int]:
+    owner, hints, nb_briqs, attribute_group_id = args
+    prefix = owner_prefix(owner)
+    return [
+        ((pedersen_hash(pedersen_hash(prefix, hint), nb_briqs) & TOKEN_ID_MASK) + attribute_group_id) % ADDR_BOUND
+        for hint in hints
+    ]
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def scan_collisions(
+    owner: int,
+    hints: Iterable[int],
+    nb_briqs: int,
+    attribute_group_id: int = 0,
+    existing: Iterable[int] = (),
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Tuple[int, int, Optional[int]]]:
+    """
+    Compute the token id of every candidate hint and report the ones that collide,
+    either with an id in `existing` or with the id of an earlier hint.
+    Hashing runs on a process pool, hints are streamed so they can come from a generator.
+    :param workers: Number of processes, 0 to run serially in this process.
+    :return: (hint, token_id, earlier hint or None if it collides with `existing`), in hint order.
+    """
+    seen: Dict[int, Optional[int]] = {token_id: None for token_id in existing}
+    collisions = []
+
+    def merge(hint_chunks, id_chunks):
+        for chunk, ids in zip(hint_chunks, id_chunks):
+            for hint, token_id in zip(chunk, ids):
+                if token_id in seen:
+                    collisions.append((hint, token_id, seen[token_id]))
+                else:
+                    seen[token_id] = hint
+
+    if workers == 0:
+        chunks = list(_chunks(hints, chunk_size))
+        merge(chunks, map(_token_ids_chunk, [(owner, c, nb_briqs, attribute_group_id) for c in chunks]))
+        return collisions
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Only keep a few chunks in flight, to bound memory when hints is a long generator.
+        window = []
+        for chunk in _chunks(hints, chunk_size):
+            window.append((chunk, executor.submit(_token_ids_chunk, (owner, chunk, nb_briqs, attribute_group_id))))
+            if len(window) >= 4 * workers:
+                merge([window[0][0]], [window[0][1].result()])
+                window.pop(0)
+        merge([c for c, _ in window], [f.result() for _, f in window])
+    return collisions
@@ -121,3 +121,19 @@ func _check_nfts_ok{
         return _check_nfts_ok(shape_len - 1, shape + ShapeItem.SIZE, nfts_len, nfts);
     }
 }
+
+// Check that the i-th NFT position is the position of the i-th NFT item. Expects _check_nfts_ok to pass.
+func _check_nft_positions{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
+}(shape_len: felt, shape: ShapeItem*, nft_positions: felt*) {
+    if (shape_len == 0) {
+        return ();
+    }
+    let nft = is_le_felt(2 ** 250 + 2**249, ((2**129-1) / 2**130) - (shape[0].color_nft_material / 2**130));
+    if (nft == 1) {
+        assert nft_positions[0] = shape[0].x_y_z;
+        return _check_nft_positions(shape_len - 1, shape + ShapeItem.SIZE, nft_positions + 1);
+    } else {
+        return _check_nft_positions(shape_len - 1, shape + ShapeItem.SIZE, nft_positions);
+    }
+}
@@ -9057,3 +9057,42 @@ nft_offset_cumulative_end:
 nft_data:
 
 nft_data_end:
+
+nft_position_data:
+
+nft_position_data_end:
+
+ft_offset_cumulative:
+dw 0;
+dw 1;
+dw 2;
+dw 3;
+dw 4;
+dw 5;
+dw 6;
+dw 7;
+dw 8;
+dw 9;
+dw 9;
+ft_offset_cumulative_end:
+
+ft_data:
+dw 0x1;
+dw 32;
+dw 0x1;
+dw 218;
+dw 0x1;
+dw 596;
+dw 0x1;
+dw 26;
+dw 0x1;
+dw 192;
+dw 0x1;
+dw 223;
+dw 0x1;
+dw 29;
+dw 0x1;
+dw 251;
+dw 0x1;
+dw 346;
+ft_data_end:
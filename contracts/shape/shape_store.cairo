@@ -2,7 +2,7 @@
 
 from starkware.cairo.common.cairo_builtins import HashBuiltin, SignatureBuiltin, BitwiseBuiltin
 from starkware.cairo.common.registers import get_label_location
-from starkware.cairo.common.math import assert_le_felt, assert_not_zero
+from starkware.cairo.common.math import assert_le_felt, assert_not_zero, unsigned_div_rem
 from starkware.cairo.common.math_cmp import is_le_felt
 from starkware.cairo.common.alloc import alloc
 from starkware.cairo.common.bitwise import bitwise_and
@@ -13,6 +13,7 @@ from contracts.shape.construction_guards import (
     _check_properly_sorted,
     _check_for_duplicates,
     _check_nfts_ok,
+    _check_nft_positions,
 )
 
 from contracts.shape.data import (
@@ -24,6 +25,12 @@ from contracts.shape.data import (
     nft_offset_cumulative_end,
     nft_data,
     nft_data_end,
+    nft_position_data,
+    nft_position_data_end,
+    ft_offset_cumulative,
+    ft_offset_cumulative_end,
+    ft_data,
+    ft_data_end,
     INDEX_START,
 )
 
@@ -75,6 +82,34 @@ func _get_nft_offsets{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_pt
     );
 }
 
+// Positions of the NFTs, parallel to nft_data (same offsets), increasing X/Y/Z within a shape.
+func _get_nft_position_offsets{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr}(
+    i: felt
+) -> (
+    start: felt*, end: felt*
+) {
+    let (_nft_offset_cumulative_start) = get_label_location(nft_offset_cumulative);
+    let (loc) = get_label_location(nft_position_data);
+    return (
+        loc + [_nft_offset_cumulative_start + i],
+        loc + [_nft_offset_cumulative_start + i + 1]
+    );
+}
+
+// Returns the offsets for the FT counts of the i-th shape, (material, qty) by increasing material. End is exclusive.
+func _get_ft_offsets{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr}(
+    i: felt
+) -> (
+    start: FTSpec*, end: FTSpec*
+) {
+    let (_ft_offset_cumulative_start) = get_label_location(ft_offset_cumulative);
+    let (loc) = get_label_location(ft_data);
+    return (
+        cast(loc + [_ft_offset_cumulative_start + i] * FTSpec.SIZE, FTSpec*),
+        cast(loc + [_ft_offset_cumulative_start + i + 1] * FTSpec.SIZE, FTSpec*)
+    );
+}
+
 @constructor
 func constructor{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
@@ -104,6 +139,16 @@ func _validate_nth_shape{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise
     }
     // Validate that there are the right number/material of NFTs
     _check_nfts_ok(shape_len, shape, nfts_len, nfts);
+    // Validate that the NFT positions, used to look NFTs up, match the shape
+    let (nft_positions, _) = _get_nft_position_offsets(n - 1);
+    with_attr error_message("NFT positions do not match the shape") {
+        _check_nft_positions(shape_len, shape, nft_positions);
+    }
+    // Validate the FT counts of the non-NFT, non-'any material' items
+    let (fts_start, fts_end) = _get_ft_offsets(n - 1);
+    with_attr error_message("FT counts do not match the shape") {
+        _check_ft_counts(shape_len, shape, (fts_end - fts_start) / FTSpec.SIZE, fts_start);
+    }
 
     return _validate_nth_shape(n - 1);
 }
@@ -140,19 +185,34 @@ func compute_shape_hash{
     return ();
 }
 
-// Iterate through positions until we find the right one, incrementing the NFT counter so we return the correct ID.
+// Binary search through the NFT positions, which are sorted like the shape, so this is O(log #NFTs).
 func _find_nft{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
-}(x_y_z: felt, current_item: ShapeItem*, nft_ptr: felt*) -> (token_id: felt) {
-    if (current_item.x_y_z == x_y_z) {
-        let value = [nft_ptr];
-        return (value,);
+}(x_y_z: felt, nft_positions: felt*, nfts: felt*, nfts_len: felt) -> (token_id: felt) {
+    alloc_locals;
+    with_attr error_message("NFT not found in shape") {
+        assert_not_zero(nfts_len);
+    }
+    let (local index) = _bisect_nft(x_y_z, nft_positions, 0, nfts_len);
+    with_attr error_message("NFT not found in shape") {
+        assert nft_positions[index] = x_y_z;
+    }
+    return (nfts[index],);
+}
+
+// Returns the last index in [low, high) whose position is <= x_y_z, or low.
+func _bisect_nft{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
+}(x_y_z: felt, nft_positions: felt*, low: felt, high: felt) -> (index: felt) {
+    if (low + 1 == high) {
+        return (low,);
     }
-    let (nft) = bitwise_and(current_item.color_nft_material, 2 ** 128);
-    if (nft == 2 ** 128) {
-        return _find_nft(x_y_z, current_item + ShapeItem.SIZE, nft_ptr + 1);
+    let (mid, _) = unsigned_div_rem(low + high, 2);
+    let is_before = is_le_felt(nft_positions[mid], x_y_z);
+    if (is_before == 1) {
+        return _bisect_nft(x_y_z, nft_positions, mid, high);
     } else {
-        return _find_nft(x_y_z, current_item + ShapeItem.SIZE, nft_ptr);
+        return _bisect_nft(x_y_z, nft_positions, low, mid);
     }
 }
 
@@ -171,9 +231,9 @@ func decompress_data{
         tempvar out = UncompressedShapeItem(material, color / 2 ** 136, x / 2 ** 128 - 0x8000000000000000, y / 2 ** 64 - 0x8000000000000000, z - 0x8000000000000000, nft);
         return (out,);
     }
-    let (data_address, _) = _get_shape_offsets(local_index);
-    let (nft_offset, _) = _get_nft_offsets(local_index);
-    let (token_id) = _find_nft(data.x_y_z, cast(data_address, ShapeItem*), nft_offset);
+    let (nft_start, nft_end) = _get_nft_offsets(local_index);
+    let (nft_positions, _) = _get_nft_position_offsets(local_index);
+    let (token_id) = _find_nft(data.x_y_z, nft_positions, nft_start, nft_end - nft_start);
 
     let (color) = bitwise_and(data.color_nft_material, 2 ** 251 - 1 - 2 ** 136 + 1);
     let (material) = bitwise_and(data.color_nft_material, 2 ** 64 - 1);
@@ -190,6 +250,7 @@ func decompress_data{
 func check_shape_numbers_{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
 }(global_index: felt, shape_len: felt, shape: ShapeItem*, fts_len: felt, fts: FTSpec*, nfts_len: felt, nfts: felt*) {
+    alloc_locals;
     with_attr error_message("Wrong number of shape items") {
         let (start, end) = _get_shape_offsets(global_index - INDEX_START);
         assert shape_len = (end - start) / ShapeItem.SIZE;
@@ -200,6 +261,30 @@ func check_shape_numbers_{
         assert nfts_len = end - start;
     }
 
+    // Fast path: when fts are sorted by material, like the stored FT counts, merge them once with the counts,
+    // then only 'any material' items need to update the quantities.
+    let (local grouped_qty: felt*) = alloc();
+    let (stored_fts, stored_fts_end) = _get_ft_offsets(global_index - INDEX_START);
+    let (grouped) = _initialize_grouped_qty(fts_len, fts, (stored_fts_end - stored_fts) / FTSpec.SIZE, stored_fts, grouped_qty);
+    if (grouped == 1) {
+        let (stored_shape, _) = _get_shape_offsets(global_index - INDEX_START);
+        let (stored_nfts, _) = _get_nft_offsets(global_index - INDEX_START);
+        let (stored_nft_positions, _) = _get_nft_position_offsets(global_index - INDEX_START);
+        _check_shape_numbers_grouped_(
+            cast(stored_shape, ShapeItem*),
+            stored_nfts,
+            stored_nft_positions,
+            shape_len,
+            shape,
+            fts_len,
+            fts,
+            grouped_qty,
+            nfts_len,
+            nfts,
+        );
+        return ();
+    }
+
     // NB:
     // - This expects the NFTs to be sorted the same as the shape sorting,
     //   so in the same X/Y/Z order.
@@ -325,6 +410,148 @@ func _check_shape_numbers_impl_{
     }
 }
 
+// Writes fts quantities minus the stored counts into qty. Returns 0 if some stored material wasn't matched,
+// i.e. fts aren't sorted like the counts, in which case the caller falls back to counting every item.
+func _initialize_grouped_qty{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
+}(fts_len: felt, fts: FTSpec*, stored_fts_len: felt, stored_fts: FTSpec*, qty: felt*) -> (grouped: felt) {
+    if (fts_len == 0) {
+        if (stored_fts_len == 0) {
+            return (1,);
+        }
+        return (0,);
+    }
+    if (stored_fts_len != 0) {
+        if (stored_fts[0].token_id == fts[0].token_id) {
+            assert qty[0] = fts[0].qty - stored_fts[0].qty;
+            return _initialize_grouped_qty(
+                fts_len - 1, fts + FTSpec.SIZE, stored_fts_len - 1, stored_fts + FTSpec.SIZE, qty + 1
+            );
+        }
+    }
+    assert qty[0] = fts[0].qty;
+    return _initialize_grouped_qty(fts_len - 1, fts + FTSpec.SIZE, stored_fts_len, stored_fts, qty + 1);
+}
+
+// Same checks as _check_shape_numbers_impl_, but items with a fixed material are already counted,
+// so they're only compared. NFTs are found by position, the stored positions being sorted like the shape.
+func _check_shape_numbers_grouped_{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
+}(
+    stored_shape: ShapeItem*,
+    stored_nfts: felt*,
+    stored_nft_positions: felt*,
+    shape_len: felt,
+    shape: ShapeItem*,
+    fts_len: felt,
+    fts: FTSpec*,
+    qty: felt*,
+    nfts_len: felt,
+    nfts: felt*,
+) {
+    if (shape_len == 0) {
+        with_attr error_message("Wrong number of briqs in shape") {
+            _check_qty_are_correct(fts_len, qty);
+            assert nfts_len = 0;
+        }
+        return ();
+    }
+
+    with_attr error_message("Shapes do not match") {
+        assert stored_shape[0].x_y_z = shape[0].x_y_z;
+    }
+
+    if (stored_shape[0].color_nft_material == ANY_MATERIAL_ANY_COLOR) {
+        // Any material can't be an NFT, the stored NFTs all have their own items.
+        let nft = is_le_felt(2 ** 250 + 2**249, ((2**129-1) / 2**130) - (shape[0].color_nft_material / 2**130));
+        with_attr error_message("Shapes do not match") {
+            assert nft = 0;
+        }
+        let (mat) = bitwise_and(shape[0].color_nft_material, 2 ** 64 - 1);
+        assert_not_zero(mat);
+        _decrement_ft_qty(fts_len, fts, qty, mat, remaining_ft_to_parse=fts_len);
+        return _check_shape_numbers_grouped_(
+            stored_shape + ShapeItem.SIZE,
+            stored_nfts,
+            stored_nft_positions,
+            shape_len - 1,
+            shape + ShapeItem.SIZE,
+            fts_len,
+            fts,
+            qty + fts_len,
+            nfts_len,
+            nfts,
+        );
+    }
+
+    with_attr error_message("Shapes do not match") {
+        assert stored_shape[0].color_nft_material = shape[0].color_nft_material;
+    }
+    if (nfts_len != 0) {
+        if (stored_nft_positions[0] == shape[0].x_y_z) {
+            // Same item as the stored one, so the material was checked in the constructor.
+            with_attr error_message("Incorrect NFT") {
+                assert stored_nfts[0] = nfts[0];
+            }
+            return _check_shape_numbers_grouped_(
+                stored_shape + ShapeItem.SIZE,
+                stored_nfts + 1,
+                stored_nft_positions + 1,
+                shape_len - 1,
+                shape + ShapeItem.SIZE,
+                fts_len,
+                fts,
+                qty,
+                nfts_len - 1,
+                nfts + 1,
+            );
+        }
+    }
+    return _check_shape_numbers_grouped_(
+        stored_shape + ShapeItem.SIZE,
+        stored_nfts,
+        stored_nft_positions,
+        shape_len - 1,
+        shape + ShapeItem.SIZE,
+        fts_len,
+        fts,
+        qty,
+        nfts_len,
+        nfts,
+    );
+}
+
+// Check the stored FT counts against the shape, counting the items like _check_shape_numbers_impl_.
+func _check_ft_counts{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
+}(shape_len: felt, shape: ShapeItem*, fts_len: felt, fts: FTSpec*) {
+    alloc_locals;
+    let (qty: felt*) = alloc();
+    let (qty_end) = _initialize_qty(fts_len, fts, qty);
+    _count_ft_items(shape_len, shape, fts_len, fts, qty_end - fts_len);
+    return ();
+}
+
+func _count_ft_items{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, bitwise_ptr: BitwiseBuiltin*, range_check_ptr
+}(shape_len: felt, shape: ShapeItem*, fts_len: felt, fts: FTSpec*, qty: felt*) {
+    if (shape_len == 0) {
+        _check_qty_are_correct(fts_len, qty);
+        return ();
+    }
+    if (shape[0].color_nft_material == ANY_MATERIAL_ANY_COLOR) {
+        return _count_ft_items(shape_len - 1, shape + ShapeItem.SIZE, fts_len, fts, qty);
+    }
+    let nft = is_le_felt(2 ** 250 + 2**249, ((2**129-1) / 2**130) - (shape[0].color_nft_material / 2**130));
+    if (nft == 1) {
+        return _count_ft_items(shape_len - 1, shape + ShapeItem.SIZE, fts_len, fts, qty);
+    }
+    let (mat) = bitwise_and(shape[0].color_nft_material, 2 ** 64 - 1);
+    assert_not_zero(mat);
+    _decrement_ft_qty(fts_len, fts, qty, mat, remaining_ft_to_parse=fts_len);
+    return _count_ft_items(shape_len - 1, shape + ShapeItem.SIZE, fts_len, fts, qty + fts_len);
+}
+
 // We need to keep a counter for each material we run into.
 // But because of immutability, we'll need to copy the full vector of materials every time.
 func _decrement_ft_qty{
@@ -72,6 +72,10 @@ starkli invoke $ATTR_GROUPS create_attribute_group $WORLD_ADDRESS 0x4 1 $BOOKLET
 starkli invoke $REGISTER_SHAPE_ADDR execute $WORLD_ADDRESS 0x1 0x4 0x02ce658601415217394890c2a35af37065c1a83c7497112ff4c40dfd113eb175 --keystore-password $KEYSTORE_PWD
 starkli invoke $REGISTER_SHAPE_ADDR execute $WORLD_ADDRESS 0x4 0x1 0x8bf0f5ab7709c48d92e242737b1836b88cc06b1b604afdf816a0701607c474 --keystore-password $KEYSTORE_PWD
 
+## Register shape commitments (no verifier class): generate the invocations with briq_protocol.shape_commitment.write_commitments
+# starkli invoke $WORLD_ADDRESS grant_writer str:ShapeCommitment $REGISTER_SHAPE_COMMITMENT_ADDR --keystore-password $KEYSTORE_PWD
+# starkli invoke $REGISTER_SHAPE_COMMITMENT_ADDR execute $WORLD_ADDRESS 0x4 0x2 $COMMITMENT --keystore-password $KEYSTORE_PWD
+
 ####################################
 ####################################
 # Test - mint briqs
@@ -0,0 +1,97 @@
+use starknet::ContractAddress;
+use array::{ArrayTrait, SpanTrait};
+use poseidon::hades_permutation;
+
+use dojo::world::{IWorldDispatcher, IWorldDispatcherTrait};
+
+use briq_protocol::world_config::AdminTrait;
+
+// Allow lists as a Poseidon Merkle root, see briq_protocol/allowlist.py for the tree and the proofs.
+// Only the root is stored, so changing the list is one storage write.
+
+#[derive(Model, Copy, Drop, Serde)]
+struct AllowlistRoot {
+    #[key]
+    allowlist_id: felt252,
+    root: felt252,
+}
+
+#[starknet::interface]
+trait IAllowlist<ContractState> {
+    fn set_root(ref self: ContractState, world: IWorldDispatcher, allowlist_id: felt252, root: felt252);
+    fn is_allowed(
+        self: @ContractState,
+        world: IWorldDispatcher,
+        allowlist_id: felt252,
+        address: ContractAddress,
+        proof: Span<felt252>
+    ) -> bool;
+}
+
+#[dojo::contract]
+mod allowlist {
+    use starknet::{ContractAddress, get_caller_address};
+    use briq_protocol::world_config::AdminTrait;
+    use super::{AllowlistRoot, verify_allowlist_proof};
+
+    #[external(v0)]
+    fn set_root(ref self: ContractState, world: IWorldDispatcher, allowlist_id: felt252, root: felt252) {
+        world.only_admins(@get_caller_address());
+        set!(world, AllowlistRoot { allowlist_id, root });
+    }
+
+    #[external(v0)]
+    fn is_allowed(
+        self: @ContractState,
+        world: IWorldDispatcher,
+        allowlist_id: felt252,
+        address: ContractAddress,
+        proof: Span<felt252>
+    ) -> bool {
+        let root = get!(world, (allowlist_id), AllowlistRoot).root;
+        root != 0 && verify_allowlist_proof(root, address.into(), proof)
+    }
+}
+
+#[inline(always)]
+fn allowlist_leaf(address: felt252) -> felt252 {
+    // poseidon_hash_single
+    let (hash, _, _) = hades_permutation(address, 0, 1);
+    hash
+}
+
+#[inline(always)]
+fn allowlist_node(a: felt252, b: felt252) -> felt252 {
+    // poseidon_hash of the pair, smaller first.
+    let (hash, _, _) = if Into::<felt252, u256>::into(a) < b.into() {
+        hades_permutation(a, b, 2)
+    } else {
+        hades_permutation(b, a, 2)
+    };
+    hash
+}
+
+fn verify_allowlist_proof(root: felt252, address: felt252, mut proof: Span<felt252>) -> bool {
+    let mut node = allowlist_leaf(address);
+    loop {
+        match proof.pop_front() {
+            Option::Some(sibling) => {
+                node = allowlist_node(node, *sibling);
+            },
+            Option::None => {
+                break;
+            }
+        };
+    };
+    node == root
+}
+
+// Panics unless address is in the allow list. Admins are always allowed, like the legacy _onlyAllowed.
+fn assert_allowed(world: IWorldDispatcher, allowlist_id: felt252, address: ContractAddress, proof: Span<felt252>) {
+    if world.is_admin(@address) {
+        return;
+    }
+    let root = get!(world, (allowlist_id), AllowlistRoot).root;
+    assert(root != 0, 'No allow list');
+    assert(verify_allowlist_proof(root, address.into(), proof), 'Not in the allow list');
+}
@@ -1,4 +1,7 @@
 use starknet::ContractAddress;
+use traits::{Into, TryInto, Default};
+use option::OptionTrait;
+use dict::Felt252DictTrait;
 
 use dojo::database::introspect::{
     Enum, Member, Ty, Struct, Introspect, serialize_member, serialize_member_type
@@ -125,6 +128,71 @@ impl AttributeGroupImpl of AttributeGroupTrait {
     }
 }
 
+// Attribute groups already read during this call, so each group is only read once from the world.
+// Owners are stored as a kind (0: not read yet, 1: Admin, 2: Contract) and an address.
+struct AttributeGroupCache {
+    owner_kind: Felt252Dict<u8>,
+    owner: Felt252Dict<felt252>,
+    target_set_contract_address: Felt252Dict<felt252>,
+}
+
+impl AttributeGroupCacheDestruct of Destruct<AttributeGroupCache> {
+    fn destruct(self: AttributeGroupCache) nopanic {
+        self.owner_kind.squash();
+        self.owner.squash();
+        self.target_set_contract_address.squash();
+    }
+}
+
+trait AttributeGroupCacheTrait {
+    fn new() -> AttributeGroupCache;
+    fn get_attribute_group(
+        ref self: AttributeGroupCache, world: IWorldDispatcher, attribute_group_id: u64
+    ) -> AttributeGroup;
+}
+
+impl AttributeGroupCacheImpl of AttributeGroupCacheTrait {
+    fn new() -> AttributeGroupCache {
+        AttributeGroupCache {
+            owner_kind: Default::default(),
+            owner: Default::default(),
+            target_set_contract_address: Default::default(),
+        }
+    }
+
+    fn get_attribute_group(
+        ref self: AttributeGroupCache, world: IWorldDispatcher, attribute_group_id: u64
+    ) -> AttributeGroup {
+        let key: felt252 = attribute_group_id.into();
+        let kind = self.owner_kind.get(key);
+        if kind == 0 {
+            let attribute_group = AttributeGroupTrait::get_attribute_group(world, attribute_group_id);
+            match attribute_group.owner {
+                AttributeGroupOwner::Admin(address) => {
+                    self.owner_kind.insert(key, 1);
+                    self.owner.insert(key, address.into());
+                },
+                AttributeGroupOwner::Contract(contract) => {
+                    self.owner_kind.insert(key, 2);
+                    self.owner.insert(key, contract.into());
+                },
+            };
+            self.target_set_contract_address.insert(key, attribute_group.target_set_contract_address.into());
+            return attribute_group;
+        }
+        let owner: ContractAddress = self.owner.get(key).try_into().unwrap();
+        AttributeGroup {
+            attribute_group_id,
+            owner: if kind == 1 {
+                AttributeGroupOwner::Admin(owner)
+            } else {
+                AttributeGroupOwner::Contract(owner)
+            },
+            target_set_contract_address: self.target_set_contract_address.get(key).try_into().unwrap(),
+        }
+    }
+}
+
 #[starknet::interface]
 trait IAttributeGroups<ContractState> {
     fn create_attribute_group(
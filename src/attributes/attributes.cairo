@@ -14,7 +14,8 @@ use briq_protocol::felt_math::{FeltBitAnd, FeltOrd};
 use briq_protocol::cumulative_balance::{CUM_BALANCE_TOKEN, CB_ATTRIBUTES};
 use briq_protocol::world_config::{WorldConfig};
 use briq_protocol::attributes::attribute_group::{
-    AttributeGroup, AttributeGroupTrait, AttributeGroupOwner
+    AttributeGroup, AttributeGroupTrait, AttributeGroupOwner, AttributeGroupCache,
+    AttributeGroupCacheTrait
 };
 
 use debug::PrintTrait;
@@ -69,6 +70,19 @@ fn assign_attributes(
     attributes: @Array<AttributeItem>,
     shape: @Array<PackedShapeItem>,
     fts: @Array<FTSpec>,
+) {
+    let mut groups = AttributeGroupCacheTrait::new();
+    assign_attributes_cached(world, ref groups, set_owner, set_token_id, attributes, shape, fts);
+}
+
+fn assign_attributes_cached(
+    world: IWorldDispatcher,
+    ref groups: AttributeGroupCache,
+    set_owner: ContractAddress,
+    set_token_id: felt252,
+    attributes: @Array<AttributeItem>,
+    shape: @Array<PackedShapeItem>,
+    fts: @Array<FTSpec>,
 ) {
     if attributes.len() == 0 {
         return;
@@ -80,7 +94,7 @@ fn assign_attributes(
     loop {
         match attr_span.pop_front() {
             Option::Some(attribute) => {
-                inner_attribute_assign(world, set_owner, set_token_id, *attribute, shape, fts);
+                inner_attribute_assign_cached(world, ref groups, set_owner, set_token_id, *attribute, shape, fts);
             },
             Option::None => {
                 break;
@@ -99,12 +113,23 @@ fn inner_attribute_assign(
     attribute: AttributeItem,
     shape: @Array<PackedShapeItem>,
     fts: @Array<FTSpec>,
+) {
+    let mut groups = AttributeGroupCacheTrait::new();
+    inner_attribute_assign_cached(world, ref groups, set_owner, set_token_id, attribute, shape, fts);
+}
+
+fn inner_attribute_assign_cached(
+    world: IWorldDispatcher,
+    ref groups: AttributeGroupCache,
+    set_owner: ContractAddress,
+    set_token_id: felt252,
+    attribute: AttributeItem,
+    shape: @Array<PackedShapeItem>,
+    fts: @Array<FTSpec>,
 ) {
     assert(attribute.attribute_id != 0, 'attribute_id cannot be zero');
 
-    let attribute_group = AttributeGroupTrait::get_attribute_group(
-        world, attribute.attribute_group_id
-    );
+    let attribute_group = groups.get_attribute_group(world, attribute.attribute_group_id);
 
     // check attribute_group exists
     assert(
@@ -144,6 +169,17 @@ fn remove_attributes(
     set_owner: ContractAddress,
     set_token_id: felt252,
     attributes: Array<AttributeItem>
+) {
+    let mut groups = AttributeGroupCacheTrait::new();
+    remove_attributes_cached(world, ref groups, set_owner, set_token_id, attributes);
+}
+
+fn remove_attributes_cached(
+    world: IWorldDispatcher,
+    ref groups: AttributeGroupCache,
+    set_owner: ContractAddress,
+    set_token_id: felt252,
+    attributes: Array<AttributeItem>
 ) {
     if attributes.len() == 0 {
         return ();
@@ -156,7 +192,7 @@ fn remove_attributes(
     loop {
         match attr_span.pop_front() {
             Option::Some(attribute) => {
-                remove_attribute_inner(world, set_owner, set_token_id, *attribute);
+                remove_attribute_inner_cached(world, ref groups, set_owner, set_token_id, *attribute);
             },
             Option::None => {
                 break;
@@ -173,12 +209,21 @@ fn remove_attribute_inner(
     set_owner: ContractAddress,
     set_token_id: felt252,
     attribute: AttributeItem,
+) {
+    let mut groups = AttributeGroupCacheTrait::new();
+    remove_attribute_inner_cached(world, ref groups, set_owner, set_token_id, attribute);
+}
+
+fn remove_attribute_inner_cached(
+    world: IWorldDispatcher,
+    ref groups: AttributeGroupCache,
+    set_owner: ContractAddress,
+    set_token_id: felt252,
+    attribute: AttributeItem,
 ) {
     assert(attribute.attribute_id != 0, 'attribute_id cannot be zero');
 
-    let attribute_group = AttributeGroupTrait::get_attribute_group(
-        world, attribute.attribute_group_id
-    );
+    let attribute_group = groups.get_attribute_group(world, attribute.attribute_group_id);
 
     match attribute_group.owner {
         AttributeGroupOwner::Admin(address) => {
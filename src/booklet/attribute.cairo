@@ -1,5 +1,7 @@
 use starknet::{ContractAddress, ClassHash, get_caller_address};
 use array::{ArrayTrait, SpanTrait};
+use serde::Serde;
+use poseidon::poseidon_hash_span;
 use debug::PrintTrait;
 
 use dojo::world::{IWorldProvider, IWorldDispatcher, IWorldDispatcherTrait};
@@ -63,6 +65,56 @@ mod register_shape_validator {
     }
 }
 
+// A shape can also be validated against a commitment stored in the world,
+// which doesn't need a verifier class per collection.
+#[derive(Model, Copy, Drop, Serde)]
+struct ShapeCommitment {
+    #[key]
+    attribute_group_id: u64,
+    #[key]
+    attribute_id: u64,
+    commitment: felt252,
+}
+
+#[starknet::interface]
+trait IRegisterShapeCommitment<ContractState> {
+    fn execute(
+        ref self: ContractState,
+        world: IWorldDispatcher,
+        attribute_group_id: u64,
+        attribute_id: u64,
+        commitment: felt252,
+    );
+}
+
+#[dojo::contract]
+mod register_shape_commitment {
+    use starknet::get_caller_address;
+    use briq_protocol::world_config::{WorldConfig, AdminTrait};
+    use super::ShapeCommitment;
+
+    #[external(v0)]
+    fn execute(
+        ref self: ContractState,
+        world: IWorldDispatcher,
+        attribute_group_id: u64,
+        attribute_id: u64,
+        commitment: felt252,
+    ) {
+        world.only_admins(@get_caller_address());
+        set!(world, ShapeCommitment { attribute_group_id, attribute_id, commitment });
+    }
+}
+
+// Poseidon hash of the serialized shape followed by the serialized fts
+// (each span is its length then its items), see briq_protocol/shape_commitment.py.
+fn compute_shape_commitment(shape: Span<PackedShapeItem>, fts: Span<FTSpec>) -> felt252 {
+    let mut data: Array<felt252> = array![];
+    shape.serialize(ref data);
+    fts.serialize(ref data);
+    poseidon_hash_span(data.span())
+}
+
 // should panic if check fails, or no validator found
 fn check_shape_via_validator(
     world: IWorldDispatcher,
@@ -71,6 +123,14 @@ fn check_shape_via_validator(
     shape: Span<PackedShapeItem>,
     fts: Span<FTSpec>,
 ) {
+    let stored: ShapeCommitment = get!(
+        world, (attribute_group_id, attribute_id), ShapeCommitment
+    );
+    if stored.commitment != 0 {
+        assert(compute_shape_commitment(shape, fts) == stored.commitment, 'bad shape');
+        return;
+    }
+
     let shape_validator: ShapeValidator = get!(
         world, (attribute_group_id, attribute_id), ShapeValidator
     );
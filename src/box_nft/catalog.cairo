@@ -0,0 +1,52 @@
+// Generated by briq_protocol.box_catalog from briq_protocol/data/box_catalog.json, do not edit.
+use array::ArrayTrait;
+use traits::{Into, TryInto};
+use option::OptionTrait;
+
+use briq_protocol::types::FTSpec;
+use briq_protocol::box_nft::unboxing::BoxInfo;
+
+fn get_box_infos(box_id: felt252) -> BoxInfo {
+    let box_id: u64 = match box_id.try_into() {
+        Option::Some(box_id) => box_id,
+        Option::None => panic_with_felt252('invalid box id'),
+    };
+    if box_id >= 1 && box_id <= 10 {
+        let box_id_index: felt252 = (box_id - 1).into();
+        match box_id_index {
+            0 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 434 }].span(), attribute_group_id: 1, attribute_id: 1 };
+            },
+            1 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 1252 }].span(), attribute_group_id: 1, attribute_id: 2 };
+            },
+            2 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 2636 }].span(), attribute_group_id: 1, attribute_id: 3 };
+            },
+            3 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 431 }].span(), attribute_group_id: 1, attribute_id: 4 };
+            },
+            4 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 1246 }].span(), attribute_group_id: 1, attribute_id: 5 };
+            },
+            5 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 2287 }].span(), attribute_group_id: 1, attribute_id: 6 };
+            },
+            6 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 431 }].span(), attribute_group_id: 1, attribute_id: 7 };
+            },
+            7 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 1286 }].span(), attribute_group_id: 1, attribute_id: 8 };
+            },
+            8 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 2392 }].span(), attribute_group_id: 1, attribute_id: 9 };
+            },
+            9 => {
+                return BoxInfo { briqs: array![FTSpec { token_id: 0x1, qty: 60 }].span(), attribute_group_id: 2, attribute_id: 1 };
+            },
+            _ => {},
+        };
+    }
+    assert(false, 'invalid box id');
+    BoxInfo { briqs: array![].span(), attribute_group_id: 0, attribute_id: 0 }
+}
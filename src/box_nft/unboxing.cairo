@@ -1,4 +1,5 @@
 use starknet::ContractAddress;
+use array::SpanTrait;
 
 use dojo::world::IWorldDispatcher;
 
@@ -7,6 +8,7 @@ use briq_protocol::attributes::attribute_group::{AttributeGroup, AttributeGroupT
 use briq_protocol::erc::mint_burn::{MintBurnDispatcher, MintBurnDispatcherTrait};
 use briq_protocol::erc::erc1155::internal_trait::InternalTrait1155;
 use briq_protocol::booklet::attribute::calc_booklet_token_id;
+use briq_protocol::types::FTSpec;
 
 // starknet planets : attribute_group_id: 1
 // briqmas          : attribute_group_id: 2
@@ -15,39 +17,13 @@ use briq_protocol::booklet::attribute::calc_booklet_token_id;
 
 #[derive(Drop, Copy, Serde)]
 struct BoxInfo {
-    briq_1: u128, // nb of briqs of material 0x1
+    briqs: Span<FTSpec>, // nb of briqs per material
     attribute_group_id: u64,
     attribute_id: u64,
 }
 
-fn get_box_infos(box_id: felt252) -> BoxInfo {
-    // starknet planets
-    if box_id == 1 {
-        return BoxInfo { briq_1: 434, attribute_group_id: 1, attribute_id: 1 };
-    } else if box_id == 2 {
-        return BoxInfo { briq_1: 1252, attribute_group_id: 1, attribute_id: 2 };
-    } else if box_id == 3 {
-        return BoxInfo { briq_1: 2636, attribute_group_id: 1, attribute_id: 3 };
-    } else if box_id == 4 {
-        return BoxInfo { briq_1: 431, attribute_group_id: 1, attribute_id: 4 };
-    } else if box_id == 5 {
-        return BoxInfo { briq_1: 1246, attribute_group_id: 1, attribute_id: 5 };
-    } else if box_id == 6 {
-        return BoxInfo { briq_1: 2287, attribute_group_id: 1, attribute_id: 6 };
-    } else if box_id == 7 {
-        return BoxInfo { briq_1: 431, attribute_group_id: 1, attribute_id: 7 };
-    } else if box_id == 8 {
-        return BoxInfo { briq_1: 1286, attribute_group_id: 1, attribute_id: 8 };
-    } else if box_id == 9 {
-        return BoxInfo { briq_1: 2392, attribute_group_id: 1, attribute_id: 9 };
-    } else if box_id == 10 {
-        // briqmas
-        return BoxInfo { briq_1: 60, attribute_group_id: 2, attribute_id: 1 };
-    }
-
-    assert(false, 'invalid box id');
-    BoxInfo { briq_1: 0, attribute_group_id: 0, attribute_id: 0 }
-}
+// Generated from briq_protocol/data/box_catalog.json, see briq_protocol/box_catalog.py.
+use briq_protocol::box_nft::catalog::get_box_infos;
 
 #[starknet::interface]
 trait Unboxing<ContractState> {
@@ -81,7 +57,16 @@ fn unbox<
     );
 
     // Mint briqs
-    MintBurnDispatcher { contract_address: get_world_config(world).briq }.mint(
-        owner, 1, box_infos.briq_1
-    );
+    let briq = MintBurnDispatcher { contract_address: get_world_config(world).briq };
+    let mut briqs = box_infos.briqs;
+    loop {
+        match briqs.pop_front() {
+            Option::Some(ft) => {
+                briq.mint(owner, *ft.token_id, *ft.qty);
+            },
+            Option::None => {
+                break;
+            }
+        };
+    };
 }
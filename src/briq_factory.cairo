@@ -11,10 +11,13 @@ trait IBriqFactory<ContractState> {
         material: u64,
         amount_u32: u32
     );
+    fn buy_many(ref self: ContractState, purchases: Array<(u64, u32)>);
 }
 
 #[dojo::contract]
 mod briq_factory {
+    use array::{ArrayTrait, SpanTrait};
+    use option::OptionTrait;
     use starknet::{get_caller_address, ContractAddress, ClassHash};
     use starknet::get_block_timestamp;
     
@@ -23,7 +26,7 @@ mod briq_factory {
 
     use briq_protocol::briq_factory::constants::{
         DECIMALS, INFLECTION_POINT, SLOPE, RAW_FLOOR, LOWER_FLOOR, LOWER_SLOPE, DECAY_PER_SECOND,
-        SURGE_SLOPE, MINIMAL_SURGE, SURGE_DECAY_PER_SECOND, MIN_PURCHASE, BRIQ_MATERIAL
+        SURGE_SLOPE, MINIMAL_SURGE, SURGE_DECAY_PER_SECOND, MIN_PURCHASE, MAX_PURCHASE, BRIQ_MATERIAL
     };
 
     use briq_protocol::briq_factory::models::{BriqFactoryStore, BriqFactoryTrait};
@@ -107,6 +110,63 @@ mod briq_factory {
                 world, BriqsBought { buyer, amount: amount_u32, price: price.try_into().unwrap() }
             );
         }
+
+        // Same as calling buy for each (material, amount), with a single read of the stores,
+        // a single payment and a single mint.
+        fn buy_many(ref self: ContractState, purchases: Array<(u64, u32)>) {
+            let world = self.world_dispatcher.read();
+
+            let briq_factory = BriqFactoryTrait::get_briq_factory(world);
+            let world_config = get_world_config(world);
+            let buyer = get_caller_address();
+
+            // The store isn't updated by purchases (see buy), so each line is priced on its own.
+            let mut prices: Array<felt252> = array![];
+            let mut total_amount: felt252 = 0;
+            let mut total_price: felt252 = 0;
+            let mut lines = purchases.span();
+            loop {
+                match lines.pop_front() {
+                    Option::Some(line) => {
+                        let (_, amount_u32) = *line;
+                        let amount: felt252 = amount_u32.into();
+                        assert(amount >= MIN_PURCHASE(), 'amount too low !');
+                        let price = briq_factory.get_price(amount);
+                        prices.append(price);
+                        total_amount += amount;
+                        total_price += price;
+                    },
+                    Option::None => { break; },
+                };
+            };
+            assert(total_amount != 0, 'nothing to buy');
+
+            IERC20Dispatcher { contract_address: briq_factory.buy_token }
+                .transferFrom(buyer, world_config.treasury, total_price.into());
+
+            // Like buy, every line mints BRIQ_MATERIAL.
+            let amount_u128: u128 = total_amount.try_into().unwrap();
+            MintBurnDispatcher { contract_address: world_config.briq }.mint(
+                buyer,
+                BRIQ_MATERIAL(),
+                amount_u128,
+            );
+
+            let mut lines = purchases.span();
+            let mut prices = prices.span();
+            loop {
+                match lines.pop_front() {
+                    Option::Some(line) => {
+                        let (_, amount_u32) = *line;
+                        let price = *prices.pop_front().unwrap();
+                        emit!(
+                            world, BriqsBought { buyer, amount: amount_u32, price: price.try_into().unwrap() }
+                        );
+                    },
+                    Option::None => { break; },
+                };
+            };
+        }
     }
 
     #[external(v0)]
@@ -120,4 +180,17 @@ mod briq_factory {
         let briq_factory = BriqFactoryTrait::get_briq_factory(self.world_dispatcher.read());
         briq_factory.get_surge_t()
     }
+
+    // Largest amount of briqs `buy` would sell for at most `budget`, 0 if none.
+    #[external(v0)]
+    fn get_max_amount(self: @ContractState, budget: u256) -> u32 {
+        let briq_factory = BriqFactoryTrait::get_briq_factory(self.world_dispatcher.read());
+        // Compare in u256 first, allowances can be above P.
+        let max_price: u256 = briq_factory.get_price(MAX_PURCHASE()).into();
+        if budget >= max_price {
+            return MAX_PURCHASE().try_into().unwrap();
+        }
+        let budget: felt252 = budget.try_into().unwrap();
+        briq_factory.get_max_amount(budget).try_into().unwrap()
+    }
 }
@@ -48,6 +48,11 @@ fn MIN_PURCHASE() -> felt252 {
     9
 }
 
+// buy() takes a u32 amount
+fn MAX_PURCHASE() -> felt252 {
+    0xffffffff
+}
+
 fn BRIQ_MATERIAL() -> felt252 {
     1
 }
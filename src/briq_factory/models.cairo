@@ -5,12 +5,13 @@ use zeroable::Zeroable;
 use array::{ArrayTrait, SpanTrait};
 use option::OptionTrait;
 use traits::{Into, TryInto};
+use integer::u256_sqrt;
 
 use briq_protocol::world_config::SYSTEM_CONFIG_ID;
 
 use briq_protocol::briq_factory::constants::{
     DECIMALS, INFLECTION_POINT, SLOPE, RAW_FLOOR, LOWER_FLOOR, LOWER_SLOPE, DECAY_PER_SECOND,
-    SURGE_SLOPE, MINIMAL_SURGE, SURGE_DECAY_PER_SECOND, MIN_PURCHASE, BRIQ_MATERIAL
+    SURGE_SLOPE, MINIMAL_SURGE, SURGE_DECAY_PER_SECOND, MIN_PURCHASE, MAX_PURCHASE, BRIQ_MATERIAL
 };
 
 use briq_protocol::felt_math::{FeltOrd, FeltDiv};
@@ -42,6 +43,7 @@ trait BriqFactoryTrait {
         self: @BriqFactoryStore, slope: felt252, floor: felt252, t2: felt252, t1: felt252
     ) -> felt252;
     fn integrate(self: @BriqFactoryStore, t: felt252, amount: felt252) -> felt252;
+    fn get_max_amount(self: @BriqFactoryStore, budget: felt252) -> felt252;
 }
 
 // #[generate_trait]
@@ -178,4 +180,84 @@ impl BriqFactoryStoreImpl of BriqFactoryTrait {
                     SLOPE(), RAW_FLOOR(), INFLECTION_POINT(), t + amount
                 )
     }
+
+    // Largest amount of briqs whose price fits in budget, 0 if not even one.
+    // Between the inflection point and the surge threshold the price is quadratic in the amount:
+    // solve it from the marginal price at the segment start, then step by one with get_price.
+    fn get_max_amount(self: @BriqFactoryStore, budget: felt252) -> felt252 {
+        if self.get_price(1) > budget {
+            return 0;
+        }
+        // Also bounds the budget left for the square root below, which would overflow u256 past ~3e32.
+        if self.get_price(MAX_PURCHASE()) <= budget {
+            return MAX_PURCHASE();
+        }
+        let t = self.get_current_t();
+        let surge_t = self.get_surge_t();
+
+        // Segment starts, in briqs rounded up so the slopes past the start are the ones of the segment.
+        let mut start = 0;
+        if t < INFLECTION_POINT() {
+            let bp = (INFLECTION_POINT() - t + DECIMALS() - 1) / DECIMALS();
+            if bp < MAX_PURCHASE() && self.get_price(bp) <= budget {
+                start = bp;
+            }
+        }
+        if surge_t < MINIMAL_SURGE() {
+            let bp = (MINIMAL_SURGE() - surge_t + DECIMALS() - 1) / DECIMALS();
+            if start < bp && bp < MAX_PURCHASE() && self.get_price(bp) <= budget {
+                start = bp;
+            }
+        }
+
+        // Marginal price at the start (times DECIMALS) and price slope, per briq.
+        let decimals: u256 = DECIMALS().into();
+        let x0 = t + start * DECIMALS();
+        let mut marginal: u256 = 0;
+        let mut slope: u256 = 0;
+        if x0 < INFLECTION_POINT() {
+            let lower_floor: u256 = LOWER_FLOOR().into();
+            slope = LOWER_SLOPE().into();
+            marginal = slope * x0.into() + lower_floor * decimals;
+        } else {
+            // RAW_FLOOR is negative.
+            let raw_floor: u256 = (0 - RAW_FLOOR()).into();
+            slope = SLOPE().into();
+            marginal = slope * x0.into() - raw_floor * decimals;
+        }
+        let surge_x0 = surge_t + start * DECIMALS();
+        if surge_x0 >= MINIMAL_SURGE() {
+            let surge_slope: u256 = SURGE_SLOPE().into();
+            let surge_x: u256 = (surge_x0 - MINIMAL_SURGE()).into();
+            marginal = marginal + surge_slope * surge_x;
+            slope = slope + surge_slope;
+        }
+
+        // price(start + d) ~= price(start) + marginal * d / DECIMALS + slope * d^2 / 2
+        let mut spent = 0;
+        if start != 0 {
+            spent = self.get_price(start);
+        }
+        let remaining: u256 = (budget - spent).into();
+        let root: u256 = u256_sqrt(marginal * marginal + 2 * slope * decimals * decimals * remaining).into();
+        let d: felt252 = ((root - marginal) / (slope * decimals)).try_into().unwrap();
+
+        let mut amount = start + d;
+        if amount > MAX_PURCHASE() {
+            amount = MAX_PURCHASE();
+        }
+        loop {
+            if amount == MAX_PURCHASE() || self.get_price(amount + 1) > budget {
+                break;
+            }
+            amount = amount + 1;
+        };
+        loop {
+            if amount == 0 || self.get_price(amount) <= budget {
+                break;
+            }
+            amount = amount - 1;
+        };
+        amount
+    }
 }
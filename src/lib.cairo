@@ -4,6 +4,7 @@ mod types;
 mod world_config;
 mod supports_interface;
 mod uri;
+mod allowlist;
 
 mod briq_factory;
 
@@ -34,6 +35,7 @@ mod booklet {
 
 mod box_nft {
     mod unboxing;
+    mod catalog;
 }
 
 mod set_nft {
@@ -67,6 +69,7 @@ mod tests {
 
     mod shapes;
     mod briq_counter;
+    mod test_erc20;
 
     mod test_attributes;
     mod test_box_nft;
@@ -80,8 +83,10 @@ mod tests {
     mod test_briq_factory;
 
     mod test_check_fts_and_shape_match;
+    mod test_histogram_shape_check;
 
     mod test_uri;
+    mod test_allowlist;
 
     mod test_shape_packing;
     mod test_truck_shape;
@@ -15,8 +15,10 @@ use briq_protocol::erc::erc721::models::{
 
 use briq_protocol::world_config::{WorldConfig, get_world_config, AdminTrait};
 use briq_protocol::cumulative_balance::{CUM_BALANCE_TOKEN, CB_BRIQ, CB_ATTRIBUTES, CB_TOTAL_SUPPLY_1155};
-use briq_protocol::attributes::attributes::{assign_attributes, remove_attributes};
-use briq_protocol::attributes::attribute_group::AttributeGroupTrait;
+use briq_protocol::attributes::attributes::{assign_attributes_cached, remove_attributes_cached};
+use briq_protocol::attributes::attribute_group::{
+    AttributeGroupTrait, AttributeGroupCache, AttributeGroupCacheTrait
+};
 use briq_protocol::types::{FTSpec, PackedShapeItem, AttributeItem};
 use briq_protocol::felt_math::FeltBitAnd;
 
@@ -26,30 +28,50 @@ use debug::PrintTrait;
 //###########
 // Assembly/Disassembly
 
+// Moves all materials in a single call to the briq contract.
 fn transfer_briqs(
     world: IWorldDispatcher,
     sender: ContractAddress,
     recipient: ContractAddress,
+    fts: Span<FTSpec>
+) {
+    _transfer_briqs(get_world_config(world).briq, sender, recipient, fts);
+}
+
+fn _transfer_briqs(
+    briq_address: ContractAddress,
+    sender: ContractAddress,
+    recipient: ContractAddress,
     mut fts: Span<FTSpec>
 ) {
-    let briq_address = get_world_config(world).briq;
+    // Keep the TransferSingle event for the common single-material case.
+    if fts.len() == 1 {
+        let ftspec = *fts.pop_front().unwrap();
+        IERC1155Dispatcher { contract_address: briq_address }.safe_transfer_from(
+            sender, recipient, ftspec.token_id.into(), ftspec.qty.into(), array![]
+        );
+        return;
+    }
+    if fts.len() == 0 {
+        return;
+    }
 
+    let mut ids: Array<u256> = array![];
+    let mut amounts: Array<u256> = array![];
     loop {
         match fts.pop_front() {
             Option::Some(ftspec) => {
-                IERC1155Dispatcher { contract_address: briq_address }.safe_transfer_from(
-                    sender,
-                    recipient,
-                    (*ftspec).token_id.into(),
-                    (*ftspec).qty.into(),
-                    array![]
-                );
+                ids.append((*ftspec).token_id.into());
+                amounts.append((*ftspec).qty.into());
             },
             Option::None => {
                 break;
             }
         };
-    }
+    };
+    IERC1155Dispatcher { contract_address: briq_address }.safe_batch_transfer_from(
+        sender, recipient, ids, amounts, array![]
+    );
 }
 
 
@@ -114,13 +136,52 @@ fn get_target_contract_from_attributes(
     (token, attrib)
 }
 
+// Same as get_target_contract_from_attributes, reading attribute groups through `groups`.
+fn get_target_contract_cached(
+    world: IWorldDispatcher,
+    generic_sets: ContractAddress,
+    arr: @Array<AttributeItem>,
+    ref groups: AttributeGroupCache
+) -> (ContractAddress, Option::<AttributeItem>) {
+    let mut token = generic_sets;
+    let mut attrib = Option::<AttributeItem>::None;
+    let mut span = arr.span();
+    loop {
+        match span.pop_front() {
+            Option::Some(attribute_item) => {
+                let attribute_group = groups.get_attribute_group(
+                    world, *attribute_item.attribute_group_id
+                );
+                if attribute_group.target_set_contract_address.is_non_zero() {
+                    token = attribute_group.target_set_contract_address;
+                    attrib = Option::<AttributeItem>::Some(*attribute_item);
+                    break;
+                }
+            },
+            Option::None => {
+                break;
+            }
+        };
+    };
+    (token, attrib)
+}
+
 fn create_token(
     world: IWorldDispatcher, token: ContractAddress, recipient: ContractAddress, token_id: felt252
+) {
+    _create_token(world, get_world_config(world).generic_sets, token, recipient, token_id);
+}
+
+fn _create_token(
+    world: IWorldDispatcher,
+    set_token_contract: ContractAddress,
+    token: ContractAddress,
+    recipient: ContractAddress,
+    token_id: felt252
 ) {
     assert(recipient.is_non_zero(), 'ERC721: mint to 0');
     increase_balance(world, token, recipient, 1);
 
-    let set_token_contract = get_world_config(world).generic_sets;
 
     let token_owner = get!(world, (set_token_contract, token_id), ERC721Owner).address;
     assert(token_owner.is_zero(), 'ERC721: already minted');
@@ -132,10 +193,19 @@ fn create_token(
 
 fn destroy_token(
     world: IWorldDispatcher, token: ContractAddress, owner: ContractAddress, token_id: felt252
+) {
+    _destroy_token(world, get_world_config(world).generic_sets, token, owner, token_id);
+}
+
+fn _destroy_token(
+    world: IWorldDispatcher,
+    set_token_contract: ContractAddress,
+    token: ContractAddress,
+    owner: ContractAddress,
+    token_id: felt252
 ) {
     decrease_balance(world, token, owner, 1);
 
-    let set_token_contract = get_world_config(world).generic_sets;
     let token_owner = get!(world, (set_token_contract, token_id), ERC721Owner).address;
 
     assert(token_owner.is_non_zero(), 'ERC721: invalid token_id');
@@ -184,9 +254,224 @@ trait ISetNftAssembly<ContractState> {
     );
 }
 
+#[derive(Drop, Serde)]
+struct SetAssembly {
+    token_id_hint: felt252,
+    fts: Array<FTSpec>,
+    shape: Array<PackedShapeItem>,
+    attributes: Array<AttributeItem>,
+}
+
+#[derive(Drop, Serde)]
+struct SetDisassembly {
+    token_id: felt252,
+    fts: Array<FTSpec>,
+    attributes: Array<AttributeItem>,
+}
+
+// Same as calling assemble / disassemble once per set, for a single owner,
+// with the world config and attribute groups read once for the whole batch.
+#[starknet::interface]
+trait ISetNftAssemblyBatch<ContractState> {
+    fn assemble_many(
+        ref self: ContractState, owner: ContractAddress, sets: Array<SetAssembly>
+    ) -> Array<felt252>;
+
+    fn disassemble_many(ref self: ContractState, owner: ContractAddress, sets: Array<SetDisassembly>);
+}
+
 use briq_protocol::erc::erc721::internal_trait::InternalTrait721;
 use briq_protocol::erc::erc1155::internal_trait::InternalTrait1155;
 
+// Shared by the single and batch entry points, which take care of checking the caller.
+
+fn assemble_721(
+    world: IWorldDispatcher,
+    world_config: @WorldConfig,
+    ref groups: AttributeGroupCache,
+    owner: ContractAddress,
+    token_id_hint: felt252,
+    fts: Array<FTSpec>,
+    shape: Array<PackedShapeItem>,
+    attributes: Array<AttributeItem>
+) -> felt252 {
+    assert(shape.len() != 0, 'Cannot mint empty set');
+
+    let (token, attrib_option) = get_target_contract_cached(
+        world, *world_config.generic_sets, @attributes, ref groups
+    );
+    assert(token == get_contract_address(), 'Not the correct contract');
+
+    let mut attribute_group_id = 0;
+    if attrib_option.is_some() {
+        attribute_group_id = attrib_option.unwrap().attribute_group_id;
+    } else {
+        // We trust the attributes validation ensures this.
+        check_fts_and_shape_match(fts.span(), shape.span());
+    }
+
+    let token_id = get_token_id(owner, token_id_hint, shape.len(), attribute_group_id);
+    _create_token(world, *world_config.generic_sets, token, owner, token_id.into());
+    _transfer_briqs(*world_config.briq, owner, token_id.try_into().unwrap(), fts.span());
+
+    assign_attributes_cached(world, ref groups, owner, token_id, @attributes, @shape, @fts,);
+
+    token_id.into()
+}
+
+fn disassemble_721(
+    world: IWorldDispatcher,
+    world_config: @WorldConfig,
+    ref groups: AttributeGroupCache,
+    owner: ContractAddress,
+    token_id: felt252,
+    fts: Array<FTSpec>,
+    attributes: Array<AttributeItem>
+) {
+    let (token, _) = get_target_contract_cached(
+        world, *world_config.generic_sets, @attributes, ref groups
+    );
+    assert(token == get_contract_address(), 'Not the correct contract');
+
+    remove_attributes_cached(world, ref groups, owner, token_id, attributes.clone(),);
+
+    _transfer_briqs(*world_config.briq, token_id.try_into().unwrap(), owner, fts.span());
+    check_briqs_and_attributes_are_zero(world, token_id);
+
+    _destroy_token(world, *world_config.generic_sets, token, owner, token_id);
+}
+
+fn assemble_1155<ContractState,
+    impl w: IWorldProvider<ContractState>,
+    impl i: InternalTrait1155<ContractState>,
+    impl drop: Drop<ContractState>,
+>(
+    ref self: ContractState,
+    world_config: @WorldConfig,
+    ref groups: AttributeGroupCache,
+    owner: ContractAddress,
+    fts: Array<FTSpec>,
+    shape: Array<PackedShapeItem>,
+    attributes: Array<AttributeItem>
+) -> felt252 {
+    let world = self.world();
+
+    assert(shape.len() != 0, 'Cannot mint empty set');
+
+    // Check that we are asking for the attribute group that matches this contract
+    // (could be hardcoded instead?)
+    let (token, attrib_option) = get_target_contract_cached(
+        world, *world_config.generic_sets, @attributes, ref groups
+    );
+    let attrib = attrib_option.unwrap().into();
+    assert(token == get_contract_address(), 'Not the correct contract');
+
+    // Token ID is the attribute ID for simplicity, and attribute group as bitpacking marker.
+    let token_id: felt252 = get_1155_token_id(attrib).into();
+
+    self._mint(
+        owner, token_id.into(), 1,
+    );
+
+    _transfer_briqs(*world_config.briq, owner, token_id.try_into().unwrap(), fts.span());
+
+    // TODO: move events here?
+    increase_balance_1155(
+        world, CUM_BALANCE_TOKEN(), token_id.try_into().unwrap(), CB_TOTAL_SUPPLY_1155(), 1
+    );
+
+    // Since tokens are forced for 1155, we trust that validating the attributes validates check_fts_and_shape_match
+    assign_attributes_cached(world, ref groups, owner, token_id, @attributes, @shape, @fts,);
+
+    token_id
+}
+
+fn disassemble_1155<ContractState,
+    impl w: IWorldProvider<ContractState>,
+    impl i: InternalTrait1155<ContractState>,
+    impl drop: Drop<ContractState>,
+>(
+    ref self: ContractState,
+    world_config: @WorldConfig,
+    ref groups: AttributeGroupCache,
+    owner: ContractAddress,
+    token_id: felt252,
+    fts: Array<FTSpec>,
+    attributes: Array<AttributeItem>
+) {
+    let world = self.world();
+    let briq = *world_config.briq;
+
+    // Check that we are asking for the attribute group that matches this contract
+    // (could be hardcoded instead?)
+    let (token, _) = get_target_contract_cached(
+        world, *world_config.generic_sets, @attributes, ref groups
+    );
+    assert(token == get_contract_address(), 'Not the correct contract');
+
+    let nb_briq_tokens = get!(world, (
+        CUM_BALANCE_TOKEN(), token_id, CB_BRIQ()
+    ), ERC1155Balance).amount;
+    assert(fts.len().into() == nb_briq_tokens, 'not enough fts');
+
+    let mut prev_briqs = ArrayTrait::<FTSpec>::new();
+    let mut ftsp = fts.span();
+    loop {
+        if ftsp.len() == 0 {
+            break;
+        }
+        let ftspec = *ftsp.pop_front().unwrap();
+        prev_briqs.append(FTSpec { token_id: ftspec.token_id, qty: get!(world, (
+            briq, token_id, ftspec.token_id
+        ), ERC1155Balance).amount });
+    };
+
+    let prev_attrib = get!(world, (
+        CUM_BALANCE_TOKEN(), token_id, CB_ATTRIBUTES()
+    ), ERC1155Balance).amount;
+
+    let token_id_as_address: ContractAddress = token_id.try_into().unwrap();
+    _transfer_briqs(briq, token_id_as_address, owner, fts.span());
+
+    self._burn(token_id.into(), 1);
+
+    decrease_balance_1155(
+        world, CUM_BALANCE_TOKEN(), token_id_as_address, CB_TOTAL_SUPPLY_1155(), 1
+    );
+
+    remove_attributes_cached(world, ref groups, owner, token_id, attributes.clone(),);
+
+    let post_attrib = get!(world, (
+        CUM_BALANCE_TOKEN(), token_id, CB_ATTRIBUTES()
+    ), ERC1155Balance).amount;
+
+    let remaining_supply = get!(world, (
+        CUM_BALANCE_TOKEN(), token_id, CB_TOTAL_SUPPLY_1155()
+    ), ERC1155Balance).amount;
+
+    // Cannot be 0 as we need an attribute for 1155 tokens.
+    assert(post_attrib / (prev_attrib - post_attrib) == remaining_supply, 'Set still has attribs');
+
+    loop {
+        if prev_briqs.len() == 0 {
+            break;
+        }
+        let pre_briq = prev_briqs.pop_front().unwrap();
+        let post_briq = get!(world, (
+            briq, token_id, pre_briq.token_id
+        ), ERC1155Balance).amount;
+        assert(post_briq / (pre_briq.qty - post_briq) == remaining_supply, 'Set still has briqs');
+    };
+}
+
+fn check_assembly_caller(world: IWorldDispatcher, owner: ContractAddress) {
+    // TEMP for migration
+    if owner != get_caller_address() {
+        world.only_admins(@get_caller_address());
+    }
+    // assert(owner == caller, 'Only Owner');
+}
+
 // Default implementation for 721-like contracts
 impl SetNftAssembly721<ContractState,
     impl w: IWorldProvider<ContractState>,
@@ -205,34 +490,12 @@ impl SetNftAssembly721<ContractState,
         attributes: Array<AttributeItem>
     ) -> felt252 {
         let world = self.world();
-        let caller = get_caller_address();
-
-        // TEMP for migration
-        if owner != caller {
-            world.only_admins(@get_caller_address());
-        }
-        // assert(owner == caller, 'Only Owner');
+        check_assembly_caller(world, owner);
 
-        assert(shape.len() != 0, 'Cannot mint empty set');
-
-        let (token, attrib_option) = get_target_contract_from_attributes(world, @attributes);
-        assert(token == get_contract_address(), 'Not the correct contract');
-
-        let mut attribute_group_id = 0;
-        if attrib_option.is_some() {
-            attribute_group_id = attrib_option.unwrap().attribute_group_id;
-        } else {
-            // We trust the attributes validation ensures this.
-            check_fts_and_shape_match(fts.span(), shape.span());
-        }
-
-        let token_id = get_token_id(owner, token_id_hint, shape.len(), attribute_group_id);
-        create_token(world, token, owner, token_id.into());
-        transfer_briqs(world, owner, token_id.try_into().unwrap(), fts.span());
-
-        assign_attributes(world, owner, token_id, @attributes, @shape, @fts,);
-        
-        return token_id.into();
+        let mut groups = AttributeGroupCacheTrait::new();
+        assemble_721(
+            world, @get_world_config(world), ref groups, owner, token_id_hint, fts, shape, attributes
+        )
     }
 
     fn disassemble(
@@ -243,18 +506,64 @@ impl SetNftAssembly721<ContractState,
         attributes: Array<AttributeItem>
     ) {
         let world = self.world();
-        let caller = get_caller_address();
-        assert(owner == caller, 'Only Owner');
+        assert(owner == get_caller_address(), 'Only Owner');
 
-        let (token, _) = get_target_contract_from_attributes(world, @attributes);
-        assert(token == get_contract_address(), 'Not the correct contract');
+        let mut groups = AttributeGroupCacheTrait::new();
+        disassemble_721(world, @get_world_config(world), ref groups, owner, token_id, fts, attributes);
+    }
+}
+
+impl SetNftAssemblyBatch721<ContractState,
+    impl w: IWorldProvider<ContractState>,
+    impl i: InternalTrait721<ContractState>,
+    impl drop: Drop<ContractState>,
+> of ISetNftAssemblyBatch<ContractState> {
+    fn assemble_many(
+        ref self: ContractState, owner: ContractAddress, sets: Array<SetAssembly>
+    ) -> Array<felt252> {
+        let world = self.world();
+        check_assembly_caller(world, owner);
 
-        remove_attributes(world, owner, token_id, attributes.clone(),);
+        let world_config = get_world_config(world);
+        let mut groups = AttributeGroupCacheTrait::new();
+        let mut token_ids = array![];
+        let mut sets = sets;
+        loop {
+            match sets.pop_front() {
+                Option::Some(set) => {
+                    let SetAssembly{token_id_hint, fts, shape, attributes } = set;
+                    token_ids.append(
+                        assemble_721(
+                            world, @world_config, ref groups, owner, token_id_hint, fts, shape, attributes
+                        )
+                    );
+                },
+                Option::None => {
+                    break;
+                }
+            };
+        };
+        token_ids
+    }
 
-        transfer_briqs(world, token_id.try_into().unwrap(), owner, fts.span());
-        check_briqs_and_attributes_are_zero(world, token_id);
+    fn disassemble_many(ref self: ContractState, owner: ContractAddress, sets: Array<SetDisassembly>) {
+        let world = self.world();
+        assert(owner == get_caller_address(), 'Only Owner');
 
-        destroy_token(world, token, owner, token_id);
+        let world_config = get_world_config(world);
+        let mut groups = AttributeGroupCacheTrait::new();
+        let mut sets = sets;
+        loop {
+            match sets.pop_front() {
+                Option::Some(set) => {
+                    let SetDisassembly{token_id, fts, attributes } = set;
+                    disassemble_721(world, @world_config, ref groups, owner, token_id, fts, attributes);
+                },
+                Option::None => {
+                    break;
+                }
+            };
+        };
     }
 }
 
@@ -277,40 +586,10 @@ impl SetNftAssembly1155<ContractState,
         attributes: Array<AttributeItem>
     ) -> felt252 {
         let world = self.world();
-        let caller = get_caller_address();
-
-        // TEMP for migration
-        if owner != caller {
-            world.only_admins(@get_caller_address());
-        }
-        // assert(owner == caller, 'Only Owner');
-
-        assert(shape.len() != 0, 'Cannot mint empty set');
-
-        // Check that we are asking for the attribute group that matches this contract
-        // (could be hardcoded instead?)
-        let (token, attrib_option) = get_target_contract_from_attributes(world, @attributes);
-        let attrib = attrib_option.unwrap().into();
-        assert(token == get_contract_address(), 'Not the correct contract');
+        check_assembly_caller(world, owner);
 
-        // Token ID is the attribute ID for simplicity, and attribute group as bitpacking marker.
-        let token_id: felt252 = get_1155_token_id(attrib).into();
-
-        self._mint(
-            owner, token_id.into(), 1,
-        );
-
-        transfer_briqs(world, owner, token_id.try_into().unwrap(), fts.span());
-
-        // TODO: move events here?
-        increase_balance_1155(
-            world, CUM_BALANCE_TOKEN(), token_id.try_into().unwrap(), CB_TOTAL_SUPPLY_1155(), 1
-        );
-
-        // Since tokens are forced for 1155, we trust that validating the attributes validates check_fts_and_shape_match
-        assign_attributes(world, owner, token_id, @attributes, @shape, @fts,);
-
-        return token_id;
+        let mut groups = AttributeGroupCacheTrait::new();
+        assemble_1155(ref self, @get_world_config(world), ref groups, owner, fts, shape, attributes)
     }
 
     fn disassemble(
@@ -321,93 +600,176 @@ impl SetNftAssembly1155<ContractState,
         attributes: Array<AttributeItem>
     ) {
         let world = self.world();
-        let caller = get_caller_address();
-        assert(owner == caller, 'Only Owner');
+        assert(owner == get_caller_address(), 'Only Owner');
 
-        // Check that we are asking for the attribute group that matches this contract
-        // (could be hardcoded instead?)
-        let (token, _) = get_target_contract_from_attributes(world, @attributes);
-        assert(token == get_contract_address(), 'Not the correct contract');
+        let mut groups = AttributeGroupCacheTrait::new();
+        disassemble_1155(ref self, @get_world_config(world), ref groups, owner, token_id, fts, attributes);
+    }
+}
 
-        let nb_briq_tokens = get!(world, (
-            CUM_BALANCE_TOKEN(), token_id, CB_BRIQ()
-        ), ERC1155Balance).amount;
-        assert(fts.len().into() == nb_briq_tokens, 'not enough fts');
-    
-        let mut prev_briqs = ArrayTrait::<FTSpec>::new();
-        let mut ftsp = fts.span();
+impl SetNftAssemblyBatch1155<ContractState,
+    impl w: IWorldProvider<ContractState>,
+    impl i: InternalTrait1155<ContractState>,
+    impl drop: Drop<ContractState>,
+> of ISetNftAssemblyBatch<ContractState> {
+    fn assemble_many(
+        ref self: ContractState, owner: ContractAddress, sets: Array<SetAssembly>
+    ) -> Array<felt252> {
+        let world = self.world();
+        check_assembly_caller(world, owner);
+
+        let world_config = get_world_config(world);
+        let mut groups = AttributeGroupCacheTrait::new();
+        let mut token_ids = array![];
+        let mut sets = sets;
         loop {
-            if ftsp.len() == 0 {
-                break;
-            }
-            let ftspec = *ftsp.pop_front().unwrap();
-            prev_briqs.append(FTSpec { token_id: ftspec.token_id, qty: get!(world, (
-                get_world_config(world).briq, token_id, ftspec.token_id
-            ), ERC1155Balance).amount });
+            match sets.pop_front() {
+                Option::Some(set) => {
+                    let SetAssembly{token_id_hint: _, fts, shape, attributes } = set;
+                    token_ids.append(
+                        assemble_1155(ref self, @world_config, ref groups, owner, fts, shape, attributes)
+                    );
+                },
+                Option::None => {
+                    break;
+                }
+            };
         };
+        token_ids
+    }
 
-        let prev_attrib = get!(world, (
-            CUM_BALANCE_TOKEN(), token_id, CB_ATTRIBUTES()
-        ), ERC1155Balance).amount;
-
-        let token_id_as_address: ContractAddress = token_id.try_into().unwrap();
-        transfer_briqs(world, token_id_as_address, owner, fts.span());
-
-        self._burn(token_id.into(), 1);
-
-        decrease_balance_1155(
-            world, CUM_BALANCE_TOKEN(), token_id_as_address, CB_TOTAL_SUPPLY_1155(), 1
-        );
-
-        remove_attributes(world, owner, token_id, attributes.clone(),);
+    fn disassemble_many(ref self: ContractState, owner: ContractAddress, sets: Array<SetDisassembly>) {
+        let world = self.world();
+        assert(owner == get_caller_address(), 'Only Owner');
 
-        let post_attrib = get!(world, (
-            CUM_BALANCE_TOKEN(), token_id, CB_ATTRIBUTES()
-        ), ERC1155Balance).amount;
+        let world_config = get_world_config(world);
+        let mut groups = AttributeGroupCacheTrait::new();
+        let mut sets = sets;
+        loop {
+            match sets.pop_front() {
+                Option::Some(set) => {
+                    let SetDisassembly{token_id, fts, attributes } = set;
+                    disassemble_1155(ref self, @world_config, ref groups, owner, token_id, fts, attributes);
+                },
+                Option::None => {
+                    break;
+                }
+            };
+        };
+    }
+}
 
-        let remaining_supply = get!(world, (
-            CUM_BALANCE_TOKEN(), token_id, CB_TOTAL_SUPPLY_1155()
-        ), ERC1155Balance).amount;
+fn check_fts_and_shape_match(fts: Span<FTSpec>, shape: Span<PackedShapeItem>) {
+    if !check_fts_and_shape_match_grouped(fts, shape) {
+        check_fts_and_shape_match_runs(fts, shape);
+    }
+}
 
-        // Cannot be 0 as we need an attribute for 1155 tokens.
-        assert(post_attrib / (prev_attrib - post_attrib) == remaining_supply, 'Set still has attribs');
+#[inline(always)]
+fn shape_material(item: @PackedShapeItem) -> felt252 {
+    // Material is the low 64 bits of color_material.
+    let color_material: u256 = (*item.color_material).into();
+    (color_material.low & 0xffffffffffffffff).into()
+}
 
-        loop {
-            if prev_briqs.len() == 0 {
-                break;
+// Single pass, no dictionary: succeeds when the shape's materials come in runs that follow fts,
+// itself sorted by increasing token_id (which also rules out duplicate FTs).
+// Returns false when that isn't the case, and the caller falls back to check_fts_and_shape_match_runs,
+// which also decides the error for invalid inputs. Only 'Bad ordering' is asserted here.
+fn check_fts_and_shape_match_grouped(mut fts: Span<FTSpec>, mut shape: Span<PackedShapeItem>) -> bool {
+    let mut last_shape = Option::<PackedShapeItem>::None;
+    let mut current = Option::<FTSpec>::None;
+    let mut count: u128 = 0;
+    let grouped = loop {
+        match shape.pop_front() {
+            Option::Some(data) => {
+                if last_shape.is_some() {
+                    assert(last_shape.unwrap() < *data, 'Bad ordering');
+                }
+                last_shape = Option::Some(*data);
+                let material = shape_material(data);
+                let same_run = match current {
+                    Option::Some(ft) => ft.token_id == material,
+                    Option::None => false,
+                };
+                if same_run {
+                    count += 1;
+                } else {
+                    // Close the current run and move on to the next FT.
+                    let mut previous_token_id: u256 = 0;
+                    if current.is_some() {
+                        let ft = current.unwrap();
+                        if ft.qty != count {
+                            break false;
+                        }
+                        previous_token_id = ft.token_id.into();
+                    }
+                    match fts.pop_front() {
+                        Option::Some(ft) => {
+                            if *ft.token_id != material {
+                                break false;
+                            }
+                            if current.is_some() && Into::<felt252, u256>::into(*ft.token_id) <= previous_token_id {
+                                break false;
+                            }
+                            current = Option::Some(*ft);
+                            count = 1;
+                        },
+                        Option::None => {
+                            break false;
+                        }
+                    };
+                }
+            },
+            Option::None => {
+                break true;
             }
-            let pre_briq = prev_briqs.pop_front().unwrap();
-            let post_briq = get!(world, (
-                get_world_config(world).briq, token_id, pre_briq.token_id
-            ), ERC1155Balance).amount;
-            assert(post_briq / (pre_briq.qty - post_briq) == remaining_supply, 'Set still has briqs');
         };
+    };
+    if !grouped || fts.len() != 0 {
+        return false;
+    }
+    match current {
+        Option::Some(ft) => ft.qty == count,
+        Option::None => true,
     }
 }
 
-use starknet::storage_access::{StorePacking};
-use briq_protocol::types::{ShapeItem, ShapePacking};
-
-fn check_fts_and_shape_match(mut fts: Span<FTSpec>, mut shape: Span<PackedShapeItem>) {
+// Counts materials in a dictionary, touched once per run of consecutive same-material briqs
+// rather than once per briq.
+fn check_fts_and_shape_match_runs(mut fts: Span<FTSpec>, mut shape: Span<PackedShapeItem>) {
     let mut balances: Felt252Dict<u128> = Default::default();
     let mut nb_materials = 0;
     let mut last_shape = Option::<PackedShapeItem>::None;
+    let mut run_material = 0;
+    let mut run_length: u128 = 0;
     loop {
-        match shape.pop_front() {
+        let (done, material) = match shape.pop_front() {
             Option::Some(data) => {
-                let shape_item = ShapePacking::unpack(*data);
-                let bl = balances.get(shape_item.material.into());
-                if bl == 0 {
-                    nb_materials += 1;
-                }
-                balances.insert(shape_item.material.into(), bl + 1);
                 if last_shape.is_some() {
                     assert(last_shape.unwrap() < *data, 'Bad ordering');
                 }
                 last_shape = Option::Some(*data);
+                (false, shape_material(data))
             },
-            Option::None => { break; }
+            Option::None => (true, 0),
         };
+        if !done && run_length != 0 && material == run_material {
+            run_length += 1;
+        } else {
+            if run_length != 0 {
+                let bl = balances.get(run_material);
+                if bl == 0 {
+                    nb_materials += 1;
+                }
+                balances.insert(run_material, bl + run_length);
+            }
+            if done {
+                break;
+            }
+            run_material = material;
+            run_length = 1;
+        }
     };
     assert(fts.len() == nb_materials, 'Bad FTS');
     loop {
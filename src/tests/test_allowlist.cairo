@@ -0,0 +1,102 @@
+use dojo::world::{IWorldDispatcher, IWorldDispatcherTrait};
+use testing::get_available_gas;
+use debug::PrintTrait;
+
+use briq_protocol::tests::test_utils::{
+    WORLD_ADMIN, DEFAULT_OWNER, DefaultWorld, spawn_briq_test_world, deploy, impersonate
+};
+use briq_protocol::allowlist::{
+    IAllowlistDispatcher, IAllowlistDispatcherTrait, verify_allowlist_proof, allowlist_leaf, allowlist_node, assert_allowed
+};
+
+// Tree over [0x1, 0x2, 0x3, 0xcafe, 0xfade], from briq_protocol.allowlist.
+const ROOT: felt252 = 0x1a0968438617eda95bea7930fb9ba5ab7c8a96ef386bfedcda71ad664894d5a;
+
+fn cafe_proof() -> Span<felt252> {
+    array![
+        0x522ce35ecb769b5017959d77720ea484b8b8929314a678f2b1b363e4a75bbe1,
+        0x57f373f6c2511666754634a010be324dbb793da0152a550a11156dd4d89c8c2,
+        0x1184aff6bb4b88d3362f008a1e55e774ce3b4451395ad75a7fe64dd1fc06f37,
+    ].span()
+}
+
+#[test]
+#[available_gas(30000000)]
+fn test_verify_proof() {
+    assert(verify_allowlist_proof(ROOT, 0xcafe, cafe_proof()), 'should verify');
+    // Last node of an odd level: only one sibling.
+    assert(
+        verify_allowlist_proof(ROOT, 0xfade, array![0x642bcccc6e012cad52e6828482d45663e04995dab8309652d2afa89c326e84c].span()),
+        'should verify'
+    );
+    assert(!verify_allowlist_proof(ROOT, 0xcafd, cafe_proof()), 'should not verify');
+    assert(!verify_allowlist_proof(ROOT, 0xcafe, array![].span()), 'should not verify');
+}
+
+#[test]
+#[available_gas(300000000)]
+fn test_allowlist() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+    let allowlist = IAllowlistDispatcher { contract_address: deploy(world, briq_protocol::allowlist::allowlist::TEST_CLASS_HASH) };
+
+    assert(!allowlist.is_allowed(world, 'auction', DEFAULT_OWNER(), cafe_proof()), 'no root yet');
+    allowlist.set_root(world, 'auction', ROOT);
+    assert(allowlist.is_allowed(world, 'auction', DEFAULT_OWNER(), cafe_proof()), 'should be allowed');
+    assert(!allowlist.is_allowed(world, 'other', DEFAULT_OWNER(), cafe_proof()), 'other list');
+
+    assert_allowed(world, 'auction', DEFAULT_OWNER(), cafe_proof());
+    // Admins don't need a proof.
+    assert_allowed(world, 'auction', WORLD_ADMIN(), array![].span());
+}
+
+#[test]
+#[available_gas(300000000)]
+#[should_panic(expected: ('Not in the allow list',))]
+fn test_not_allowed() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+    let allowlist = IAllowlistDispatcher { contract_address: deploy(world, briq_protocol::allowlist::allowlist::TEST_CLASS_HASH) };
+    allowlist.set_root(world, 'auction', ROOT);
+    assert_allowed(world, 'auction', starknet::contract_address_const::<0xcafd>(), cafe_proof());
+}
+
+#[test]
+#[available_gas(300000000)]
+#[should_panic(expected: ('Not authorized', 'ENTRYPOINT_FAILED'))]
+fn test_set_root_not_admin() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+    let allowlist = IAllowlistDispatcher { contract_address: deploy(world, briq_protocol::allowlist::allowlist::TEST_CLASS_HASH) };
+    impersonate(DEFAULT_OWNER());
+    allowlist.set_root(world, 'auction', ROOT);
+}
+
+// Gas to verify a proof for a list of 2^depth addresses.
+fn bench_proof(depth: u32) {
+    let mut proof = array![];
+    let mut root = allowlist_leaf(0xcafe);
+    let mut i = 0;
+    loop {
+        if i == depth {
+            break;
+        }
+        let sibling = allowlist_leaf(i.into());
+        proof.append(sibling);
+        root = allowlist_node(root, sibling);
+        i += 1;
+    };
+
+    let gas_start = get_available_gas();
+    assert(verify_allowlist_proof(root, 0xcafe, proof.span()), 'should verify');
+    let gas = gas_start - get_available_gas();
+    'proof depth'.print();
+    depth.print();
+    gas.print();
+}
+
+#[test]
+#[available_gas(300000000)]
+fn bench_allowlist_proof() {
+    // ~660 addresses (the auction_onchain mainnet list), 65k, 1M.
+    bench_proof(10);
+    bench_proof(16);
+    bench_proof(20);
+}
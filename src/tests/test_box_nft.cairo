@@ -70,3 +70,41 @@ fn test_mint_and_unbox() {
 
     assert(UnboxingSafeDispatcher { contract_address: box_nft.contract_address }.unbox(10).is_err(), 'expect error');
 }
+
+use array::SpanTrait;
+use testing::get_available_gas;
+use briq_protocol::box_nft::catalog::get_box_infos;
+
+#[test]
+#[available_gas(30000000)]
+fn test_box_catalog() {
+    let infos = get_box_infos(10);
+    assert(infos.attribute_group_id == 2 && infos.attribute_id == 1, 'bad booklet');
+    assert(infos.briqs.len() == 1, 'bad briqs');
+    assert(*infos.briqs.at(0).token_id == 1 && *infos.briqs.at(0).qty == 60, 'bad briqs');
+
+    // Jump table: the last box costs the same as the first.
+    let gas_start = get_available_gas();
+    get_box_infos(1);
+    let first = gas_start - get_available_gas();
+    let gas_start = get_available_gas();
+    get_box_infos(10);
+    let last = gas_start - get_available_gas();
+    'box 1 / box 10'.print();
+    first.print();
+    last.print();
+}
+
+#[test]
+#[available_gas(30000000)]
+#[should_panic(expected: ('invalid box id',))]
+fn test_box_catalog_invalid_box() {
+    get_box_infos(11);
+}
+
+#[test]
+#[available_gas(30000000)]
+#[should_panic(expected: ('invalid box id',))]
+fn test_box_catalog_invalid_box_felt() {
+    get_box_infos(0x10000000000000001);
+}
@@ -4,8 +4,11 @@ use option::{Option, OptionTrait};
 use result::ResultTrait;
 use array::ArrayTrait;
 use serde::Serde;
+use integer::BoundedInt;
+use poseidon::poseidon_hash_span;
 
 use starknet::testing::{set_caller_address, set_contract_address, set_block_timestamp};
+use testing::get_available_gas;
 use starknet::ContractAddress;
 use starknet::info::get_block_timestamp;
 
@@ -16,14 +19,22 @@ use briq_protocol::tests::test_utils::{
 
 use briq_protocol::briq_factory::constants::{
     DECIMALS, LOWER_FLOOR, LOWER_SLOPE, INFLECTION_POINT, DECAY_PER_SECOND, MINIMAL_SURGE, SLOPE,
-    RAW_FLOOR
+    RAW_FLOOR, MAX_PURCHASE
 };
 use briq_protocol::briq_factory::models::{BriqFactoryStore, BriqFactoryTrait};
 use briq_protocol::briq_factory::{IBriqFactoryDispatcher, IBriqFactoryDispatcherTrait};
 use briq_protocol::felt_math::{FeltOrd, FeltDiv};
 use briq_protocol::world_config::get_world_config;
+use briq_protocol::tests::test_erc20::{ITestERC20Dispatcher, ITestERC20DispatcherTrait};
+use presets::erc1155::erc1155::interface::IERC1155DispatcherTrait;
 use debug::PrintTrait;
 
+// The get_max_amount view, not part of IBriqFactory.
+#[starknet::interface]
+trait IBriqFactoryMaxAmount<TState> {
+    fn get_max_amount(self: @TState, budget: u256) -> u32;
+}
+
 fn init_briq_factory(world: IWorldDispatcher, t: felt252, surge_t: felt252,) -> BriqFactoryStore {
     impersonate(WORLD_ADMIN());
     IBriqFactoryDispatcher { contract_address: get_world_config(world).factory }.initialize(
@@ -201,6 +212,163 @@ fn test_overflows_bad_max_t() {
     briq_factory.get_price(1);
 }
 
+fn assert_max_amount(briq_factory: BriqFactoryStore, budget: felt252) {
+    let amount = briq_factory.get_max_amount(budget);
+    if amount != 0 {
+        assert(briq_factory.get_price(amount) <= budget, 'max amount over budget');
+    }
+    if amount != MAX_PURCHASE() {
+        assert(briq_factory.get_price(amount + 1) > budget, 'max amount not max');
+    }
+}
+
+#[test]
+#[available_gas(900000000)]
+fn test_max_amount() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+
+    let briq_factory = init_briq_factory(world, 0, 0);
+    assert(briq_factory.get_max_amount(10000025000000 - 1) == 0, 'bad max amount 0');
+    assert(briq_factory.get_max_amount(10000025000000) == 1, 'bad max amount 1');
+    assert(briq_factory.get_max_amount(10025000000000000) == 1000, 'bad max amount 1000');
+
+    // Budgets ending below, across and above the inflection point and the surge threshold.
+    let mut budgets = array![
+        12345678901234567, 4062522500075000000, 9876543210987654321, 123456789012345678901234
+    ];
+    loop {
+        match budgets.pop_front() {
+            Option::Some(budget) => {
+                assert_max_amount(init_briq_factory(world, 0, 0), budget);
+                assert_max_amount(init_briq_factory(world, INFLECTION_POINT() - 1000 * DECIMALS() - 1, 0), budget);
+                assert_max_amount(init_briq_factory(world, INFLECTION_POINT(), MINIMAL_SURGE()), budget);
+                assert_max_amount(init_briq_factory(world, 123456 * DECIMALS(), MINIMAL_SURGE() - 10 * DECIMALS()), budget);
+            },
+            Option::None => { break; },
+        };
+    };
+}
+
+#[test]
+#[available_gas(900000000)]
+fn test_max_amount_large_budget() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+
+    // Past ~3e32 the quadratic solve would overflow u256, these budgets cover MAX_PURCHASE anyway.
+    let briq_factory = init_briq_factory(world, 0, 0);
+    assert(briq_factory.get_max_amount(1000000000000000000000000000000000) == MAX_PURCHASE(), 'bad max amount 1e33');
+    assert(briq_factory.get_max_amount(0x400000000000000000000000000000000000000000000000000000000000000) == MAX_PURCHASE(), 'bad max amount 2^250');
+
+    let briq_factory = init_briq_factory(world, INFLECTION_POINT(), MINIMAL_SURGE());
+    let price = briq_factory.get_price(MAX_PURCHASE());
+    assert(briq_factory.get_max_amount(price) == MAX_PURCHASE(), 'bad max amount at max');
+    assert(briq_factory.get_max_amount(price - 1) == MAX_PURCHASE() - 1, 'bad max amount below max');
+}
+
+fn pow10(mut exponent: u128) -> u128 {
+    let mut result = 1;
+    loop {
+        if exponent == 0 {
+            break result;
+        }
+        result *= 10;
+        exponent -= 1;
+    }
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn test_max_amount_sweep() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+
+    let states = array![
+        (0, 0),
+        (INFLECTION_POINT() - 1000 * DECIMALS() - 1, 0),
+        (INFLECTION_POINT(), MINIMAL_SURGE()),
+        (123456 * DECIMALS(), MINIMAL_SURGE() - 10 * DECIMALS()),
+    ];
+    // Pseudo-random budgets from 10^13 (about one briq) to 10^29 (past MAX_PURCHASE), seeded by poseidon.
+    let mut i: u32 = 0;
+    loop {
+        if i == 32 {
+            break;
+        }
+        let hash: u256 = poseidon_hash_span(array!['max amount sweep', i.into()].span()).into();
+        let budget: felt252 = (hash.low % pow10(13 + hash.high % 17)).into();
+        let (t, surge_t) = *states.at(i % 4);
+        assert_max_amount(init_briq_factory(world, t, surge_t), budget);
+        i += 1;
+    };
+}
+
+#[test]
+#[available_gas(900000000)]
+fn test_max_amount_view() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+    let briq_factory = init_briq_factory(world, 0, 0);
+    let view = IBriqFactoryMaxAmountDispatcher { contract_address: get_world_config(world).factory };
+    let max_purchase: u32 = MAX_PURCHASE().try_into().unwrap();
+
+    assert(view.get_max_amount(10025000000000000) == 1000, 'bad max amount 1000');
+    let price: u256 = briq_factory.get_price(MAX_PURCHASE()).into();
+    assert(view.get_max_amount(price) == max_purchase, 'bad max amount at max');
+    assert(view.get_max_amount(price - 1) == max_purchase - 1, 'bad max amount below max');
+    // Allowances at or above P don't fit a felt252.
+    assert(view.get_max_amount(BoundedInt::max()) == max_purchase, 'bad max amount u256 max');
+    assert(
+        view.get_max_amount(u256 { low: 1, high: 0x8000000000000110000000000000000 }) == max_purchase,
+        'bad max amount P'
+    );
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn test_buy_many() {
+    let DefaultWorld{world, briq_token, .. } = spawn_briq_test_world();
+    let erc20 = deploy(world, briq_protocol::tests::test_erc20::TestERC20::TEST_CLASS_HASH);
+    let factory = IBriqFactoryDispatcher { contract_address: get_world_config(world).factory };
+    impersonate(WORLD_ADMIN());
+    factory.initialize(0, 0, erc20);
+    impersonate(DEFAULT_OWNER());
+    let price = BriqFactoryTrait::get_briq_factory(world).get_price(100);
+
+    // Benchmark: 4 buys against one buy_many of the same 4 lines.
+    let gas_start = get_available_gas();
+    factory.buy(1, 100);
+    factory.buy(1, 100);
+    factory.buy(1, 100);
+    factory.buy(1, 100);
+    let sequential = gas_start - get_available_gas();
+
+    let gas_start = get_available_gas();
+    factory.buy_many(array![(1, 100), (1, 100), (1, 100), (1, 100)]);
+    let batched = gas_start - get_available_gas();
+
+    'buy x4 gas'.print();
+    sequential.print();
+    'buy_many x4 gas'.print();
+    batched.print();
+    assert(batched < sequential, 'buy_many not cheaper');
+
+    let erc20 = ITestERC20Dispatcher { contract_address: erc20 };
+    assert(erc20.transfers() == 5, 'bad transfer count');
+    assert(erc20.transferred() == (8 * price).into(), 'bad amount paid');
+    assert(briq_token.balance_of(DEFAULT_OWNER(), 1) == 800, 'bad briq balance');
+}
+
+#[test]
+#[available_gas(300000000)]
+#[should_panic(expected: ('amount too low !', 'ENTRYPOINT_FAILED'))]
+fn test_buy_many_min_purchase() {
+    let DefaultWorld{world, .. } = spawn_briq_test_world();
+    let erc20 = deploy(world, briq_protocol::tests::test_erc20::TestERC20::TEST_CLASS_HASH);
+    let factory = IBriqFactoryDispatcher { contract_address: get_world_config(world).factory };
+    impersonate(WORLD_ADMIN());
+    factory.initialize(0, 0, erc20);
+    impersonate(DEFAULT_OWNER());
+    factory.buy_many(array![(1, 100), (1, 8)]);
+}
+
 //use presets::erc20::erc20::interface::{IERC20Dispatcher, IERC20DispatcherTrait};
 //#[test]
 //#[available_gas(90000000)]
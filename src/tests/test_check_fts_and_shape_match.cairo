@@ -1,4 +1,9 @@
-use briq_protocol::set_nft::assembly::check_fts_and_shape_match;
+use testing::get_available_gas;
+use debug::PrintTrait;
+
+use starknet::storage_access::StorePacking;
+
+use briq_protocol::set_nft::assembly::{check_fts_and_shape_match, check_fts_and_shape_match_runs};
 use briq_protocol::types::{FTSpec, ShapeItem, PackedShapeItem, ShapePacking};
 
 #[test]
@@ -192,3 +197,198 @@ fn test_shape_ordering_bad_ordering_7() {
     ];
     check_fts_and_shape_match(array![].span(), shape.span());
 }
+
+#[test]
+#[available_gas(3000000000)]
+fn test_ok_unsorted_fts() {
+    // Not grouped by material in fts order: goes through the fallback.
+    let fts = array![
+        FTSpec { qty: 1, token_id: 0x2 },
+        FTSpec { qty: 2, token_id: 0x1 },
+    ];
+    let shape = array![
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x1, x: 0, y: 0, z: 0 }),
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x1, x: 1, y: 0, z: 0 }),
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x2, x: 2, y: 0, z: 0 }),
+    ];
+    check_fts_and_shape_match(fts.span(), shape.span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('Bad FTS', ))]
+fn test_bad_fts_duplicate() {
+    // Runs follow fts, but material 1 is listed twice.
+    let fts = array![
+        FTSpec { qty: 1, token_id: 0x1 },
+        FTSpec { qty: 1, token_id: 0x2 },
+        FTSpec { qty: 1, token_id: 0x1 },
+    ];
+    let shape = array![
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x1, x: 0, y: 0, z: 0 }),
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x2, x: 1, y: 0, z: 0 }),
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x1, x: 2, y: 0, z: 0 }),
+    ];
+    check_fts_and_shape_match(fts.span(), shape.span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('Bad FTS', ))]
+fn test_bad_fts_zero_qty() {
+    let fts = array![
+        FTSpec { qty: 1, token_id: 0x1 },
+        FTSpec { qty: 0, token_id: 0x2 },
+    ];
+    let shape = array![
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x1, x: 0, y: 0, z: 0 }),
+    ];
+    check_fts_and_shape_match(fts.span(), shape.span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('Bad FTS', ))]
+fn test_bad_fts_color_bits() {
+    // Only the low 64 bits of color_material are the material.
+    let fts = array![
+        FTSpec { qty: 1, token_id: 0x1 },
+    ];
+    let shape = array![
+        ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 0x2, x: 0, y: 0, z: 0 }),
+    ];
+    check_fts_and_shape_match(fts.span(), shape.span());
+}
+
+// Previous check_fts_and_shape_match, unpacking every briq and touching the dictionary for each.
+// Only kept here, as the benchmark baseline.
+fn check_fts_and_shape_match_dict(mut fts: Span<FTSpec>, mut shape: Span<PackedShapeItem>) {
+    let mut balances: Felt252Dict<u128> = Default::default();
+    let mut nb_materials = 0;
+    let mut last_shape = Option::<PackedShapeItem>::None;
+    loop {
+        match shape.pop_front() {
+            Option::Some(data) => {
+                let shape_item = ShapePacking::unpack(*data);
+                let bl = balances.get(shape_item.material.into());
+                if bl == 0 {
+                    nb_materials += 1;
+                }
+                balances.insert(shape_item.material.into(), bl + 1);
+                if last_shape.is_some() {
+                    assert(last_shape.unwrap() < *data, 'Bad ordering');
+                }
+                last_shape = Option::Some(*data);
+            },
+            Option::None => { break; }
+        };
+    };
+    assert(fts.len() == nb_materials, 'Bad FTS');
+    loop {
+        match fts.pop_front() {
+            Option::Some(data) => {
+                assert(data.qty == @balances.get((*data.token_id).into()), 'Bad FTS');
+            },
+            Option::None => { break; }
+        };
+    };
+}
+
+// Shape of nb_briqs briqs along x. Materials are either grouped (the first nb_briqs / nb_materials briqs are material 1, ...)
+// or interleaved (1, 2, ..., nb_materials, 1, 2, ...).
+fn bench_shape(nb_briqs: u32, nb_materials: u32, grouped: bool) -> (Array<FTSpec>, Array<PackedShapeItem>) {
+    let mut fts = array![];
+    let mut material = 1;
+    loop {
+        if material > nb_materials {
+            break;
+        }
+        let mut qty = nb_briqs / nb_materials;
+        if material <= nb_briqs % nb_materials {
+            qty += 1;
+        }
+        fts.append(FTSpec { token_id: material.into(), qty: qty.into() });
+        material += 1;
+    };
+    let mut shape = array![];
+    let mut i = 0;
+    let mut fts_left = fts.span();
+    let mut left_in_group = 0;
+    let mut group_material = 0;
+    loop {
+        if i == nb_briqs {
+            break;
+        }
+        let material = if grouped {
+            if left_in_group == 0 {
+                let ft = fts_left.pop_front().unwrap();
+                left_in_group = *ft.qty;
+                group_material = *ft.token_id;
+            }
+            left_in_group -= 1;
+            group_material
+        } else {
+            (i % nb_materials + 1).into()
+        };
+        shape.append(ShapePacking::pack(ShapeItem {
+            color: '#ffaaff', material: material.try_into().unwrap(), x: i.into(), y: 0, z: 0
+        }));
+        i += 1;
+    };
+    (fts, shape)
+}
+
+fn bench_check(nb_briqs: u32, nb_materials: u32, grouped: bool) {
+    let (fts, shape) = bench_shape(nb_briqs, nb_materials, grouped);
+
+    let gas_start = get_available_gas();
+    check_fts_and_shape_match_dict(fts.span(), shape.span());
+    let dict = gas_start - get_available_gas();
+
+    let gas_start = get_available_gas();
+    check_fts_and_shape_match_runs(fts.span(), shape.span());
+    let runs = gas_start - get_available_gas();
+
+    let gas_start = get_available_gas();
+    check_fts_and_shape_match(fts.span(), shape.span());
+    let current = gas_start - get_available_gas();
+
+    'briqs / materials'.print();
+    nb_briqs.print();
+    nb_materials.print();
+    grouped.print();
+    'dict'.print();
+    dict.print();
+    'runs'.print();
+    runs.print();
+    'check_fts_and_shape_match'.print();
+    current.print();
+    if grouped {
+        assert(current < dict, 'no gas saved');
+    }
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn bench_check_10_briqs() {
+    bench_check(10, 1, true);
+    bench_check(10, 3, true);
+    bench_check(10, 3, false);
+}
+
+#[test]
+#[available_gas(9000000000)]
+fn bench_check_500_briqs() {
+    bench_check(500, 1, true);
+    bench_check(500, 5, true);
+    bench_check(500, 20, true);
+    bench_check(500, 20, false);
+}
+
+#[test]
+#[available_gas(90000000000)]
+fn bench_check_5000_briqs() {
+    bench_check(5000, 1, true);
+    bench_check(5000, 20, true);
+    bench_check(5000, 20, false);
+}
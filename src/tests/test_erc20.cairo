@@ -0,0 +1,38 @@
+use starknet::ContractAddress;
+
+#[starknet::interface]
+trait ITestERC20<TState> {
+    fn transfers(self: @TState) -> u32;
+    fn transferred(self: @TState) -> u256;
+}
+
+// Accepts every transferFrom and only counts them, for briq_factory tests.
+#[starknet::contract]
+mod TestERC20 {
+    use starknet::ContractAddress;
+
+    #[storage]
+    struct Storage {
+        transfers: u32,
+        transferred: u256,
+    }
+
+    #[external(v0)]
+    fn transferFrom(
+        ref self: ContractState, spender: ContractAddress, recipient: ContractAddress, amount: u256
+    ) {
+        self.transfers.write(self.transfers.read() + 1);
+        self.transferred.write(self.transferred.read() + amount);
+    }
+
+    #[external(v0)]
+    impl TestERC20Impl of super::ITestERC20<ContractState> {
+        fn transfers(self: @ContractState) -> u32 {
+            self.transfers.read()
+        }
+
+        fn transferred(self: @ContractState) -> u256 {
+            self.transferred.read()
+        }
+    }
+}
@@ -0,0 +1,104 @@
+use array::{ArrayTrait, SpanTrait};
+use option::OptionTrait;
+use traits::{Into, Default};
+use dict::Felt252DictTrait;
+use poseidon::poseidon_hash_span;
+
+use briq_protocol::types::{FTSpec, PackedShapeItem};
+
+// Histogram verifier generated by briq_protocol.gen_shape_check for three 'any material' items at x = 0, 1, 2.
+// test_checked_in_histogram_check_is_up_to_date (tests-old/gen_shape_check_test.py) keeps it in sync.
+fn histogram_shape_check(mut shape: Span<PackedShapeItem>, mut fts: Span<FTSpec>) {
+    // histogram (items: 1021, runs: 1021, histogram: 3927)
+    assert(shape.len() == 3, 'bad shape length');
+    let mut data = array![];
+    let mut items = shape;
+    loop {
+        match items.pop_front() {
+            Option::Some(item) => {
+                data.append(*item.x_y_z);
+            },
+            Option::None => { break; }
+        };
+    };
+    assert(poseidon_hash_span(data.span()) == 0x23f6396de4db89f19598578013ea933718bca456387e32d70d1c90c08bc96b4, 'bad shape');
+
+    let mut counts: Felt252Dict<u128> = Default::default();
+    let mut nb_materials = 0;
+    loop {
+        match shape.pop_front() {
+            Option::Some(item) => {
+                let color_material: u256 = (*item.color_material).into();
+                let material: felt252 = (color_material.low & 0xffffffffffffffff).into();
+                let count = counts.get(material);
+                if count == 0 {
+                    nb_materials += 1;
+                }
+                counts.insert(material, count + 1);
+            },
+            Option::None => { break; }
+        };
+    };
+    assert(fts.len() == nb_materials, 'bad fts spec');
+    // Strictly increasing token ids, so a material can't be listed twice, and the quantities must add up.
+    let mut ftsum = 0;
+    let mut previous_token_id: u256 = 0;
+    let mut first = true;
+    loop {
+        match fts.pop_front() {
+            Option::Some(ft) => {
+                let token_id: u256 = (*ft.token_id).into();
+                assert(first || token_id > previous_token_id, 'bad fts spec');
+                first = false;
+                previous_token_id = token_id;
+                assert(*ft.qty == counts.get(*ft.token_id), 'bad fts spec');
+                ftsum += *ft.qty;
+            },
+            Option::None => { break; }
+        };
+    };
+    assert(ftsum == 3, 'bad fts spec');
+}
+
+// Two material-1 briqs and one material-2 briq.
+fn shape() -> Span<PackedShapeItem> {
+    array![
+        PackedShapeItem { color_material: 0x236666616166660000000000000001, x_y_z: 0x800000008000000080000000 },
+        PackedShapeItem { color_material: 0x236666616166660000000000000001, x_y_z: 0x800000018000000080000000 },
+        PackedShapeItem { color_material: 0x236666616166660000000000000002, x_y_z: 0x800000028000000080000000 },
+    ].span()
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn test_histogram_ok() {
+    histogram_shape_check(shape(), array![FTSpec { token_id: 1, qty: 2 }, FTSpec { token_id: 2, qty: 1 }].span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('bad fts spec',))]
+fn test_histogram_duplicate_fts() {
+    histogram_shape_check(shape(), array![FTSpec { token_id: 1, qty: 2 }, FTSpec { token_id: 1, qty: 2 }].span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('bad fts spec',))]
+fn test_histogram_duplicate_fts_matching_sum() {
+    histogram_shape_check(shape(), array![FTSpec { token_id: 1, qty: 1 }, FTSpec { token_id: 1, qty: 1 }, FTSpec { token_id: 2, qty: 1 }].span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('bad fts spec',))]
+fn test_histogram_unsorted_fts() {
+    histogram_shape_check(shape(), array![FTSpec { token_id: 2, qty: 1 }, FTSpec { token_id: 1, qty: 2 }].span());
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(expected: ('bad fts spec',))]
+fn test_histogram_wrong_qty() {
+    histogram_shape_check(shape(), array![FTSpec { token_id: 1, qty: 1 }, FTSpec { token_id: 2, qty: 1 }].span());
+}
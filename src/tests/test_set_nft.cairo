@@ -100,7 +100,7 @@ use presets::erc721::erc721::interface::IERC721DispatcherTrait;
 use presets::erc1155::erc1155::interface::IERC1155DispatcherTrait;
 
 use briq_protocol::tests::test_utils::{
-    WORLD_ADMIN, DEFAULT_OWNER, DefaultWorld, spawn_briq_test_world, mint_briqs, impersonate
+    WORLD_ADMIN, DEFAULT_OWNER, USER1, DefaultWorld, spawn_briq_test_world, mint_briqs, impersonate
 };
 
 use briq_protocol::erc::erc1155::models::ERC1155Balance;
@@ -112,8 +112,12 @@ use briq_protocol::world_config::get_world_config;
 use briq_protocol::attributes::attribute_group::{IAttributeGroupsDispatcher, IAttributeGroupsDispatcherTrait, AttributeGroupOwner};
 
 use briq_protocol::set_nft::assembly::{ISetNftAssemblyDispatcherTrait, ISetNftAssemblySafeDispatcherTrait};
+use briq_protocol::set_nft::assembly::{
+    ISetNftAssemblyBatchDispatcher, ISetNftAssemblyBatchDispatcherTrait, SetAssembly, SetDisassembly
+};
 use briq_protocol::tokens::set_nft::set_nft::Transfer as SetNftTransfer;
 
+use testing::get_available_gas;
 use debug::PrintTrait;
 
 use convenience_for_testing::{
@@ -277,6 +281,66 @@ fn test_simple_mint_and_burn_2() {
     assert(briq_token.balance_of(DEFAULT_OWNER(), 1) == 100, 'bad briq balance 2');
 }
 
+#[test]
+#[available_gas(3000000000)]
+fn test_assemble_many() {
+    let DefaultWorld{world, briq_token, generic_sets, .. } = spawn_briq_test_world();
+
+    mint_briqs(world, DEFAULT_OWNER(), 1, 100);
+
+    impersonate(DEFAULT_OWNER());
+
+    let batch = ISetNftAssemblyBatchDispatcher { contract_address: generic_sets.contract_address };
+    let token_ids = batch.assemble_many(
+        DEFAULT_OWNER(),
+        array![
+            SetAssembly {
+                token_id_hint: 0xfade,
+                fts: array![FTSpec { token_id: 1, qty: 4 }],
+                shape: valid_shape_1(),
+                attributes: array![],
+            },
+            SetAssembly {
+                token_id_hint: 0xcafe,
+                fts: array![FTSpec { token_id: 1, qty: 3 }],
+                shape: valid_shape_2(),
+                attributes: array![],
+            },
+        ],
+    );
+
+    // Same token id as assembling the first set on its own (see test_simple_mint_and_burn_2).
+    assert(
+        *token_ids[0] == 0x2d4276d22e1b24bb462c255708ae8293302ff6b17691ed07f5057ae00000000,
+        'bad token id'
+    );
+    assert(generic_sets.balance_of(DEFAULT_OWNER()) == 2, 'bad balance');
+    assert(DEFAULT_OWNER() == generic_sets.owner_of((*token_ids[1]).into()), 'bad owner');
+    assert(briq_token.balance_of((*token_ids[0]).try_into().unwrap(), 1) == 4, 'bad token balance 1');
+    assert(briq_token.balance_of((*token_ids[1]).try_into().unwrap(), 1) == 3, 'bad token balance 2');
+    assert(briq_token.balance_of(DEFAULT_OWNER(), 1) == 93, 'bad briq balance 1');
+
+    // One Transfer per set.
+    let tev = starknet::testing::pop_log::<SetNftTransfer>(generic_sets.contract_address).unwrap();
+    assert(tev.token_id == (*token_ids[0]).into(), 'bad token id');
+    let tev = starknet::testing::pop_log::<SetNftTransfer>(generic_sets.contract_address).unwrap();
+    assert(tev.token_id == (*token_ids[1]).into(), 'bad token id');
+
+    batch.disassemble_many(
+        DEFAULT_OWNER(),
+        array![
+            SetDisassembly {
+                token_id: *token_ids[0], fts: array![FTSpec { token_id: 1, qty: 4 }], attributes: array![],
+            },
+            SetDisassembly {
+                token_id: *token_ids[1], fts: array![FTSpec { token_id: 1, qty: 3 }], attributes: array![],
+            },
+        ],
+    );
+    assert(generic_sets.balance_of(DEFAULT_OWNER()) == 0, 'bad balance');
+    assert(briq_token.balance_of(DEFAULT_OWNER(), 1) == 100, 'bad briq balance 2');
+}
+
 #[test]
 #[available_gas(3000000000)]
 #[should_panic(
@@ -625,3 +689,159 @@ fn test_simple_mint_registered_but_unhandled_shape() {
     );
 }
 
+
+// Assemble / disassemble a set with one briq of each of nb_materials materials,
+// then compare moving them with one safe_transfer_from per material and with transfer_briqs.
+fn bench_assembly(nb_materials: u64) {
+    let DefaultWorld{world, briq_token, generic_sets, .. } = spawn_briq_test_world();
+
+    let mut fts = array![];
+    let mut shape = array![];
+    let mut material = 1;
+    loop {
+        if material > nb_materials {
+            break;
+        }
+        mint_briqs(world, DEFAULT_OWNER(), material.into(), 1);
+        fts.append(FTSpec { token_id: material.into(), qty: 1 });
+        shape.append(ShapePacking::pack(ShapeItem { color: '#ffaaff', material, x: 2, y: 4, z: -2 }));
+        material += 1;
+    };
+
+    impersonate(DEFAULT_OWNER());
+    let gas_start = get_available_gas();
+    let token_id = as_set(generic_sets).assemble(
+        DEFAULT_OWNER(), 0xfade, array![0xcafe], array![0xfade], fts.clone(), shape, array![],
+    );
+    as_set(generic_sets).disassemble(DEFAULT_OWNER(), token_id, fts.clone(), array![]);
+    let assembly = gas_start - get_available_gas();
+
+    let gas_start = get_available_gas();
+    let mut ftsp = fts.span();
+    loop {
+        match ftsp.pop_front() {
+            Option::Some(ftspec) => {
+                briq_token.safe_transfer_from(
+                    DEFAULT_OWNER(), USER1(), (*ftspec).token_id.into(), (*ftspec).qty.into(), array![]
+                );
+            },
+            Option::None => { break; },
+        };
+    };
+    let sequential = gas_start - get_available_gas();
+
+    impersonate(USER1());
+    let gas_start = get_available_gas();
+    briq_protocol::set_nft::assembly::transfer_briqs(world, USER1(), DEFAULT_OWNER(), fts.span());
+    let batched = gas_start - get_available_gas();
+
+    'materials'.print();
+    nb_materials.print();
+    'assemble+disassemble gas'.print();
+    assembly.print();
+    'per-material transfers gas'.print();
+    sequential.print();
+    'transfer_briqs gas'.print();
+    batched.print();
+
+    assert(briq_token.balance_of(DEFAULT_OWNER(), nb_materials.into()) == 1, 'bad balance');
+    if nb_materials > 1 {
+        assert(batched < sequential, 'batch not cheaper');
+    }
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn bench_assembly_1_material() {
+    bench_assembly(1);
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn bench_assembly_4_materials() {
+    bench_assembly(4);
+}
+
+#[test]
+#[available_gas(9000000000)]
+fn bench_assembly_16_materials() {
+    bench_assembly(16);
+}
+
+use briq_protocol::booklet::attribute::{
+    IRegisterShapeCommitmentDispatcher, IRegisterShapeCommitmentDispatcherTrait, compute_shape_commitment
+};
+
+// Commitment of valid_shape_1 with 4 briqs of material 1, from briq_protocol.shape_commitment.
+const VALID_SHAPE_1_COMMITMENT: felt252 = 0x7570195dfb6b81f5217f45ce0ce2f8de146847a045806cce7c2597c17ecfed;
+
+#[test]
+#[available_gas(3000000000)]
+fn test_shape_commitment() {
+    assert(
+        compute_shape_commitment(valid_shape_1().span(), array![FTSpec { token_id: 1, qty: 4 }].span()) == VALID_SHAPE_1_COMMITMENT,
+        'bad commitment'
+    );
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn test_simple_mint_attribute_shape_commitment() {
+    let DefaultWorld{world, sets_ducks, booklet_ducks, attribute_groups_addr, register_shape_commitment_addr, .. } = spawn_briq_test_world();
+
+    create_contract_attribute_group(world, attribute_groups_addr, 0x69, booklet_ducks.contract_address, sets_ducks.contract_address);
+    // No verifier class needed.
+    IRegisterShapeCommitmentDispatcher { contract_address: register_shape_commitment_addr }
+        .execute(world, 0x69, 0x1, VALID_SHAPE_1_COMMITMENT);
+    mint_booklet(booklet_ducks.contract_address, DEFAULT_OWNER(), 0x690000000000000001, 1);
+    mint_briqs(world, DEFAULT_OWNER(), 1, 100);
+
+    impersonate(DEFAULT_OWNER());
+
+    let token_id = as_set(sets_ducks).assemble(
+        DEFAULT_OWNER(),
+        0xfade,
+        array![0xcafe],
+        array![0xfade],
+        array![FTSpec { token_id: 1, qty: 4 }],
+        valid_shape_1(),
+        array![AttributeItem { attribute_group_id: 0x69, attribute_id: 0x1 }],
+    );
+    assert(booklet_ducks.balance_of(token_id.try_into().unwrap(), 0x690000000000000001) == 1, 'bad booklet balance');
+}
+
+#[test]
+#[available_gas(3000000000)]
+#[should_panic(
+    expected: (
+        'bad shape',
+        'ENTRYPOINT_FAILED',
+        'ENTRYPOINT_FAILED'
+    )
+)]
+fn test_simple_mint_attribute_shape_commitment_bad_color() {
+    let DefaultWorld{world, sets_ducks, booklet_ducks, attribute_groups_addr, register_shape_commitment_addr, .. } = spawn_briq_test_world();
+
+    create_contract_attribute_group(world, attribute_groups_addr, 0x69, booklet_ducks.contract_address, sets_ducks.contract_address);
+    IRegisterShapeCommitmentDispatcher { contract_address: register_shape_commitment_addr }
+        .execute(world, 0x69, 0x1, VALID_SHAPE_1_COMMITMENT);
+    mint_booklet(booklet_ducks.contract_address, DEFAULT_OWNER(), 0x690000000000000001, 1);
+    mint_briqs(world, DEFAULT_OWNER(), 1, 100);
+
+    impersonate(DEFAULT_OWNER());
+
+    as_set(sets_ducks).assemble(
+        DEFAULT_OWNER(),
+        0xfade,
+        array![0xcafe],
+        array![0xfade],
+        array![FTSpec { token_id: 1, qty: 4 }],
+        array![
+            ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 1, x: 2, y: 4, z: -2 }),
+            ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 1, x: 3, y: 4, z: -2 }),
+            ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 1, x: 4, y: 4, z: -2 }),
+            ShapePacking::pack(ShapeItem { color: '#ffffff', material: 1, x: 5, y: 4, z: -2 }),
+        ],
+        array![AttributeItem { attribute_group_id: 0x69, attribute_id: 0x1 }],
+    );
+}
@@ -17,6 +17,7 @@ use briq_protocol::tests::test_utils::{
     WORLD_ADMIN, DEFAULT_OWNER, ZERO, DefaultWorld, spawn_briq_test_world, mint_briqs, impersonate, deploy
 };
 use briq_protocol::attributes::attribute_group::{IAttributeGroupsDispatcher, IAttributeGroupsDispatcherTrait, AttributeGroupOwner};
+use briq_protocol::attributes::attribute_group::{AttributeGroupTrait, AttributeGroupCacheTrait};
 use briq_protocol::types::{FTSpec, ShapeItem, ShapePacking, PackedShapeItem, AttributeItem};
 use briq_protocol::world_config::get_world_config;
 use briq_protocol::tests::test_set_nft::convenience_for_testing::{
@@ -26,6 +27,7 @@ use briq_protocol::cumulative_balance::{CUM_BALANCE_TOKEN, CB_ATTRIBUTES, CB_BRI
 use briq_protocol::set_nft::assembly::ISetNftAssemblyDispatcherTrait;
 use briq_protocol::tokens::set_nft::set_nft::Transfer as SetNftTransfer;
 
+use testing::get_available_gas;
 use debug::PrintTrait;
 
 #[test]
@@ -144,3 +146,101 @@ fn test_multiple_attributes() {
         'should be 0'
     );
 }
+
+// Assemble / disassemble a 10 briq set with nb_attributes attributes of the same group,
+// and compare reading that group nb_attributes times from the world and through AttributeGroupCache.
+fn bench_attributes(nb_attributes: u64) {
+    let DefaultWorld{world, generic_sets, attribute_groups_addr, .. } = spawn_briq_test_world();
+
+    let briq_counter_addr = deploy(world, briq_protocol::tests::briq_counter::TestBriqCounterAttributeHandler::TEST_CLASS_HASH);
+    create_contract_attribute_group(world, attribute_groups_addr, 0xf00, briq_counter_addr, Zeroable::zero());
+
+    mint_briqs(world, DEFAULT_OWNER(), 1, 10);
+
+    let mut shape = array![];
+    let mut x = 0;
+    loop {
+        if x == 10 {
+            break;
+        }
+        shape.append(ShapePacking::pack(ShapeItem { color: '#ffaaff', material: 1, x, y: 4, z: -2 }));
+        x += 1;
+    };
+    let mut attributes = array![];
+    let mut attribute_id = 1;
+    loop {
+        if attribute_id > nb_attributes {
+            break;
+        }
+        // at least attribute_id briqs
+        attributes.append(AttributeItem { attribute_group_id: 0xf00, attribute_id });
+        attribute_id += 1;
+    };
+
+    impersonate(DEFAULT_OWNER());
+    let gas_start = get_available_gas();
+    let token_id = as_set(generic_sets).assemble(
+        DEFAULT_OWNER(), 0xfade, array![0xcafe], array![0xfade], array![FTSpec { token_id: 1, qty: 10 }], shape, attributes.clone(),
+    );
+    as_set(generic_sets).disassemble(DEFAULT_OWNER(), token_id, array![FTSpec { token_id: 1, qty: 10 }], attributes);
+    let assembly = gas_start - get_available_gas();
+
+    let gas_start = get_available_gas();
+    let mut i = 0;
+    loop {
+        if i == nb_attributes {
+            break;
+        }
+        AttributeGroupTrait::get_attribute_group(world, 0xf00);
+        i += 1;
+    };
+    let uncached = gas_start - get_available_gas();
+
+    let gas_start = get_available_gas();
+    let mut groups = AttributeGroupCacheTrait::new();
+    let mut i = 0;
+    loop {
+        if i == nb_attributes {
+            break;
+        }
+        let attribute_group = groups.get_attribute_group(world, 0xf00);
+        match attribute_group.owner {
+            AttributeGroupOwner::Admin(_) => { assert(false, 'bad cached group'); },
+            AttributeGroupOwner::Contract(contract) => { assert(contract == briq_counter_addr, 'bad cached group'); },
+        };
+        i += 1;
+    };
+    let cached = gas_start - get_available_gas();
+
+    'attributes'.print();
+    nb_attributes.print();
+    'assemble+disassemble gas'.print();
+    assembly.print();
+    'uncached group reads gas'.print();
+    uncached.print();
+    'cached group reads gas'.print();
+    cached.print();
+
+    assert(generic_sets.balance_of(DEFAULT_OWNER()) == 0, 'bad balance');
+    if nb_attributes > 1 {
+        assert(cached < uncached, 'cache not cheaper');
+    }
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn bench_attributes_1() {
+    bench_attributes(1);
+}
+
+#[test]
+#[available_gas(3000000000)]
+fn bench_attributes_3() {
+    bench_attributes(3);
+}
+
+#[test]
+#[available_gas(9000000000)]
+fn bench_attributes_10() {
+    bench_attributes(10);
+}
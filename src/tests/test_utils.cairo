@@ -64,6 +64,7 @@ struct DefaultWorld {
     setup_world: ISetupWorldDispatcher,
     attribute_groups_addr: ContractAddress,
     register_shape_validator_addr: ContractAddress,
+    register_shape_commitment_addr: ContractAddress,
 
     briq_token: IERC1155Dispatcher,
     
@@ -101,6 +102,9 @@ fn spawn_briq_test_world() -> DefaultWorld {
         briq_protocol::attributes::attribute_group::attribute_group::TEST_CLASS_HASH,
 
         briq_protocol::booklet::attribute::shape_validator::TEST_CLASS_HASH,
+        briq_protocol::booklet::attribute::shape_commitment::TEST_CLASS_HASH,
+
+        briq_protocol::allowlist::allowlist_root::TEST_CLASS_HASH,
     ];
     let world = spawn_test_world(components);
     // ERC 20 token for payment
@@ -117,6 +121,7 @@ fn spawn_briq_test_world() -> DefaultWorld {
 
     let attribute_groups_addr = deploy(world, briq_protocol::attributes::attribute_group::attribute_groups::TEST_CLASS_HASH);
     let register_shape_validator_addr = deploy(world, briq_protocol::booklet::attribute::register_shape_validator::TEST_CLASS_HASH);
+    let register_shape_commitment_addr = deploy(world, briq_protocol::booklet::attribute::register_shape_commitment::TEST_CLASS_HASH);
 
     let briq_factory_addr = deploy(world, briq_protocol::briq_factory::briq_factory::TEST_CLASS_HASH);
 
@@ -209,6 +214,7 @@ fn spawn_briq_test_world() -> DefaultWorld {
         setup_world: ISetupWorldDispatcher { contract_address: setup_world_addr },
         attribute_groups_addr,
         register_shape_validator_addr,
+        register_shape_commitment_addr,
         briq_token: IERC1155Dispatcher { contract_address: briq_token_addr },
         generic_sets: IERC721Dispatcher { contract_address: sets_generic_addr },
         sets_ducks: IERC721Dispatcher { contract_address: sets_ducks_addr },
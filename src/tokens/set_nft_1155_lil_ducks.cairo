@@ -129,6 +129,23 @@ mod set_nft_1155_lil_ducks {
         }
     }
 
+    mod tempfix3 {
+        use briq_protocol::set_nft::assembly::SetNftAssemblyBatch1155;
+    }
+    use briq_protocol::set_nft::assembly::{SetAssembly, SetDisassembly};
+    #[external(v0)]
+    impl tempFixBatch of briq_protocol::set_nft::assembly::ISetNftAssemblyBatch<ContractState> {
+        fn assemble_many(
+            ref self: ContractState, owner: ContractAddress, sets: Array<SetAssembly>
+        ) -> Array<felt252> {
+            tempfix3::SetNftAssemblyBatch1155::assemble_many(ref self, owner, sets)
+        }
+
+        fn disassemble_many(ref self: ContractState, owner: ContractAddress, sets: Array<SetDisassembly>) {
+            tempfix3::SetNftAssemblyBatch1155::disassemble_many(ref self, owner, sets)
+        }
+    }
+
     use briq_protocol::uri::get_url;
 
     #[external(v0)]
@@ -131,6 +131,59 @@ mod set_nft_sp {
         }
     }
 
+    mod tempfix3 {
+        use briq_protocol::set_nft::assembly::SetNftAssemblyBatch721;
+    }
+    use briq_protocol::set_nft::assembly::{SetAssembly, SetDisassembly};
+    #[external(v0)]
+    impl tempFixBatch of briq_protocol::set_nft::assembly::ISetNftAssemblyBatch<ContractState> {
+        fn assemble_many(
+            ref self: ContractState, owner: ContractAddress, sets: Array<SetAssembly>
+        ) -> Array<felt252> {
+            let token_ids = tempfix3::SetNftAssemblyBatch721::assemble_many(ref self, owner, sets);
+            // Same events as assemble, one per set.
+            let mut ids = token_ids.span();
+            loop {
+                match ids.pop_front() {
+                    Option::Some(token_id) => {
+                        let token_id: felt252 = *token_id;
+                        self.emit_event(Transfer { from: Zeroable::zero(), to: owner, token_id: token_id.into() });
+                    },
+                    Option::None => {
+                        break;
+                    }
+                };
+            };
+            token_ids
+        }
+
+        fn disassemble_many(ref self: ContractState, owner: ContractAddress, sets: Array<SetDisassembly>) {
+            let mut token_ids = array![];
+            let mut setsp = sets.span();
+            loop {
+                match setsp.pop_front() {
+                    Option::Some(set) => {
+                        token_ids.append(*set.token_id);
+                    },
+                    Option::None => {
+                        break;
+                    }
+                };
+            };
+            tempfix3::SetNftAssemblyBatch721::disassemble_many(ref self, owner, sets);
+            loop {
+                match token_ids.pop_front() {
+                    Option::Some(token_id) => {
+                        self.emit_event(Transfer { from: owner, to: Zeroable::zero(), token_id: token_id.into() });
+                    },
+                    Option::None => {
+                        break;
+                    }
+                };
+            };
+        }
+    }
+
     #[external(v0)]
     impl ERC721MetadataImpl of briq_protocol::erc::erc721::interface::IERC721Metadata<ContractState> {
         fn name(self: @ContractState) -> felt252 {
@@ -0,0 +1,26 @@
+import os
+import random
+import time
+
+from briq_protocol.allowlist import AllowlistFile, verify_proof, write_allowlist
+
+# Rename to *_test.py to run. Builds a 1M addresses allow list and times proof lookups.
+
+
+def test_benchmark_1m(tmp_path):
+    rng = random.Random(0)
+    addresses = [rng.randrange(1, 2**251 - 256) for _ in range(1_000_000)]
+    path = str(tmp_path / 'allowlist.bin')
+
+    start = time.perf_counter()
+    root = write_allowlist(path, addresses, workers=os.cpu_count())
+    build = time.perf_counter() - start
+    print(f"1M addresses: built in {build:.1f}s, {os.path.getsize(path) / 2**20:.0f} MiB on disk")
+
+    with AllowlistFile(path) as allowlist:
+        sample = rng.sample(addresses, 10000)
+        start = time.perf_counter()
+        proofs = allowlist.proofs(sample)
+        lookup = time.perf_counter() - start
+        print(f"{lookup / len(sample) * 1e6:.1f}us per proof, {len(proofs[0][1])} siblings")
+        assert all(verify_proof(root, address, proof) for address, proof in proofs[:100])
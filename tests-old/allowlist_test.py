@@ -0,0 +1,78 @@
+import random
+
+import pytest
+from starkware.cairo.common.poseidon_hash import poseidon_hash, poseidon_hash_single
+
+from briq_protocol.allowlist import (
+    AllowlistFile,
+    build_levels,
+    get_proof,
+    leaf_hash,
+    node_hash,
+    normalize_addresses,
+    verify_proof,
+    write_allowlist,
+)
+
+# Same list and root as src/tests/test_allowlist.cairo
+ADDRESSES = [0xfade, 0x1, 0x2, 0x3, 0xcafe]
+ROOT = 0x1a0968438617eda95bea7930fb9ba5ab7c8a96ef386bfedcda71ad664894d5a
+
+
+def test_hashes():
+    rng = random.Random(0)
+    for _ in range(20):
+        a, b = rng.randrange(2**251), rng.randrange(2**251)
+        assert leaf_hash(a) == poseidon_hash_single(a)
+        assert node_hash(a, b) == node_hash(b, a) == poseidon_hash(min(a, b), max(a, b))
+
+
+def test_normalize_addresses():
+    assert normalize_addresses(['0x2', 1, 2, '0xcafe']) == [1, 2, 0xcafe]
+    with pytest.raises(Exception, match="Invalid address"):
+        normalize_addresses([0])
+    with pytest.raises(Exception, match="Empty allow list"):
+        normalize_addresses([])
+
+
+def test_tree():
+    addresses = normalize_addresses(ADDRESSES)
+    levels = build_levels(addresses, workers=0)
+    assert [len(level) for level in levels] == [5, 3, 2, 1]
+    assert levels[-1] == [ROOT]
+    assert get_proof(levels, addresses.index(0xcafe)) == [
+        0x522ce35ecb769b5017959d77720ea484b8b8929314a678f2b1b363e4a75bbe1,
+        0x57f373f6c2511666754634a010be324dbb793da0152a550a11156dd4d89c8c2,
+        0x1184aff6bb4b88d3362f008a1e55e774ce3b4451395ad75a7fe64dd1fc06f37,
+    ]
+    for index, address in enumerate(addresses):
+        assert verify_proof(ROOT, address, get_proof(levels, index))
+    assert not verify_proof(ROOT, 0xcafd, get_proof(levels, 3))
+    assert build_levels(addresses, workers=2, chunk_size=1) == levels
+    assert build_levels([0xcafe], workers=0) == [[leaf_hash(0xcafe)]]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 1000])
+def test_allowlist_file(tmp_path, size):
+    rng = random.Random(size)
+    addresses = [rng.randrange(1, 2**251 - 256) for _ in range(size)]
+    root = write_allowlist(str(tmp_path / 'allowlist.bin'), [hex(a) for a in addresses], workers=0)
+    with AllowlistFile(str(tmp_path / 'allowlist.bin')) as allowlist:
+        assert len(allowlist) == size
+        assert allowlist.root == root
+        for address in rng.sample(addresses, min(size, 20)):
+            assert verify_proof(root, address, allowlist.proof(address))
+        assert allowlist.index_of(0) is None
+        with pytest.raises(Exception, match="is not in the allow list"):
+            allowlist.proof(2**251)
+
+
+def test_allowlist_file_errors(tmp_path):
+    write_allowlist(str(tmp_path / 'allowlist.bin'), ADDRESSES, workers=0)
+    data = (tmp_path / 'allowlist.bin').read_bytes()
+    (tmp_path / 'truncated.bin').write_bytes(data[:-1])
+    with pytest.raises(Exception, match="truncated"):
+        AllowlistFile(str(tmp_path / 'truncated.bin'))
+    (tmp_path / 'other.bin').write_bytes(b'x' * len(data))
+    with pytest.raises(Exception, match="not an allow list file"):
+        AllowlistFile(str(tmp_path / 'other.bin'))
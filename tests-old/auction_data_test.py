@@ -0,0 +1,118 @@
+import io
+import json
+import os
+
+import pytest
+
+from briq_protocol.auction_data import (
+    AUCTION,
+    FIELDS,
+    ONCHAIN,
+    data_hash,
+    parse_csv,
+    parse_json,
+    validate_lots,
+    write_auction_file,
+    write_onchain_data,
+)
+from briq_protocol.generate_auction import generate_auction
+
+CONTRACT_SRC = os.path.join(os.path.dirname(__file__), "..", "contracts")
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+MAINNET_DATA = os.path.join(CONTRACT_SRC, "auction_onchain", "data_mainnet.cairo")
+
+
+def read_onchain_table(path):
+    text = open(path).read()
+    table = text[text.index('auction_data_start:\n') + len('auction_data_start:\n'):text.index('auction_data_end:')]
+    rows = []
+    for block in table.strip().split('\n\n'):
+        lines = block.split('\n')
+        name = lines[0][3:] if lines[0].startswith('// ') else None
+        values = [line[3:line.index(';')] for line in lines if line.startswith('dw ')]
+        rows.append({'name': name, **dict(zip(FIELDS[ONCHAIN], values))})
+    return text, rows
+
+
+def test_onchain_roundtrip():
+    text, rows = read_onchain_table(MAINNET_DATA)
+    lots = validate_lots(parse_json(json.dumps(rows), ONCHAIN), ONCHAIN)
+    out = io.StringIO()
+    write_onchain_data(out, lots)
+    assert out.getvalue() == text
+
+
+def test_csv_and_json():
+    csv = "auction_id,box_token_id,quantity,auction_start,auction_duration,initial_price\n" \
+        "2,0xfade,20,198,86400,2\n" \
+        "1,0xcafe,10,198,86400,2\n"
+    schedule = {"auction_start": 198, "auction_duration": 86400, "initial_price": 2}
+    by_json = parse_json(json.dumps({
+        1: {"box_token_id": 0xcafe, "quantity": 10, **schedule},
+        2: {"box_token_id": "0xfade", "quantity": 20, **schedule},
+    }), AUCTION)
+    by_csv = validate_lots(parse_csv(csv, AUCTION), AUCTION)
+    by_json = validate_lots(by_json, AUCTION)
+    for field in FIELDS[AUCTION]:
+        assert list(by_csv.columns[field]) == list(by_json.columns[field])
+    assert list(by_csv.columns['box_token_id']) == [0xcafe, 0xfade]
+
+
+def test_generate_auction_unchanged():
+    assert generate_auction() == """%lang starknet
+const box_address = 51966;
+const erc20_address = 51966;
+auction_data_start:
+dw 51966;
+dw 10;
+dw 198;
+dw 86400;
+dw 2;
+dw 64222;
+dw 20;
+dw 198;
+dw 86400;
+dw 2;
+auction_data_end:
+"""
+
+
+def test_validation_lists_every_problem():
+    lot = {"box_token_id": 1, "quantity": 1, "auction_start": 0, "auction_duration": 10, "initial_price": 0}
+    with pytest.raises(Exception, match=r"auction_id not in \[1, 2\] \(1 lots\): #2"):
+        generate_auction(auction_data={1: lot, 3: lot})
+    with pytest.raises(Exception) as e:
+        validate_lots(parse_json(json.dumps([{"auction_id": i, **lot} for i in [1, 1, 3]]), AUCTION), AUCTION)
+    assert "duplicate auction ids (1): 1" in str(e.value)
+    assert "missing auction ids, they must be contiguous from 1 (1): 2" in str(e.value)
+
+    rows = [{"auction_id": i + 1, **lot} for i in range(30)]
+    rows[3]["auction_duration"] = 0
+    rows[4]["quantity"] = 2**64
+    rows[5]["initial_price"] = -1
+    rows[6]["auction_start"] = 2**64 - 5
+    for row in rows[10:]:
+        row["box_token_id"] = 0
+    with pytest.raises(Exception) as e:
+        validate_lots(parse_json(json.dumps(rows), AUCTION), AUCTION)
+    message = str(e.value)
+    assert "Invalid auction data (5 errors)" in message
+    assert "auction_duration not in [1, 2^64) (1 lots): auction 4" in message
+    assert "quantity not in [1, 2^64) (1 lots): auction 5" in message
+    assert "initial_price not in [0, 2^128) (1 lots): auction 6" in message
+    assert "auction ends after 2^64 (1 lots): auction 7" in message
+    assert "box_token_id not in [1, P) (20 lots): auction 11, " in message
+    assert "and 10 more" in message
+
+    with pytest.raises(Exception, match="lot 2: quantity 'ten' is not an integer"):
+        parse_json(json.dumps([lot, {**lot, "quantity": "ten"}]), AUCTION)
+
+
+def test_data_hash(tmp_path):
+    _, rows = read_onchain_table(MAINNET_DATA)
+    source = tmp_path / "lots.json"
+    source.write_text(json.dumps(rows))
+    target = tmp_path / "data.cairo"
+    cairo_path = [ROOT, os.path.join(CONTRACT_SRC, "vendor")]
+    value = write_auction_file(str(source), str(target), ONCHAIN, cairo_path=cairo_path)
+    assert value == data_hash(MAINNET_DATA, cairo_path)
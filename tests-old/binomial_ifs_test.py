@@ -0,0 +1,65 @@
+import io
+import random
+import sys
+
+import pytest
+
+from briq_protocol.binomial_ifs import (
+    AUTO,
+    BINARY,
+    JUMP_TABLE,
+    SPARSE,
+    choose_strategy,
+    depth_report,
+    generate_binary_search_function,
+    write_verify_shape_function,
+)
+
+
+def check(id):
+    return f"check_{id}();"
+
+
+@pytest.mark.parametrize("strategy", [BINARY, JUMP_TABLE, SPARSE, AUTO])
+def test_every_id_is_dispatched(strategy):
+    ids = sorted(random.Random(0).sample(range(1, 5000), 300))
+    out = io.StringIO()
+    depths = write_verify_shape_function(out, ids, check, strategy)
+    code = out.getvalue()
+    assert sorted(depths) == ids
+    for id in ids:
+        assert code.count(f"check_{id}();") == 1
+    assert code.count('{') == code.count('}')
+    assert code.rstrip().endswith("assert(false, 'bad attribute ID');\n    }")
+
+
+def test_no_recursion_limit():
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100)
+    try:
+        ids = list(range(0, 100000, 2))
+        for strategy in [BINARY, SPARSE]:
+            write_verify_shape_function(io.StringIO(), ids, check, strategy)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def test_depths():
+    ids = sorted(random.Random(1).sample(range(10**6), 20000))
+    binary = depth_report(write_verify_shape_function(io.StringIO(), ids, check, BINARY))
+    sparse = depth_report(write_verify_shape_function(io.StringIO(), ids, check, SPARSE))
+    assert binary[0] <= 2 * 15
+    assert sparse[0] < binary[0]
+    assert depth_report(write_verify_shape_function(io.StringIO(), list(range(5, 500)), check, JUMP_TABLE)) == (3, 3)
+
+
+def test_choose_strategy():
+    assert choose_strategy(list(range(10, 100))) == JUMP_TABLE
+    assert choose_strategy([1, 2, 3, 10, 200]) == BINARY
+    assert choose_strategy(list(range(0, 10000, 100))) == SPARSE
+
+
+def test_binary_search_function():
+    code = generate_binary_search_function([1, 2, 3, 10, 200], check)
+    assert "if attribute_id == 3 {" in code
+    assert "else if attribute_id < 3 {" in code
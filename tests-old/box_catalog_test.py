@@ -0,0 +1,72 @@
+import pytest
+
+from briq_protocol.binomial_ifs import BINARY, JUMP_TABLE
+from briq_protocol.box_catalog import (
+    DEFAULT_SOURCE,
+    DEFAULT_TARGET,
+    BoxEntry,
+    choose_strategy,
+    generate_catalog,
+    load_catalog,
+    parse_csv,
+    validate_catalog,
+)
+
+
+def test_checked_in_catalog_is_up_to_date():
+    with open(DEFAULT_TARGET) as f:
+        assert f.read() == generate_catalog(load_catalog(DEFAULT_SOURCE))
+
+
+def test_parse_csv():
+    entries = parse_csv("box_id,attribute_group_id,attribute_id,briq_0x1,briq_0x3\n1,1,1,434,\n2,0x2,1,60,10\n")
+    assert entries == [
+        BoxEntry(1, 1, 1, {1: 434}),
+        BoxEntry(2, 2, 1, {1: 60, 3: 10}),
+    ]
+    code = generate_catalog(entries)
+    assert "FTSpec { token_id: 0x1, qty: 60 }, FTSpec { token_id: 0x3, qty: 10 }" in code
+
+
+def test_load_catalog(tmp_path):
+    (tmp_path / 'boxes.json').write_text(
+        '[{"box_id": 1, "attribute_group_id": 1, "attribute_id": 2, "briqs": {"0x1": "0x10"}}]'
+    )
+    assert load_catalog(str(tmp_path / 'boxes.json')) == [BoxEntry(1, 1, 2, {1: 16})]
+    (tmp_path / 'bad.json').write_text('[{"box_id": 1}]')
+    with pytest.raises(Exception, match="Malformed box catalog"):
+        load_catalog(str(tmp_path / 'bad.json'))
+
+
+def test_validate_catalog():
+    with pytest.raises(Exception) as e:
+        validate_catalog([
+            BoxEntry(1, 1, 1, {1: 10}),
+            BoxEntry(1, 1, 2, {1: 10}),
+            BoxEntry(2, 1, 1, {1: 10}),
+            BoxEntry(3, 0, 3, {1: 10}),
+            BoxEntry(4, 1, 4, {1: 0}),
+            BoxEntry(5, 1, 5, {0: 10, 1: 2**128}),
+        ])
+    message = str(e.value)
+    assert "(6 errors)" in message
+    for error in [
+        "box 1: duplicate box_id",
+        "box 2: same booklet as box 1",
+        "box 3: attribute_group_id must be in [1, 2^64)",
+        "box 4: no briqs",
+        "box 5: bad material 0x0",
+        f"box 5: bad quantity {2**128} of material 0x1",
+    ]:
+        assert error in message
+
+
+def test_dispatch():
+    assert choose_strategy(list(range(1, 501))) == JUMP_TABLE
+    assert choose_strategy([1, 10, 1000]) == BINARY
+    entries = [BoxEntry(box_id, 1, box_id, {1: box_id}) for box_id in [1, 10, 1000, 5000, 2**40]]
+    code = generate_catalog(entries)
+    assert "if box_id == 1000 {" in code
+    assert code.count("return BoxInfo") == 5
+    with pytest.raises(Exception, match="Unknown dispatch strategy"):
+        generate_catalog(entries, strategy='linear')
@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from briq_protocol.briq_factory import (
+    P,
+    BriqFactoryParams,
+    get_lin_integral,
+    get_lin_integral_negative_floor,
+    get_max_amount,
+    get_price,
+    integrate,
+)
+
+D = 10**18
+IP = 400000 * D
+MS = 250000 * D
+
+
+# Same vectors as src/tests/test_briq_factory.cairo
+@pytest.mark.parametrize("t, surge_t, amount, expected", [
+    (0, 0, 1, 10000025000000),
+    (0, 0, 1000, 10025000000000000),
+    (IP, 0, 1000, 3005 * 10000000000000),
+    (0, 250000 * D, 1, 10000075000000),
+    (0, 0, 250000, 4062500000000000000),
+    (0, 0, 250001, 4062522500075000000),
+    (0, 200000 * D, 100000, 1375000000000000000),
+    (IP - 100000 * D, 0, 100000, (10**13 + 5 * 10**7 * (400000 - 50000)) * 100000),
+    (IP, 0, 10**10 - 1, 0x204fd8f4cf25bc04864d1100),
+])
+def test_contract_vectors(t, surge_t, amount, expected):
+    assert get_price(t, surge_t, amount) == expected
+
+
+def test_felt_semantics():
+    # The negative floor is a felt: -10**13 == P - 10**13.
+    negative = get_lin_integral_negative_floor(10**8, -10**13, IP, IP + D)
+    assert negative == get_lin_integral_negative_floor(10**8, P - 10**13, IP, IP + D)
+    with pytest.raises(Exception, match="t1 >= t2"):
+        get_lin_integral(1, 1, 5, 5)
+    with pytest.raises(Exception, match="t2 >= 10\\*\\*12"):
+        get_lin_integral(1, 1, 10**12 * D, 10**12 * D + 1)
+    with pytest.raises(Exception, match="t1-t2 >= 10\\*\\*10"):
+        get_lin_integral(1, 1, 0, 10**10 * D)
+
+
+def test_vectorized_matches_scalar():
+    rng = np.random.default_rng(0)
+    t = np.array(
+        [int(v) * D + int(w) for v, w in zip(rng.integers(0, 800000, 2000), rng.integers(0, D, 2000))], dtype=object
+    )
+    surge_t = np.array([int(v) * D for v in rng.integers(0, 400000, 2000)], dtype=object)
+    amount = rng.integers(9, 100000, 2000)
+    prices = get_price(t, surge_t, amount)
+    assert list(prices) == [get_price(int(a), int(b), int(c)) for a, b, c in zip(t, surge_t, amount)]
+    # Broadcasting a scalar t over many amounts.
+    assert list(get_price(0, 0, np.array([1, 1000]))) == [10000025000000, 10025000000000000]
+    # One bad row fails the batch, like the contract would.
+    with pytest.raises(Exception, match="t2 >= 10\\*\\*12"):
+        integrate(np.array([0, 10**13 * D], dtype=object), D)
+
+
+def test_params():
+    params = BriqFactoryParams(lower_floor=2 * 10**13)
+    assert get_price(0, 0, 1, params) == 20000025000000
+
+
+def test_max_amount_edges():
+    assert get_max_amount(0, 0, 0) == 0
+    assert get_max_amount(0, 0, 10000025000000 - 1) == 0
+    assert get_max_amount(0, 0, 10000025000000) == 1
+    assert get_max_amount(0, 0, 10025000000000000) == 1000
+    assert get_max_amount(0, 0, 10**40) == 2**32 - 1
+    assert get_max_amount(0, 0, 2**250) == 2**32 - 1
+    price = get_price(IP, MS, 2**32 - 1)
+    assert get_max_amount(IP, MS, price) == 2**32 - 1
+    assert get_max_amount(IP, MS, price - 1) == 2**32 - 2
+
+
+def test_max_amount_sweep():
+    rng = random.Random(0)
+    for _ in range(500):
+        # Starts on, around and far from both breakpoints, budgets from below one briq to above the cap.
+        t = rng.choice([0, IP, IP - rng.randrange(400000) * D, rng.randrange(10**6) * D + rng.randrange(D)])
+        surge_t = rng.choice([0, MS, MS - rng.randrange(250000) * D, rng.randrange(10**6) * D])
+        budget = rng.randrange(10 ** rng.choice([13, 18, 20, 24, 28, 32]))
+        amount = get_max_amount(t, surge_t, budget)
+        if amount > 0:
+            assert get_price(t, surge_t, amount) <= budget
+        if amount < 2**32 - 1:
+            assert get_price(t, surge_t, amount + 1) > budget
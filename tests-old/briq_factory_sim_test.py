@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from briq_protocol.briq_factory import BriqFactoryParams, get_price
+from briq_protocol.briq_factory_sim import (
+    FactoryState,
+    Purchases,
+    get_current_t,
+    get_surge_t,
+    load_purchases,
+    poisson_purchases,
+    save_results,
+    simulate,
+    simulate_many,
+    summarize,
+)
+
+D = 10**18
+IP = 400000 * D
+MS = 250000 * D
+
+
+# Same vectors as the (currently disabled) decay checks in src/tests/test_briq_factory.cairo
+def test_decay():
+    state = FactoryState(last_stored_t=IP, surge_t=MS, last_purchase_time=1000)
+    assert get_current_t(state, 1000 + 10000) == IP - 6337791082068820 * 10000
+    assert get_surge_t(state, 1000 + 3600 * 24 * 3) == MS - 4134 * 10**14 * 3600 * 24 * 3
+    assert get_current_t(state, 1000 + 3600 * 24 * 365 * 5) == 0
+    assert get_surge_t(state, 1000 + 3600 * 24 * 15) == 0
+    with pytest.raises(Exception, match="u64_sub Overflow"):
+        get_current_t(state, 999)
+
+
+def test_simulate():
+    purchases = Purchases(np.array([10, 20, 20, 100]), np.array([1000, 5, 2000, 300]))
+    columns = simulate(purchases, initial=FactoryState(last_purchase_time=10), decay=False)
+    assert list(columns['reverted']) == [False, True, False, False]
+    assert list(columns['t']) == [0, 0, 1000, 3000]
+    assert columns['price'][0] == get_price(0, 0, 1000)
+    assert summarize(columns)['revenue'] == (
+        get_price(0, 0, 1000) + get_price(1000 * D, 1000 * D, 2000) + get_price(3000 * D, 3000 * D, 300)
+    )
+    assert summarize(columns)['briqs'] == 3300
+
+    # With decay, t drops between purchases and so does the revenue.
+    decayed = simulate(purchases, initial=FactoryState(last_purchase_time=10))
+    assert decayed['t'][3] == (3000 * D - (10 + 80) * 6337791082068820) / D
+    assert summarize(decayed)['revenue'] < summarize(columns)['revenue']
+
+
+def test_surge_activity():
+    purchases = Purchases(np.array([0, 1]), np.array([200000, 100000]))
+    summary = summarize(simulate(purchases, decay=False))
+    assert summary['surging_purchases'] == 1
+    # Surge on the 50000 briqs past MINIMAL_SURGE.
+    assert summary['surge_revenue'] == 10**8 * 50000 * 50000 // 2
+
+
+def test_simulate_many(tmp_path):
+    purchases = poisson_purchases(rate_per_day=500, days=3, mean_amount=200, seed=0)
+    param_sets = [BriqFactoryParams(decay_per_second=d) for d in [0, 6337791082068820, 10**17]]
+    results = simulate_many(purchases, param_sets, workers=2)
+    assert [summarize(r) for r in results] == [summarize(simulate(purchases, p)) for p in param_sets]
+    revenues = [summarize(r)['revenue'] for r in results]
+    assert revenues == sorted(revenues, reverse=True)
+
+    save_results(tmp_path / 'sweep.npz', param_sets, results)
+    saved = np.load(tmp_path / 'sweep.npz')
+    assert saved['price'].shape == (3, len(purchases))
+    assert list(saved['param_decay_per_second']) == ['0', '6337791082068820', str(10**17)]
+
+
+def test_load_purchases(tmp_path):
+    (tmp_path / 'events.jsonl').write_text(
+        '{"block_timestamp": 20, "amount": "0x10", "buyer": "0x1"}\n{"block_timestamp": 10, "amount": 9}\n'
+    )
+    (tmp_path / 'events.csv').write_text('timestamp,amount,price\n10,9,1\n20,16,2\n')
+    for name in ['events.jsonl', 'events.csv']:
+        purchases = load_purchases(str(tmp_path / name))
+        assert list(purchases.timestamp) == [10, 20]
+        assert list(purchases.amount) == [9, 16]
+    (tmp_path / 'bad.json').write_text('[{"amount": 9}]')
+    with pytest.raises(Exception, match="Missing field"):
+        load_purchases(str(tmp_path / 'bad.json'))
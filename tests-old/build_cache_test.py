@@ -0,0 +1,97 @@
+import inspect
+import io
+
+import briq_protocol.generate_auction as generate_auction_module
+from briq_protocol import gen_shape_check
+from briq_protocol.binomial_ifs import HEADER, write_verify_shape_function
+from briq_protocol.build_cache import (
+    VERIFIER_MODULES,
+    BuildCache,
+    _source_hash,
+    build_data,
+    build_verifier,
+    content_hash,
+    generator_modules,
+)
+from briq_protocol.gen_shape_check import ShapeItem, generate_optimized_shape_check
+from briq_protocol.generate_auction import generate_auction
+from briq_protocol.generate_box import generate_box
+
+
+def shapes(n, changed=None):
+    return {
+        id: [ShapeItem(id, i, 0 if id != changed else 1, '#ffaaff', i % 2) for i in range(5)]
+        for id in range(1, n + 1)
+    }
+
+
+def uncached(shapes):
+    out = io.StringIO()
+    out.write(HEADER)
+    write_verify_shape_function(out, sorted(shapes), lambda id: generate_optimized_shape_check(shapes[id], report=None))
+    out.write("}\n")
+    return out.getvalue()
+
+
+def test_verifier_cache(tmp_path):
+    path = str(tmp_path / 'verifier.cairo')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert build_verifier(cache, path, shapes(50), report=None)
+    assert cache.stats['generated'] == 50
+    assert open(path).read() == uncached(shapes(50))
+
+    # Nothing changed: no work at all, even from a fresh process.
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert not build_verifier(cache, path, shapes(50), report=None)
+    assert cache.work_done == 0
+    assert cache.summary() == "Nothing to do, all outputs up to date."
+
+    # One shape changed: only that one is regenerated.
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert build_verifier(cache, path, shapes(50, changed=7), report=None)
+    assert cache.stats['generated'] == 1
+    assert cache.stats['reused'] == 49
+    assert open(path).read() == uncached(shapes(50, changed=7))
+
+    # The output was edited by hand: rewritten from cached fragments.
+    open(path, 'w').write('oops')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert build_verifier(cache, path, shapes(50, changed=7), report=None)
+    assert cache.stats['generated'] == 0 and cache.stats['written'] == 1
+
+
+def test_data_cache(tmp_path):
+    box = str(tmp_path / 'box.cairo')
+    auction = str(tmp_path / 'auction.cairo')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert build_data(cache, box, generate_box)
+    assert build_data(cache, auction, generate_auction)
+    assert open(box).read() == generate_box()
+
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert not build_data(cache, box, generate_box)
+    assert not build_data(cache, auction, generate_auction)
+    assert cache.work_done == 0
+
+    assert build_data(cache, box, generate_box, shape_data={0x1: "0x1234", 0x2: "0x5678"})
+    assert "dw 0x1234;" in open(box).read()
+
+
+def test_generator_source_is_in_the_key(tmp_path, monkeypatch):
+    assert generator_modules(*VERIFIER_MODULES) == [
+        'briq_protocol.binomial_ifs', 'briq_protocol.build_cache', 'briq_protocol.gen_shape_check'
+    ]
+    # generate_auction writes through auction_data.
+    assert 'briq_protocol.auction_data' in generator_modules(generate_auction_module)
+
+    key = content_hash('shape_check', 1)
+    # Any edit to a generator, say a cost constant, changes every key without a manual version bump.
+    getsource = inspect.getsource
+    monkeypatch.setattr(
+        inspect, 'getsource', lambda module: getsource(module) + ("\n# edited" if module is gen_shape_check else "")
+    )
+    _source_hash.cache_clear()
+    try:
+        assert content_hash('shape_check', 1) != key
+    finally:
+        _source_hash.cache_clear()
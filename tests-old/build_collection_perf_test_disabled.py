@@ -0,0 +1,23 @@
+import os
+import time
+
+from briq_protocol.build_collection import generate_shape_code_parallel
+from briq_protocol.generate_shape import generate_shape_code
+
+from .build_collection_test import synthetic_collection
+
+# Rename to *_test.py to run. Compares the serial and parallel paths on a synthetic 50k shapes collection.
+
+
+def test_benchmark_50k():
+    collection = synthetic_collection(50000)
+
+    start = time.perf_counter()
+    expected = generate_shape_code(collection, 1)
+    serial = time.perf_counter() - start
+
+    for workers in sorted({2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        assert generate_shape_code_parallel(collection, 1, workers=workers) == expected
+        parallel = time.perf_counter() - start
+        print(f"50k shapes: serial {serial:.2f}s, {workers} workers {parallel:.2f}s, speedup {serial / parallel:.2f}x")
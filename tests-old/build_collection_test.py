@@ -0,0 +1,49 @@
+import io
+import random
+
+from briq_protocol.binomial_ifs import HEADER, write_verify_shape_function
+from briq_protocol.build_collection import generate_shape_code_parallel, generate_verifier_parallel
+from briq_protocol.gen_shape_check import ShapeItem, generate_optimized_shape_check
+from briq_protocol.generate_shape import generate_shape_code
+
+
+def synthetic_collection(nb_shapes, seed=0):
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(nb_shapes):
+        items = [('#ffaaff', rng.choice([1, 2]), *(rng.randrange(-50, 50) for _ in range(3)), False)
+                 for _ in range(rng.randrange(0, 8))]
+        nfts = [rng.randrange(2**250)] if rng.random() < 0.1 else []
+        items += [('#001122', 3, 0, 0, 0, True) for _ in nfts]
+        shapes.append((items, nfts))
+    return shapes
+
+
+def to_verifier_shapes(collection):
+    return {
+        id + 1: [ShapeItem(x, y, z, color, material if id % 3 else 0) for color, material, x, y, z, _ in items]
+        for id, (items, _) in enumerate(collection)
+    }
+
+
+def test_shape_code_is_identical():
+    collection = synthetic_collection(300)
+    expected = generate_shape_code(collection, 1)
+    assert generate_shape_code_parallel(collection, 1, workers=2, chunk_size=7) == expected
+    assert generate_shape_code_parallel(collection, 1, workers=0) == expected
+    assert generate_shape_code_parallel([], 3, workers=2) == generate_shape_code([], 3)
+
+
+def test_verifier_is_identical():
+    shapes = to_verifier_shapes(synthetic_collection(100))
+    expected_report = []
+    buffer = io.StringIO()
+    write_verify_shape_function(
+        buffer, sorted(shapes),
+        lambda id: generate_optimized_shape_check(shapes[id], name=hex(id), report=expected_report.append)
+    )
+    expected = HEADER + buffer.getvalue() + "}\n"
+
+    report = []
+    assert generate_verifier_parallel(shapes, workers=2, chunk_size=9, report=report.append) == expected
+    assert report == expected_report
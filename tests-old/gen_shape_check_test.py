@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from starkware.cairo.common.poseidon_hash import poseidon_hash_many
+
+from briq_protocol.gen_shape_check import (
+    DIGEST,
+    HISTOGRAM,
+    ITEMS,
+    RUNS,
+    ShapeItem,
+    choose_shape_check,
+    generate_optimized_shape_check,
+    generate_shape_check,
+    run_length_encode,
+    shape_digest,
+)
+
+
+def column(n, material=1, color='#ffaaff'):
+    return [ShapeItem(0, 0, z, color, material) for z in range(n)]
+
+
+def scattered(n, seed=0):
+    rng = random.Random(seed)
+    return [ShapeItem(*(rng.randrange(-100, 100) for _ in range(3)), '#ffaaff', rng.choice([1, 2]))
+            for _ in range(n)]
+
+
+def test_run_length_encode():
+    shape = column(5) + [ShapeItem(0, 0, 5, '#001122', 1)] + column(2, material=0)
+    runs = run_length_encode(shape)
+    assert [length for _, length in runs] == [5, 1, 2]
+    assert runs[1][0].x_y_z == shape[5].x_y_z
+    # Contiguous in x_y_z, but a z lane overflow is still a + 1 on the felt.
+    wrapping = [ShapeItem(0, 0, 2**31 - 1, '#ffaaff', 1), ShapeItem(0, 1, -2**31, '#ffaaff', 1)]
+    assert len(run_length_encode(wrapping)) == 1
+
+
+def test_choice():
+    assert choose_shape_check(column(1))[0] == ITEMS
+    assert choose_shape_check(column(2000))[0] == RUNS
+    assert choose_shape_check(scattered(2000))[0] == DIGEST
+    # The histogram also checks the materials of any items against the fts, which costs more than positions alone.
+    assert HISTOGRAM in choose_shape_check([ShapeItem(i % 7, i // 7, 0, '#ffaaff', 0) for i in range(500)])[1]
+    # Mixed any and regular items can't use a digest.
+    assert set(choose_shape_check(column(3) + column(3, material=0))[1]) == {ITEMS, RUNS}
+
+
+def test_items_is_unchanged():
+    shape = scattered(10)
+    code = generate_optimized_shape_check(shape, strategy=ITEMS, report=None)
+    assert code.endswith(generate_shape_check(shape))
+
+
+def test_runs_code():
+    shape = column(10) + [ShapeItem(5, 5, 5, '#ffaaff', 1)]
+    code = generate_optimized_shape_check(shape, strategy=RUNS, report=None)
+    assert f"let mut x_y_z = {shape[0].x_y_z};" in code
+    assert f"if x_y_z == {shape[0].x_y_z + 10} {{" in code
+    assert f"assert(shapeItem.x_y_z == @{shape[-1].x_y_z}, 'bad shape item');" in code
+
+
+def test_digest():
+    shape = scattered(20)
+    expected = poseidon_hash_many([v for item in shape for v in (item.color_material, item.x_y_z)])
+    assert shape_digest(shape) == expected
+    assert hex(expected) in generate_optimized_shape_check(shape, strategy=DIGEST, report=None)
+
+
+def test_histogram_code():
+    shape = [ShapeItem(i, 0, 0, '#ffaaff', 0) for i in range(5)]
+    code = generate_optimized_shape_check(shape, strategy=HISTOGRAM, report=None)
+    assert hex(shape_digest(shape, positions_only=True)) in code
+    assert "assert(fts.len() == nb_materials, 'bad fts spec');" in code
+    # Duplicate or unsorted token ids are rejected, see src/tests/test_histogram_shape_check.cairo.
+    assert "assert(first || token_id > previous_token_id, 'bad fts spec');" in code
+    assert "assert(ftsum == 5, 'bad fts spec');" in code
+
+
+def test_checked_in_histogram_check_is_up_to_date():
+    # The Cairo tests run a copy of the generated code, it must be the current output.
+    with open('src/tests/test_histogram_shape_check.cairo') as f:
+        src = f.read()
+    start = src.index('{\n', src.index('fn histogram_shape_check(')) + 2
+    body = src[start:src.index('\n}\n', start)]
+    shape = [ShapeItem(x, 0, 0, '#ffaaff', 0) for x in range(3)]
+    assert body == generate_optimized_shape_check(shape, strategy=HISTOGRAM, report=None).lstrip('\n')
+
+
+def test_report():
+    lines = []
+    generate_optimized_shape_check(column(100), name='0x1', report=lines.append)
+    assert lines[0].startswith('shape 0x1 (100 items) -> runs (items: ')
+    with pytest.raises(Exception, match="cannot verify this shape"):
+        generate_optimized_shape_check(column(3, material=0), strategy=DIGEST, report=None)
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from briq_protocol.gen_shape_check import ShapeItem
+from briq_protocol.gen_shape_verifiers import (
+    estimate_verifier_bytecode,
+    generate_sharded_verifiers,
+    partition_attribute_ids,
+)
+
+
+# Mixing in any-material items rules out the digest, so the verifier size grows with the shape.
+def shape(seed, n=20):
+    return [ShapeItem(seed % 13, i * 3, seed % 5, '#ffaaff', (1 + seed % 2) * (i % 2)) for i in range(n)]
+
+
+def test_partition_under_budget():
+    shapes = {id: shape(id) for id in range(1, 200)}
+    budget = 10000
+    shards = partition_attribute_ids(shapes, budget)
+    assert len(shards) > 1
+    assert [id for shard in shards for id in shard] == sorted(shapes)
+    for shard in shards:
+        assert sum(estimate_verifier_bytecode(shapes[id]) for id in shard) < budget
+    with pytest.raises(Exception, match="over the bytecode budget"):
+        partition_attribute_ids({1: shape(1, n=500)}, budget)
+
+
+def test_generate(tmp_path):
+    shapes = {id: shape(id) for id in [1, 2, 3, 10, 200, 201]}
+    manifest = generate_sharded_verifiers(0x4, shapes, str(tmp_path), budget=5000, report=None)
+    assert len(manifest['shards']) > 1
+    assert json.load(open(tmp_path / 'shapes_verifier_manifest.json')) == manifest
+    assert sorted(v['attribute_id'] for v in manifest['validators']) == sorted(shapes)
+
+    for index, shard in enumerate(manifest['shards']):
+        code = open(tmp_path / shard['file']).read()
+        assert f"mod shapes_verifier_{index} {{" in code
+        assert code.count('{') == code.count('}')
+
+    script = open(tmp_path / 'shapes_verifier_register.sh').read().splitlines()
+    assert "starkli invoke $REGISTER_SHAPE_ADDR execute $WORLD_ADDRESS 0x4 0xc8 $SHAPES_VERIFIER_" in script[-2]
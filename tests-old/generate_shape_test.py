@@ -0,0 +1,160 @@
+import io
+import random
+import tracemalloc
+
+import pytest
+
+from briq_protocol.generate_shape import ft_counts, generate_shape_code, nft_positions, write_shape_code
+from briq_protocol.shape_utils import compress_shape_item, to_shape_data
+
+
+# The original, whole-string implementation.
+def reference_shape_code(shapes, index_start=1):
+    newline = '\n'
+    shape_offsets = ["dw 0;"]
+    nft_offsets = ["dw 0;"]
+    data_shapes = []
+    data_nfts = []
+    data_positions = []
+    ft_offsets = ["dw 0;"]
+    data_fts = []
+    cum_shape = 0
+    cum_nft = 0
+    cum_ft = 0
+    for shape in shapes:
+        cum_shape += len(shape[0])
+        cum_nft += len(shape[1])
+        shape_offsets.append(f"dw {cum_shape};")
+        nft_offsets.append(f"dw {cum_nft};")
+        for shape_data in shape[0]:
+            data_shapes.append(to_shape_data(*shape_data))
+        for nft_data in shape[1]:
+            data_nfts.append(f"dw {hex(nft_data)};")
+        positions = [compress_shape_item(*item)[1] for item in shape[0] if len(item) > 5 and item[5]]
+        for i in range(len(shape[1])):
+            data_positions.append(f"dw {hex(positions[i] if i < len(positions) else 0)};")
+        counts = ft_counts(shape)
+        cum_ft += len(counts)
+        ft_offsets.append(f"dw {cum_ft};")
+        for material, qty in counts:
+            data_fts.append(f"dw {hex(material)};\ndw {qty};")
+
+    return f"""
+%lang starknet
+
+const INDEX_START = {index_start};
+
+shape_offset_cumulative:
+{newline.join(shape_offsets)}
+shape_offset_cumulative_end:
+
+shape_data:
+{newline.join(data_shapes)}
+shape_data_end:
+
+nft_offset_cumulative:
+{newline.join(nft_offsets)}
+nft_offset_cumulative_end:
+
+nft_data:
+{newline.join(data_nfts)}
+nft_data_end:
+
+nft_position_data:
+{newline.join(data_positions)}
+nft_position_data_end:
+
+ft_offset_cumulative:
+{newline.join(ft_offsets)}
+ft_offset_cumulative_end:
+
+ft_data:
+{newline.join(data_fts)}
+ft_data_end:
+"""
+
+
+def random_shape(rng, with_nfts=True):
+    items = [('#ffaaff', rng.choice([1, 2]), *(rng.randrange(-10, 10) for _ in range(3)), False)
+             for _ in range(rng.randrange(0, 6))]
+    nfts = []
+    if with_nfts and rng.random() < 0.3:
+        nfts = [rng.randrange(2**250)]
+        items.append(('#001122', 3, 0, 0, 0, True))
+    return (items, nfts)
+
+
+def test_identical_output():
+    rng = random.Random(0)
+    cases = [[], [([], [])], [random_shape(rng) for _ in range(50)], [random_shape(rng, False) for _ in range(5)]]
+    for shapes in cases:
+        for index_start in [0, 1, 3]:
+            expected = reference_shape_code(shapes, index_start)
+            assert generate_shape_code(shapes, index_start) == expected
+            out = io.StringIO()
+            write_shape_code(lambda: iter(shapes), out, index_start)
+            assert out.getvalue() == expected
+
+
+def test_one_shot_iterable():
+    rng = random.Random(0)
+    shapes = [random_shape(rng) for _ in range(5)]
+    # A generator would be exhausted after the first section.
+    with pytest.raises(Exception, match="expected a sequence or a callable"):
+        generate_shape_code(shape for shape in shapes)
+    with pytest.raises(Exception, match="expected a sequence or a callable"):
+        write_shape_code(iter(shapes), io.StringIO())
+    assert generate_shape_code(tuple(shapes)) == reference_shape_code(shapes)
+
+
+def test_nft_positions():
+    items = [
+        ('#ffaaff', 1, 4, -2, -4),
+        ('#ffaaff', 1, 4, 1, -4, True),
+        ('#ffaaff', 2, 4, 3, -4, True),
+    ]
+    assert nft_positions((items, [1, 2])) == [compress_shape_item(*items[1])[1], compress_shape_item(*items[2])[1]]
+    # Kept parallel to the token ids even when the counts don't match, the constructor rejects these.
+    assert nft_positions((items, [1])) == [compress_shape_item(*items[1])[1]]
+    assert nft_positions((items[:2], [1, 2])) == [compress_shape_item(*items[1])[1], 0]
+    with pytest.raises(Exception, match="NFT items are not properly sorted"):
+        nft_positions(([items[2], items[1]], [1, 2]))
+
+
+def test_ft_counts():
+    items = [
+        ('#ffaaff', 3, 0, 0, 0),
+        ('#ffaaff', 1, 0, 0, 1),
+        ('#ffaaff', 3, 0, 0, 2),
+        ('#ffaaff', 2, 0, 0, 3, True),
+    ]
+    assert ft_counts((items, [2])) == [(1, 1), (3, 2)]
+    assert ft_counts(([], [])) == []
+    assert ft_counts((items + [('any_color_any_material', 1, 0, 0, 4)], [2])) == [(1, 1), (3, 2)]
+
+
+class CountingSink:
+    def __init__(self):
+        self.size = 0
+
+    def writelines(self, lines):
+        for line in lines:
+            self.size += len(line)
+
+
+def peak_memory(nb_shapes):
+    def shapes():
+        rng = random.Random(0)
+        return (random_shape(rng) for _ in range(nb_shapes))
+    tracemalloc.start()
+    write_shape_code(shapes, CountingSink())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def test_bounded_memory():
+    small = peak_memory(200)
+    large = peak_memory(5000)
+    print(f"Peak memory: {small} B for 200 shapes, {large} B for 5000 shapes")
+    assert large < 2 * small
@@ -0,0 +1,142 @@
+import random
+
+import numpy as np
+import pytest
+
+from briq_protocol.shape_utils import compress_shape_item, uncompress_shape_item
+from briq_protocol.gen_shape_check import ShapeItem
+from briq_protocol.shape_codec import (
+    DOJO,
+    compress_shape_items,
+    transcode_legacy_to_dojo,
+    uncompress_shape_items,
+    felts_to_limbs,
+    limbs_to_felts,
+    colors_to_array,
+    array_to_colors,
+)
+
+
+def random_items(n, seed=0):
+    rng = random.Random(seed)
+    colors = ['#ffaaff', '#001122', '#f20199', 'any_color_any_material']
+    return [(
+        rng.choice(colors),
+        rng.randrange(0, 2**64),
+        rng.randrange(-2**63 + 1, 2**63),
+        rng.randrange(-2**63 + 1, 2**63),
+        rng.choice([0, -1, 1, rng.randrange(-2**63 + 1, 2**63)]),
+        rng.random() < 0.2,
+    ) for _ in range(n)]
+
+
+def to_columns(items):
+    color, mat, x, y, z, nft = zip(*items)
+    return dict(x=list(x), y=list(y), z=list(z), material=list(mat), has_token_id=list(nft), color=list(color))
+
+
+def test_felt_limbs_roundtrip():
+    felts = [0, 1, 2**64 - 1, 2**64, 2**251 - 1, 0x236666666666660000000000000000000000000000000002]
+    assert limbs_to_felts(felts_to_limbs(felts)) == felts
+
+
+def test_colors_roundtrip():
+    colors = ['#ffaaff', '#001122']
+    assert array_to_colors(colors_to_array(colors)) == colors
+    assert colors_to_array(['any_color_any_material'])[0] == 0
+    with pytest.raises(Exception, match="Color must be formatted"):
+        colors_to_array(['#fff'])
+
+
+def test_compress_matches_scalar():
+    items = random_items(2000)
+    cnm, xyz = compress_shape_items(**to_columns(items))
+    expected = [compress_shape_item(*item) for item in items]
+    assert limbs_to_felts(cnm) == [e[0] for e in expected]
+    assert limbs_to_felts(xyz) == [e[1] for e in expected]
+
+
+def test_uncompress_matches_scalar():
+    items = [i for i in random_items(2000, seed=1) if i[0] != 'any_color_any_material']
+    cnm, xyz = compress_shape_items(**to_columns(items))
+    color, mat, x, y, z, nft = uncompress_shape_items(cnm, xyz)
+    expected = [uncompress_shape_item(*compress_shape_item(*item)) for item in items]
+    assert list(zip(array_to_colors(color), mat.tolist(), x.tolist(), y.tolist(), z.tolist(), nft.tolist())) == expected
+
+
+def test_numpy_columns():
+    cnm, xyz = compress_shape_items(
+        x=np.array([5, 2**63 - 1], dtype=np.int64),
+        y=np.array([-1, -2**63 + 1], dtype=np.int64),
+        z=np.array([4, 0], dtype=np.int32),
+        material=np.array([2, 2], dtype=np.uint64),
+        has_token_id=np.array([False, True]),
+        color=colors_to_array(['#ffffff', '#ffffff']),
+    )
+    assert limbs_to_felts(cnm)[0] == 0x236666666666660000000000000000000000000000000002
+    assert limbs_to_felts(xyz)[0] == 0x80000000000000057fffffffffffffff8000000000000004
+    assert limbs_to_felts(cnm)[1] == compress_shape_item('#ffffff', 2, 2**63 - 1, -2**63 + 1, 0, True)[0]
+
+
+def test_range_checks():
+    base = to_columns([('#ffaaff', 1, 0, 0, 0, False)])
+    with pytest.raises(Exception, match="Material must be between 0 and 2\\^64"):
+        compress_shape_items(**{**base, 'material': [2**64]})
+    with pytest.raises(Exception, match="Material must be between 0 and 2\\^64"):
+        compress_shape_items(**{**base, 'material': np.array([-1])})
+    for coord in ['x', 'y', 'z']:
+        for bad in [[2**63], [-2**63], np.array([-2**63], dtype=np.int64), np.array([2**63], dtype=np.uint64)]:
+            with pytest.raises(Exception, match="cannot support positions beyond 2\\^63"):
+                compress_shape_items(**{**base, coord: bad})
+
+
+def small_items(n, seed=0):
+    rng = random.Random(seed)
+    return [(
+        rng.choice(['#ffaaff', '#001122', '#f20199']),
+        rng.randrange(1, 2**64),
+        rng.randrange(-2**31, 2**31),
+        rng.randrange(-2**31, 2**31),
+        rng.choice([0, -1, 1, -2**31, 2**31 - 1]),
+        False,
+    ) for _ in range(n)]
+
+
+def test_dojo_matches_shape_item():
+    items = small_items(2000)
+    cm, xyz = compress_shape_items(**to_columns(items), scheme=DOJO)
+    expected = [ShapeItem(x, y, z, color, mat) for color, mat, x, y, z, _ in items]
+    assert limbs_to_felts(cm) == [e.color_material for e in expected]
+    assert limbs_to_felts(xyz) == [e.x_y_z for e in expected]
+
+    color, mat, x, y, z, nft = uncompress_shape_items(cm, xyz, scheme=DOJO)
+    assert list(zip(array_to_colors(color), mat.tolist(), x.tolist(), y.tolist(), z.tolist(), nft.tolist())) == items
+
+
+def test_dojo_range_checks():
+    base = to_columns([('#ffaaff', 1, 0, 0, 0, False)])
+    for bad in [[2**31], [-2**31 - 1], np.array([2**31], dtype=np.int64)]:
+        with pytest.raises(Exception, match="beyond 2\\^31"):
+            compress_shape_items(**{**base, 'y': bad}, scheme=DOJO)
+    with pytest.raises(Exception, match="cannot contain NFTs"):
+        compress_shape_items(**{**base, 'has_token_id': [True]}, scheme=DOJO)
+    with pytest.raises(Exception, match="Unknown shape packing scheme"):
+        compress_shape_items(**base, scheme='foo')
+
+
+def test_transcode_legacy_to_dojo():
+    items = small_items(2000, seed=2) + [('any_color_any_material', 0, 3, -4, 5, False)]
+    legacy = compress_shape_items(**to_columns(items))
+    dojo = compress_shape_items(**to_columns(items), scheme=DOJO)
+    cm, xyz = transcode_legacy_to_dojo(*legacy)
+    assert (cm == dojo[0]).all() and (xyz == dojo[1]).all()
+
+    nft = compress_shape_items(**to_columns([('#ffaaff', 1, 0, 0, 0, True)]))
+    with pytest.raises(Exception, match="cannot contain NFTs"):
+        transcode_legacy_to_dojo(*nft)
+    color_material = ShapeItem(0, 0, 0, '#ffaaff', 1).color_material
+    assert limbs_to_felts(transcode_legacy_to_dojo(*nft, drop_nft=True)[0]) == [color_material]
+
+    far = compress_shape_items(**to_columns([('#ffaaff', 1, 2**31, 0, 0, False)]))
+    with pytest.raises(Exception, match="beyond 2\\^31"):
+        transcode_legacy_to_dojo(*far)
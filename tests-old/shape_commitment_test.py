@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from briq_protocol.shape import Shape
+from briq_protocol.shape_commitment import (
+    compute_commitments,
+    registration_script,
+    shape_commitment,
+    shape_fts,
+    shapes_from_directory,
+    sort_shape,
+    write_commitments,
+)
+
+# valid_shape_1 in src/tests/test_set_nft.cairo, shuffled.
+SHAPE_1 = Shape.from_legacy_tuples([('#ffaaff', 1, x, 4, -2) for x in [5, 3, 2, 4]])
+SHAPE_1_COMMITMENT = 0x7570195dfb6b81f5217f45ce0ce2f8de146847a045806cce7c2597c17ecfed
+
+
+def test_shape_commitment():
+    with pytest.raises(Exception, match="Bad ordering"):
+        shape_commitment(SHAPE_1)
+    shape = sort_shape(SHAPE_1)
+    assert list(shape.x) == [2, 3, 4, 5]
+    assert shape_fts(shape) == [(1, 4)]
+    # Same value as VALID_SHAPE_1_COMMITMENT in test_set_nft.cairo
+    assert shape_commitment(shape) == SHAPE_1_COMMITMENT
+    assert shape_commitment(shape, [(1, 4)]) == SHAPE_1_COMMITMENT
+    assert shape_commitment(shape, [(1, 3)]) != SHAPE_1_COMMITMENT
+
+
+def test_sort_shape():
+    shape = sort_shape(Shape.from_legacy_tuples([
+        ('#ffaaff', 2, 0, 0, 1), ('#ffaaff', 1, -1, 5, 0), ('#ffaaff', 1, 0, -3, 7), ('#ffaaff', 1, 0, 0, -1),
+    ]))
+    assert list(zip(shape.x, shape.y, shape.z)) == [(-1, 5, 0), (0, -3, 7), (0, 0, -1), (0, 0, 1)]
+    assert shape_fts(shape) == [(1, 3), (2, 1)]
+    positions = shape.to_felts()[1]
+    assert positions == sorted(positions)
+
+
+def test_compute_commitments(tmp_path):
+    briqs = [{"pos": [x, 4, -2], "data": {"color": "#ffaaff", "material": "0x1"}} for x in [5, 3, 2, 4]]
+    (tmp_path / '0x1.json').write_text(json.dumps({"briqs": briqs}))
+    (tmp_path / '2.json').write_text(json.dumps(briqs[:3]))
+    (tmp_path / 'README.md').write_text('')
+    shapes = shapes_from_directory(str(tmp_path))
+    assert sorted(shapes) == [1, 2]
+
+    commitments = compute_commitments(shapes, workers=0)
+    assert commitments[1] == SHAPE_1_COMMITMENT
+    assert compute_commitments(shapes, workers=2, chunk_size=1) == commitments
+    assert compute_commitments({1: sort_shape(SHAPE_1)}, workers=0) == {1: SHAPE_1_COMMITMENT}
+
+    write_commitments(0x69, commitments, str(tmp_path / 'out'))
+    written = json.loads((tmp_path / 'out' / 'shape_commitments.json').read_text())
+    assert written['commitments']['0x1'] == hex(SHAPE_1_COMMITMENT)
+    assert registration_script(0x69, commitments).splitlines()[1] == (
+        "starkli invoke $REGISTER_SHAPE_COMMITMENT_ADDR execute $WORLD_ADDRESS 0x69 0x1 "
+        f"{hex(SHAPE_1_COMMITMENT)} --keystore-password $KEYSTORE_PWD"
+    )
+
+
+def test_shapes_from_directory_bad_name(tmp_path):
+    (tmp_path / 'duck.json').write_text('[]')
+    with pytest.raises(Exception, match="isn't named after an attribute id"):
+        shapes_from_directory(str(tmp_path))
@@ -0,0 +1,124 @@
+import json
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from briq_protocol.gen_shape_check import ShapeItem, generate_shape_check
+from briq_protocol.shape import Shape
+from briq_protocol.shape_codec import LEGACY, compress_shape_items, felts_to_limbs, limbs_to_felts
+
+
+def random_tuples(n, seed=0):
+    rng = random.Random(seed)
+    return [(
+        '#%06x' % rng.randrange(2**24),
+        rng.choice([1, 2, 3]),
+        rng.randrange(-2**31, 2**31),
+        rng.randrange(-50, 50),
+        rng.randrange(-50, 50),
+    ) for _ in range(n)]
+
+
+def to_shape_items(tuples):
+    return [ShapeItem(x, y, z, color, mat) for color, mat, x, y, z in tuples]
+
+
+def test_matches_shape_item():
+    tuples = random_tuples(500)
+    shape = Shape.from_legacy_tuples(tuples)
+    expected = to_shape_items(tuples)
+    assert len(shape) == len(expected)
+    assert shape.to_felts() == ([i.color_material for i in expected], [i.x_y_z for i in expected])
+    assert limbs_to_felts(shape.x_y_z) == [i.x_y_z for i in expected]
+    assert shape[3].color_material == expected[3].color_material
+    for view, item in zip(shape, expected):
+        assert (view.x, view.y, view.z) == (item.x, item.y, item.z)
+        assert (view.color, view.material) == (item.color, item.material)
+    assert shape[-1].x_y_z == expected[-1].x_y_z
+    assert shape.colors == [i.color for i in expected]
+    assert shape.x.tolist() == [i.x for i in expected]
+
+
+def test_generate_shape_check_is_identical():
+    tuples = random_tuples(50) + [('#ffaaff', 0, 0, 1, 0)]
+    assert generate_shape_check(Shape.from_legacy_tuples(tuples)) == generate_shape_check(to_shape_items(tuples))
+
+
+def test_constructors():
+    tuples = random_tuples(20, seed=1)
+    shape = Shape.from_legacy_tuples(tuples)
+    assert Shape.from_packed(zip(*shape.to_felts())).to_felts() == shape.to_felts()
+
+    columns = zip(*[(x, y, z, mat, False, color) for color, mat, x, y, z in tuples])
+    legacy = compress_shape_items(*columns, scheme=LEGACY)
+    assert np.array_equal(Shape.from_limbs(*legacy, scheme=LEGACY).color_material, shape.color_material)
+
+    briqs = {'briqs': [
+        {'pos': [x, y, z], 'data': {'color': color, 'material': hex(mat)}} for color, mat, x, y, z in tuples
+    ]}
+    assert np.array_equal(Shape.from_json(json.dumps(briqs)).x_y_z, shape.x_y_z)
+
+    with pytest.raises(Exception, match="cannot contain NFTs"):
+        Shape.from_legacy_tuples([('#ffaaff', 1, 0, 0, 0, True)])
+    with pytest.raises(Exception, match="do not fit the dojo packing"):
+        Shape.from_limbs(felts_to_limbs([2**130]), felts_to_limbs([0]))
+    # Materials are u64, as in the dojo PackedShapeItem.
+    assert Shape.from_legacy_tuples([('#ffaaff', 2**64 - 1, 0, 0, 0)])[0].material == 2**64 - 1
+
+
+def test_slices_are_views():
+    shape = Shape.from_legacy_tuples(random_tuples(100))
+    packed = shape.x_y_z
+    part = shape[10:20]
+    assert np.shares_memory(part._data, shape._data)
+    assert np.shares_memory(part.x_y_z, packed)
+    assert np.array_equal(part.x_y_z, packed[10:20])
+    assert np.array_equal(shape[::3].color_material, shape.color_material[::3])
+    assert np.array_equal(Shape(shape._data[::3]).color_material, shape.color_material[::3])
+
+
+def test_take_and_sorted():
+    shape = Shape.from_legacy_tuples(random_tuples(100))
+    packed = shape.x_y_z
+    order = np.arange(100)[::-1]
+    taken = shape.take(order)
+    assert 'x_y_z' in taken.__dict__
+    assert np.array_equal(taken.x_y_z, packed[order])
+    assert list(taken.colors) == list(shape.colors)[::-1]
+    positions = shape.sorted().to_felts()[1]
+    assert positions == sorted(shape.to_felts()[1])
+    # take copies, the original can't be changed through the result.
+    assert not np.shares_memory(taken.x_y_z, packed)
+
+
+def test_memory_benchmark():
+    n = 3000
+    text = json.dumps({'briqs': [
+        {'pos': [x, y, z], 'data': {'color': color, 'material': hex(mat)}} for color, mat, x, y, z in random_tuples(n)
+    ]})
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [
+        ShapeItem(*b['pos'], b['data']['color'], int(b['data']['material'], 16)) for b in json.loads(text)['briqs']
+    ]
+    list_bytes = tracemalloc.get_traced_memory()[0] - before
+    del items
+
+    before = tracemalloc.get_traced_memory()[0]
+    shape = Shape.from_json(text)
+    shape_bytes = tracemalloc.get_traced_memory()[0] - before
+    # The packed felts are cached as limbs, 2 * NB_LIMBS uint64 per voxel on top of the records.
+    shape.color_material, shape.x_y_z
+    packed_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(
+        f"ShapeItem list: {list_bytes / n:.1f} B/voxel, Shape: {shape_bytes / n:.1f} B/voxel "
+        f"({shape.nbytes / n:.0f} B of data), {packed_bytes / n:.1f} B/voxel once packed"
+    )
+    # Measured: 239.0, 28.2 and 92.3 B/voxel, i.e. 8.5x for the records and 2.6x once packed.
+    assert list_bytes > 8 * shape_bytes
+    assert list_bytes > 2.5 * packed_bytes
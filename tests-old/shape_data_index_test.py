@@ -0,0 +1,74 @@
+import os
+import random
+import shutil
+import time
+
+import pytest
+
+from briq_protocol.generate_shape import generate_shape_code
+from briq_protocol.shape_data_index import build_index, load_shape_data, open_index, parse_shape_data
+from briq_protocol.shape_utils import compress_shape_item
+
+CONTRACT_SRC = os.path.join(os.path.dirname(__file__), "..", "contracts")
+
+
+def random_shapes(n, seed=0):
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(n):
+        items = [('#ffaaff', rng.choice([1, 2]), *(rng.randrange(-10, 10) for _ in range(3)), False)
+                 for _ in range(rng.randrange(0, 6))]
+        nfts = [rng.randrange(2**250) for _ in range(rng.choice([0, 0, 1, 2]))]
+        items += [('#001122', 3, i, 0, 0, True) for i in range(len(nfts))]
+        shapes.append((items, nfts))
+    return shapes
+
+
+def test_roundtrip(tmp_path):
+    shapes = random_shapes(100)
+    path = str(tmp_path / 'data.cairo')
+    with open(path, 'w') as f:
+        f.write(generate_shape_code(shapes, 3))
+
+    for data in [parse_shape_data(path), open_index(build_index(path), path)]:
+        assert data.index_start == 3
+        assert len(data) == len(shapes)
+        for i, (items, nfts) in enumerate(shapes):
+            assert data.get_shape(i) == ([compress_shape_item(*item) for item in items], nfts)
+        item = 0
+        for i, (items, _) in enumerate(shapes):
+            for _ in items:
+                assert data.shape_of_item(item) == i
+                item += 1
+        with pytest.raises(IndexError):
+            data.get_shape(len(shapes))
+
+
+def test_stale_index(tmp_path):
+    path = str(tmp_path / 'data.cairo')
+    shutil.copy(os.path.join(CONTRACT_SRC, 'shape', 'data.cairo'), path)
+    data = load_shape_data(path)
+    assert os.path.exists(path + '.idx')
+    assert data.get_shape(0) == parse_shape_data(path).get_shape(0)
+
+    with open(path, 'a') as f:
+        f.write('\n')
+    with pytest.raises(Exception, match="out of date"):
+        open_index(path + '.idx', path)
+    assert len(load_shape_data(path)) == len(data)
+
+
+def test_lookup_benchmark(tmp_path):
+    path = str(tmp_path / 'data_ducks.cairo')
+    shutil.copy(os.path.join(CONTRACT_SRC, 'shape', 'data_ducks.cairo'), path)
+    start = time.perf_counter()
+    load_shape_data(path)
+    build_time = time.perf_counter() - start
+
+    data = load_shape_data(path)
+    start = time.perf_counter()
+    for i in range(len(data)):
+        data.get_shape_limbs(i)
+    lookup_time = (time.perf_counter() - start) / len(data)
+    print(f"Index build: {build_time * 1000:.1f} ms, lookup: {lookup_time * 1e6:.2f} us")
+    assert lookup_time < 1e-4
@@ -0,0 +1,104 @@
+import pytest
+import pytest_asyncio
+
+from starkware.starknet.definitions.general_config import StarknetGeneralConfig
+from starkware.starknet.testing.starknet import Starknet
+
+from briq_protocol.shape_utils import compress_shape_item
+
+from .conftest import deploy_clean_shapes
+
+# decompress_data binary searches the NFT positions, so looking up an NFT voxel barely depends on their number.
+# Measured (steps for the first, middle and last NFT, cairo-lang 0.10.3):
+#   NFTs   binary search      linear walk (before)
+#   10     [435, 429, 485]    [213, 443, 627]
+#   50     [583, 577, 621]    [213, 1363, 2467]
+#   100    [657, 651, 689]    [213, 2513, 4767]
+#   500    [805, 799, 825]    [213, 11713, 23167]
+NB_NFTS = [10, 50, 100, 500]
+
+# check_shape_numbers_ merges sorted fts with the stored counts, so the cost per item barely depends on materials.
+# Measured for 100 items (steps, cairo-lang 0.10.3):
+#   materials   sorted fts   unsorted fts   per-item counters (before)
+#   1           2833         2833           10949
+#   2           2865         12872          12772
+#   5           2961         18398          18241
+#   10          3121         27608          27356
+NB_ITEMS = 100
+MAX_STEPS_PER_ITEM = 35
+
+
+@pytest_asyncio.fixture(scope="module")
+async def empty_starknet():
+    # Deploying the 500 NFT shape goes over the default step limit.
+    return await Starknet.empty(general_config=StarknetGeneralConfig(invoke_tx_max_n_steps=50_000_000))
+
+
+@pytest_asyncio.fixture
+async def starknet(empty_starknet):
+    return Starknet(state=empty_starknet.state.copy())
+
+
+def nft_shape(nb_nfts):
+    # Interleave NFTs and FTs so the NFT index differs from the item index.
+    items = []
+    nfts = []
+    for i in range(nb_nfts):
+        items.append(('#ffaaff', 1, i, 0, 0))
+        items.append(('#ffaaff', 2, i, 1, 0, True))
+        nfts.append((i + 1) * 2**64 + 2)
+    return items, nfts
+
+
+async def lookup_steps(starknet, deploy_clean_shapes, nb_nfts):
+    items, nfts = nft_shape(nb_nfts)
+    [_, contract] = await deploy_clean_shapes(starknet, [(items, nfts)])
+    steps = []
+    for index in [0, nb_nfts // 2, nb_nfts - 1]:
+        item = items[index * 2 + 1]
+        result = await contract.decompress_data(contract.ShapeItem(*compress_shape_item(*item)), 0).call()
+        assert result.result.data.nft_token_id == nfts[index]
+        steps.append(result.call_info.execution_resources.n_steps)
+    print(f"{nb_nfts} NFTs: {steps} steps")
+    return max(steps)
+
+
+@pytest.mark.asyncio
+async def test_find_nft_benchmark(starknet: Starknet, deploy_clean_shapes):
+    steps = {nb_nfts: await lookup_steps(starknet, deploy_clean_shapes, nb_nfts) for nb_nfts in NB_NFTS}
+    # 825 against 485 steps, the linear walk was 37x slower at 500 NFTs than at 10.
+    assert steps[500] < 2 * steps[10]
+
+
+def material_shape(nb_materials):
+    items = [('#ffaaff', 1 + i % nb_materials, i, 0, 0) for i in range(NB_ITEMS)]
+    fts = {}
+    for item in items:
+        fts[item[1]] = fts.get(item[1], 0) + 1
+    return items, sorted(fts.items())
+
+
+async def check_steps(starknet, deploy_clean_shapes, nb_materials, reverse_fts=False):
+    items, fts = material_shape(nb_materials)
+    [_, contract] = await deploy_clean_shapes(starknet, [(items, [])])
+    result = await contract.check_shape_numbers_(
+        global_index=1,
+        shape=[contract.ShapeItem(*compress_shape_item(*item)) for item in items],
+        fts=fts[::-1] if reverse_fts else fts,
+        nfts=[],
+    ).call()
+    steps = result.call_info.execution_resources.n_steps
+    print(f"{nb_materials} materials{' (unsorted fts)' if reverse_fts else ''}: {steps} steps")
+    return steps
+
+
+@pytest.mark.asyncio
+async def test_check_shape_numbers_benchmark(starknet: Starknet, deploy_clean_shapes):
+    one_material = await check_steps(starknet, deploy_clean_shapes, 1)
+    many_materials = await check_steps(starknet, deploy_clean_shapes, 10)
+    # Unsorted fts still work, through the per-item counters.
+    await check_steps(starknet, deploy_clean_shapes, 10, reverse_fts=True)
+    # 28 steps per item, against 109 before.
+    assert one_material < MAX_STEPS_PER_ITEM * NB_ITEMS
+    # 3121 against 2833 steps.
+    assert many_materials < 1.2 * one_material
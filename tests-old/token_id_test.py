@@ -0,0 +1,73 @@
+import pytest
+
+from briq_protocol.token_id import (
+    ADDR_BOUND,
+    get_1155_token_id,
+    get_token_id,
+    get_token_ids,
+    hash_token_id,
+    owner_prefix,
+    scan_collisions,
+)
+
+
+# Same vectors as test_hash in src/tests/test_set_nft.cairo
+@pytest.mark.parametrize("owner, hint, nb_briqs, group, expected", [
+    (
+        0x3ef5b02bcc5d30f3f0d35d55f365e6388fe9501eca216cb1596940bf41083e2, 0x6111956b2a0842138b2df81a3e6e88f8,
+        25, 0, 0xc40763dbee89f284bf9215e353171229b4cbc645fa8c0932cb68c100000000,
+    ),
+    (
+        0x3ef5b02bcc5d30f3f0d35d55f365eca216cb1596940bf41083e2, 0x6111956b2a06e88f8,
+        1, 0, 0x3011789e95d63923025646fcbf5230513b8b347ff1371b871a9968600000000,
+    ),
+    (
+        0x3ef5b02bcc5d30f3f0d35d55f365e63801eca216cb1596940bf41083e2, 0x6111956b42138b2df81a3e6e88f8,
+        3, 0x34153, 0x7805905ca794dd2afcf54520b89b0a5520f51614e3ce357c7c2852700034153,
+    ),
+    (
+        0x3ef5b02bcc5d30f3f0d35d55f365e6388fe9501e216cb1596940bf41083e2, 0x6111956b2a0842138b26e88f8,
+        5, 0x3435, 0x3f7dc95b8ce50f4c0e75d7c2c6cf04190e45c3cb4c26e52b9993df000003435,
+    ),
+    # test_simple_mint_and_burn_1 / _2
+    (0xcafe, 0xfade, 1, 0, 0x3fa51acc2defe858e3cb515b7e29c6e3ba22da5657e7cc33885860a00000000),
+    (0xcafe, 0xfade, 4, 0, 0x2d4276d22e1b24bb462c255708ae8293302ff6b17691ed07f5057ae00000000),
+])
+def test_get_token_id(owner, hint, nb_briqs, group, expected):
+    assert get_token_id(owner, hint, nb_briqs, group) == expected
+
+
+def test_get_token_ids():
+    owner_prefix.cache_clear()
+    hints = list(range(20))
+    assert get_token_ids(0xcafe, hints, 4) == [get_token_id(0xcafe, h, 4) for h in hints]
+    # The owner is only hashed once for the whole wallet.
+    assert owner_prefix.cache_info().misses == 1
+    expected = [get_token_id(0xcafe, 1, 3), get_token_id(0xfade, 2, 4, 5)]
+    assert get_token_ids([0xcafe, 0xfade], [1, 2], [3, 4], [0, 5]) == expected
+    with pytest.raises(Exception, match="same length"):
+        get_token_ids([0xcafe, 0xfade], [1, 2, 3], 4)
+
+
+def test_get_1155_token_id():
+    assert get_1155_token_id(0x2, 0xbaba) == 0x20000baba
+    assert get_1155_token_id(2**230, 1) == (2**262 + 1) % ADDR_BOUND
+    with pytest.raises(Exception, match="Attribute group too large"):
+        get_1155_token_id(1, 2**32)
+
+
+def test_hash_token_id():
+    base = hash_token_id(0x11, 0x1, [1])
+    assert base % 2**59 == 0
+    assert hash_token_id(0x11, 0x1, [1, 0x1234]) == base + 0x1234
+    assert hash_token_id(0x11, 0x1, [1, 2**59]) == base
+    assert base != get_token_id(0x11, 0x1, 1)
+
+
+def test_scan_collisions():
+    ids = get_token_ids(0xcafe, list(range(50)), 4)
+    assert scan_collisions(0xcafe, range(50), 4, workers=0) == []
+    # Repeated hints and already minted ids collide.
+    assert scan_collisions(0xcafe, [1, 2, 1], 4, existing=[ids[2]], workers=0) == [(2, ids[2], None), (1, ids[1], 1)]
+    assert scan_collisions(0xcafe, (h for h in [1, 2, 1] * 3), 4, existing=[ids[2]], workers=2, chunk_size=2) == \
+        scan_collisions(0xcafe, [1, 2, 1] * 3, 4, existing=[ids[2]], workers=0)